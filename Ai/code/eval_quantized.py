@@ -0,0 +1,181 @@
+# 파인튜닝된 NER 모델의 fp32 / INT8 동적 양자화 버전 비교
+# - Ai/datasets 데이터로 개체 단위 precision/recall/F1 차이
+# - 문장 처리량(문장/초)과 모델 크기
+# 실행 예: python eval_quantized.py --model ./local_models/finetuned_ner_model --limit 2000
+
+import argparse
+import copy
+import io
+import json
+import os
+import time
+import warnings
+
+import torch
+from transformers import AutoModelForTokenClassification, AutoTokenizer
+
+# train_jp.py의 라벨 맵 (데이터셋 ner_tags가 이 번호를 사용)
+label2id = {
+    "O": 0,
+    "B-PS": 1, "I-PS": 2,
+    "B-LC": 3, "I-LC": 4,
+    "B-OG": 5, "I-OG": 6,
+    "B-DT": 7, "I-DT": 8,
+    "B-BD": 9, "I-BD": 10,
+    "B-PN": 11, "I-PN": 12,
+    "B-SSN": 13, "I-SSN": 14,
+    "B-AN": 15, "I-AN": 16,
+    "B-CCD": 17, "I-CCD": 18,
+    "B-CVC": 19, "I-CVC": 20,
+    "B-EM": 21, "I-EM": 22,
+    "B-PPS": 23, "I-PPS": 24,
+    "B-AG": 25, "I-AG": 26,
+    "B-GD": 27, "I-GD": 28,
+    "B-JOB": 29, "I-JOB": 30,
+}
+id2label = {v: k for k, v in label2id.items()}
+
+DEFAULT_DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "datasets", "data_dist.jsonl")
+
+
+def load_examples(path, limit=0):
+    """한 줄에 객체 하나가 있는 JSON 배열 파일을 줄 단위로 읽습니다. ('[', ']', 끝의 쉼표 허용)"""
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip().rstrip(",")
+            if not line.startswith("{"):
+                continue
+            item = json.loads(line)
+            if len(item.get("tokens", [])) != len(item.get("ner_tags", [])) or not item["tokens"]:
+                continue
+            examples.append(item)
+            if limit and len(examples) >= limit:
+                break
+    return examples
+
+
+def extract_entities(tags):
+    """BIO 태그 목록 → {(시작, 끝, 종류)} 집합 (단어 인덱스 기준)"""
+    entities = set()
+    start, kind = None, None
+    for i, tag in enumerate(list(tags) + ["O"]):
+        prefix, _, name = tag.partition("-")
+        if start is not None and (prefix != "I" or name != kind):
+            entities.add((start, i, kind))
+            start, kind = None, None
+        if prefix == "B" or (prefix == "I" and start is None):
+            start, kind = i, name
+    return entities
+
+
+def predict_tags(model, tokenizer, examples, batch_size):
+    """단어별 첫 서브워드의 예측 라벨을 사용합니다. (train_jp.py의 라벨 정렬 방식과 동일)"""
+    model_id2label = model.config.id2label
+    predictions = []
+    for i in range(0, len(examples), batch_size):
+        batch = examples[i : i + batch_size]
+        encoded = tokenizer(
+            [ex["tokens"] for ex in batch],
+            is_split_into_words=True,
+            truncation=True,
+            padding=True,
+            return_tensors="pt",
+        )
+        with torch.no_grad():
+            logits = model(**encoded).logits
+        pred_ids = logits.argmax(dim=-1).tolist()
+        for b, ex in enumerate(batch):
+            tags = ["O"] * len(ex["tokens"])
+            previous = None
+            for pos, word_idx in enumerate(encoded.word_ids(batch_index=b)):
+                if word_idx is not None and word_idx != previous:
+                    tags[word_idx] = model_id2label.get(pred_ids[b][pos], "O")
+                previous = word_idx
+            predictions.append(tags)
+    return predictions
+
+
+def score(examples, predictions):
+    tp = fp = fn = 0
+    for ex, pred in zip(examples, predictions):
+        gold = extract_entities([id2label.get(t, "O") for t in ex["ner_tags"]])
+        found = extract_entities(pred)
+        tp += len(gold & found)
+        fp += len(found - gold)
+        fn += len(gold - found)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+
+def model_size_mb(model):
+    buf = io.BytesIO()
+    torch.save(model.state_dict(), buf)
+    return buf.tell() / 1024 / 1024
+
+
+def evaluate_model(name, model, tokenizer, examples, batch_size):
+    predict_tags(model, tokenizer, examples[:batch_size], batch_size)  # 워밍업
+    started = time.perf_counter()
+    predictions = predict_tags(model, tokenizer, examples, batch_size)
+    elapsed = time.perf_counter() - started
+    result = {"model": name, **score(examples, predictions)}
+    result["sentences_per_sec"] = len(examples) / elapsed if elapsed else 0.0
+    result["size_mb"] = model_size_mb(model)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fp32 vs INT8 동적 양자화 NER 모델 비교")
+    parser.add_argument("--model", default="./local_models/finetuned_ner_model", help="파인튜닝된 모델 경로")
+    parser.add_argument("--dataset", default=DEFAULT_DATASET, help="평가 데이터 (Ai/datasets 형식)")
+    parser.add_argument("--limit", type=int, default=2000, help="평가 문장 수 (0이면 전체)")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=0, help="torch CPU 스레드 수 (0이면 기본값)")
+    parser.add_argument("--output", default="", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+    examples = load_examples(args.dataset, args.limit)
+    print(f"INFO: 평가 문장 {len(examples)}개 ({args.dataset})")
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    fp32 = AutoModelForTokenClassification.from_pretrained(args.model).eval()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        int8 = torch.ao.quantization.quantize_dynamic(copy.deepcopy(fp32), {torch.nn.Linear}, dtype=torch.qint8)
+
+    results = [
+        evaluate_model("fp32", fp32, tokenizer, examples, args.batch_size),
+        evaluate_model("int8", int8, tokenizer, examples, args.batch_size),
+    ]
+    base, quant = results
+    summary = {
+        "examples": len(examples),
+        "results": results,
+        "f1_diff": quant["f1"] - base["f1"],
+        "throughput_gain": quant["sentences_per_sec"] / base["sentences_per_sec"] if base["sentences_per_sec"] else 0.0,
+        "size_ratio": quant["size_mb"] / base["size_mb"] if base["size_mb"] else 0.0,
+    }
+
+    print(f"{'model':<6} {'precision':>9} {'recall':>7} {'f1':>7} {'sent/s':>9} {'size_mb':>8}")
+    for r in results:
+        print(
+            f"{r['model']:<6} {r['precision']:>9.4f} {r['recall']:>7.4f} {r['f1']:>7.4f}"
+            f" {r['sentences_per_sec']:>9.1f} {r['size_mb']:>8.1f}"
+        )
+    print(
+        f"F1 차이(int8 - fp32): {summary['f1_diff']:+.4f}, "
+        f"처리량 {summary['throughput_gain']:.2f}배, 크기 {summary['size_ratio']:.2f}배"
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"INFO: 결과 저장 → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -64,24 +64,32 @@ def resolve_conflicts(results: list[RecognizerResult]) -> list[RecognizerResult]
     discarded_indices = set()
 
     # 1. 규칙 기반 결과가 다른 결과(모델 또는 다른 규칙)에 완전히 포함되는지 확인
-    for i, res1 in enumerate(results):
-        # res1이 규칙 기반 결과가 아니면 건너뜁니다.
-        if res1.analysis_explanation.recognizer not in rule_recognizer_names:
-            continue
-
-        for j, res2 in enumerate(results):
-            if i == j:  # 자기 자신과는 비교하지 않습니다.
+    # 시작(오름차순), 끝(내림차순)으로 정렬한 뒤 한 번 훑어 O(n log n)으로 찾습니다.
+    order = sorted(range(len(results)), key=lambda i: (results[i].start, -results[i].end))
+    prefix_max_end = None  # 시작 위치가 더 앞선 결과들의 최대 끝 위치
+    pos = 0
+    while pos < len(order):
+        group_end = pos
+        while group_end < len(order) and results[order[group_end]].start == results[order[pos]].start:
+            group_end += 1
+        for k in range(pos, group_end):
+            i = order[k]
+            res1 = results[i]
+            # res1이 규칙 기반 결과가 아니면 건너뜁니다.
+            if res1.analysis_explanation.recognizer not in rule_recognizer_names:
                 continue
-
-            # res2가 res1을 완전히 포함하는지(동일 범위 포함) 확인합니다.
-            # (res2.start <= res1.start) and (res2.end >= res1.end)
-            is_contained = res2.start <= res1.start and res2.end >= res1.end
-
-            if is_contained:
-                # res1(규칙 기반 결과)을 폐기 목록에 추가하고 다음 규칙 검사로 넘어갑니다.
+            # 앞선 결과가 res1을 덮거나, 시작이 같은 결과 중 res1보다 길거나 같은 범위가 있으면 포함된 것
+            if (
+                (prefix_max_end is not None and prefix_max_end >= res1.end)
+                or k > pos
+                or (k + 1 < group_end and results[order[k + 1]].end == res1.end)
+            ):
                 discarded_indices.add(i)
-                break
-    
+        group_max_end = results[order[pos]].end
+        if prefix_max_end is None or group_max_end > prefix_max_end:
+            prefix_max_end = group_max_end
+        pos = group_end
+
     # 폐기 대상으로 표시되지 않은 결과만 필터링합니다.
     filtered_results = [res for i, res in enumerate(results) if i not in discarded_indices]
 
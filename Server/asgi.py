@@ -0,0 +1,21 @@
+"""ASGI 진입점.
+
+이벤트 루프가 연결/업로드 수신을 맡고, 요청 처리는 스레드에서 실행됩니다.
+모델 추론은 `services.executor`의 제한된 실행기로 넘겨지므로
+느린 요청이 몰려도 대기열 초과분은 503으로 즉시 거절됩니다.
+
+실행 예:
+    uvicorn Server.asgi:app --host 0.0.0.0 --port 9814
+
+`asgiref` 패키지가 필요합니다.
+"""
+
+from asgiref.wsgi import WsgiToAsgi
+
+try:  # package-relative import
+    from .server import create_app
+except Exception:  # pragma: no cover - fallback for script execution
+    from server import create_app  # type: ignore
+
+
+app = WsgiToAsgi(create_app())
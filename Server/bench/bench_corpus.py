@@ -0,0 +1,327 @@
+"""Ai/datasets 코퍼스로 마스킹 파이프라인 전체와 단계별 성능/정확도를 측정합니다.
+
+문장마다 단계(numeric_ner, presidio, fusion, render)를 따로 실행해 지연 시간을 재고,
+같은 문장을 `mask_text_with_models`(end_to_end)와 `mask_texts_with_models`(batch)로 다시 실행합니다.
+보고 항목:
+  - 단계별 p50/p95/p99 지연 시간(ms), 초당 문장 수/글자 수
+  - 모델 로딩 전/예열 후/최대 상주 메모리(MB)
+  - 엔티티 단위 precision/recall/F1 (정확 일치 strict, 같은 라벨끼리 겹치면 인정하는 overlap)
+--output으로 JSON 보고서를 저장하고, --baseline으로 이전 보고서와 비교할 수 있어
+ONNX/양자화/캐시/융합 방식 변경 전후를 같은 조건에서 비교할 수 있습니다.
+
+데이터 형식: 한 줄에 {"tokens": [...], "ner_tags": [...]} 하나 (JSON 배열의 '[', ']', 줄 끝 쉼표 허용)
+문장은 토큰을 공백으로 이어 만들고, 태그 번호는 Ai/code/train_jp.py의 label2id를 따릅니다.
+
+실행 예:
+    python -m Server.bench.bench_corpus --limit 2000 --output baseline.json
+    NER_BACKEND=onnx python -m Server.bench.bench_corpus --limit 2000 --baseline baseline.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    from ..config import DISABLE_LOCAL_NER, DISABLE_PRESIDIO, NER_BATCH_MAX_SIZE
+    from ..nlp.fusion import FUSION_MODES, fuse_and_resolve
+    from ..nlp.label_mapping import to_standard_label
+    from ..nlp.local_pipeline import run_numeric_pipeline
+    from ..nlp.presidio_adapter import analyze_with_presidio
+    from ..services import masking_service
+    from ..services.warmup import run_warmup
+    from .common import peak_rss_mb, print_table, rss_mb, summarize
+except Exception:  # pragma: no cover
+    from backend.config import DISABLE_LOCAL_NER, DISABLE_PRESIDIO, NER_BATCH_MAX_SIZE  # type: ignore
+    from backend.nlp.fusion import FUSION_MODES, fuse_and_resolve  # type: ignore
+    from backend.nlp.label_mapping import to_standard_label  # type: ignore
+    from backend.nlp.local_pipeline import run_numeric_pipeline  # type: ignore
+    from backend.nlp.presidio_adapter import analyze_with_presidio  # type: ignore
+    from backend.services import masking_service  # type: ignore
+    from backend.services.warmup import run_warmup  # type: ignore
+    from backend.bench.common import peak_rss_mb, print_table, rss_mb, summarize  # type: ignore
+
+# Ai/code/train_jp.py의 label2id 순서 (0=O, 이후 B-/I- 쌍)
+ENTITY_CODES = ("PS", "LC", "OG", "DT", "BD", "PN", "SSN", "AN", "CCD", "CVC", "EM", "PPS", "AG", "GD", "JOB")
+ID2LABEL = {0: "O"}
+for _i, _code in enumerate(ENTITY_CODES):
+    ID2LABEL[2 * _i + 1] = f"B-{_code}"
+    ID2LABEL[2 * _i + 2] = f"I-{_code}"
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_DATASET = os.path.join(REPO_ROOT, "Ai", "datasets", "data.jsonl")
+
+STAGES = ("numeric_ner", "presidio", "fusion", "render", "end_to_end", "batch")
+
+Span = Tuple[int, int, str]
+
+
+def _label(code: str) -> str:
+    return to_standard_label(code) or code
+
+
+def load_corpus(path: str, limit: int = 0) -> List[Tuple[str, List[Span]]]:
+    """(문장, 정답 엔티티 [(시작, 끝, 표준 라벨)]) 목록."""
+    samples: List[Tuple[str, List[Span]]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip().rstrip(",")
+            if not line.startswith("{"):
+                continue
+            item = json.loads(line)
+            tokens, tags = item.get("tokens") or [], item.get("ner_tags") or []
+            if not tokens or len(tokens) != len(tags):
+                continue
+            samples.append(_to_sample(tokens, tags))
+            if limit and len(samples) >= limit:
+                break
+    return samples
+
+
+def _to_sample(tokens: Sequence[str], tags: Sequence[int]) -> Tuple[str, List[Span]]:
+    """토큰을 공백으로 잇고 BIO 태그를 문자 단위 구간으로 바꿉니다."""
+    spans: List[Span] = []
+    pos = 0
+    current: Optional[List] = None  # [시작, 끝, 코드]
+    for token, tag in zip(tokens, tags):
+        start, end = pos, pos + len(token)
+        prefix, _, code = ID2LABEL.get(tag, "O").partition("-")
+        if prefix == "I" and current is not None and current[2] == code:
+            current[1] = end
+        else:
+            if current is not None:
+                spans.append((current[0], current[1], _label(current[2])))
+            current = [start, end, code] if prefix in ("B", "I") else None
+        pos = end + 1
+    if current is not None:
+        spans.append((current[0], current[1], _label(current[2])))
+    return " ".join(tokens), spans
+
+
+def _prf(tp_pred: int, n_pred: int, tp_gold: int, n_gold: int) -> Dict[str, float]:
+    precision = tp_pred / n_pred if n_pred else 0.0
+    recall = tp_gold / n_gold if n_gold else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": round(precision, 4), "recall": round(recall, 4), "f1": round(f1, 4)}
+
+
+def score(gold: Sequence[List[Span]], predicted: Sequence[List[Span]]) -> Dict[str, object]:
+    """엔티티 단위 precision/recall/F1 (strict: 위치+라벨 일치, overlap: 같은 라벨끼리 겹침)."""
+    per_label: Dict[str, List[int]] = {}  # 라벨 → [tp, 예측 수, 정답 수]
+    strict_tp = overlap_pred = overlap_gold = n_pred = n_gold = 0
+    for gold_spans, pred_spans in zip(gold, predicted):
+        gold_set: Set[Span] = set(gold_spans)
+        for span in pred_spans:
+            counts = per_label.setdefault(span[2], [0, 0, 0])
+            counts[1] += 1
+            if span in gold_set:
+                counts[0] += 1
+                strict_tp += 1
+            if any(g[2] == span[2] and g[0] < span[1] and span[0] < g[1] for g in gold_spans):
+                overlap_pred += 1
+        for span in gold_spans:
+            per_label.setdefault(span[2], [0, 0, 0])[2] += 1
+            if any(p[2] == span[2] and p[0] < span[1] and span[0] < p[1] for p in pred_spans):
+                overlap_gold += 1
+        n_pred += len(pred_spans)
+        n_gold += len(gold_spans)
+    return {
+        "gold_entities": n_gold,
+        "predicted_entities": n_pred,
+        "strict": _prf(strict_tp, n_pred, strict_tp, n_gold),
+        "overlap": _prf(overlap_pred, n_pred, overlap_gold, n_gold),
+        "per_label": {
+            label: {**_prf(tp, pred, tp, total), "gold": total, "predicted": pred}
+            for label, (tp, pred, total) in sorted(per_label.items())
+        },
+    }
+
+
+def _stage_result(samples_ms: List[float], total_s: float, n: int, chars: int) -> Dict[str, float]:
+    result = {"samples": n, "total_s": round(total_s, 3)}
+    result.update({k: round(v, 3) for k, v in summarize(samples_ms).items()})
+    result["per_s"] = round(n / total_s, 1) if total_s else 0.0
+    result["chars_per_s"] = round(chars / total_s, 1) if total_s else 0.0
+    return result
+
+
+def run_benchmark(
+    samples: List[Tuple[str, List[Span]]],
+    stages: Sequence[str],
+    fusion_mode: Optional[str] = None,
+    batch_size: int = NER_BATCH_MAX_SIZE,
+    use_cache: bool = False,
+) -> Tuple[Dict[str, Dict[str, float]], List[List[Span]]]:
+    """단계별 지연 시간과 (단계별 실행으로 얻은) 예측 엔티티 목록을 반환합니다."""
+    active = masking_service._active_config(fusion_mode)
+    locale, mode = active[3], active[-1]
+    texts = [text for text, _ in samples]
+    chars = sum(len(t) for t in texts)
+    timings: Dict[str, List[float]] = {s: [] for s in ("numeric_ner", "presidio", "fusion", "render")}
+    predictions: List[List[Span]] = []
+
+    def timed(stage: str, fn):
+        started = time.perf_counter()
+        value = fn()
+        timings[stage].append((time.perf_counter() - started) * 1000)
+        return value
+
+    results: Dict[str, Dict[str, float]] = {}
+    staged = [s for s in ("numeric_ner", "presidio", "fusion", "render") if s in stages]
+    if staged:
+        for text in texts:
+            local = [] if DISABLE_LOCAL_NER else timed("numeric_ner", lambda: run_numeric_pipeline(text))
+            rules = [] if DISABLE_PRESIDIO else timed("presidio", lambda: analyze_with_presidio(text))
+            merged = timed("fusion", lambda: fuse_and_resolve(local, rules, mode=mode))
+            timed("render", lambda: masking_service._mask_from_results(text, merged, locale=locale))
+            predictions.append([(r.start, r.end, _label(r.entity_type)) for r in merged])
+        for stage in staged:
+            if timings[stage]:
+                total_s = sum(timings[stage]) / 1000
+                results[stage] = _stage_result(timings[stage], total_s, len(timings[stage]), chars)
+
+    if "end_to_end" in stages:
+        if not use_cache:
+            masking_service._get_result_cache().clear()
+        samples_ms: List[float] = []
+        started_all = time.perf_counter()
+        for text in texts:
+            started = time.perf_counter()
+            masking_service.mask_text_with_models(text, fusion_mode=fusion_mode)
+            samples_ms.append((time.perf_counter() - started) * 1000)
+        results["end_to_end"] = _stage_result(samples_ms, time.perf_counter() - started_all, len(texts), chars)
+
+    if "batch" in stages:
+        if not use_cache:
+            masking_service._get_result_cache().clear()
+        samples_ms = []
+        size = max(1, batch_size)
+        started_all = time.perf_counter()
+        for i in range(0, len(texts), size):
+            started = time.perf_counter()
+            masking_service.mask_texts_with_models(texts[i : i + size], fusion_mode=fusion_mode)
+            # 배치 지연을 문장 수로 나눠 문장당 지연으로 기록
+            chunk = len(texts[i : i + size])
+            samples_ms.extend([(time.perf_counter() - started) * 1000 / chunk] * chunk)
+        results["batch"] = _stage_result(samples_ms, time.perf_counter() - started_all, len(texts), chars)
+    return results, predictions
+
+
+def compare_with_baseline(report: Dict, baseline: Dict) -> None:
+    """기준 보고서 대비 지연 시간/처리량/F1 변화를 출력합니다."""
+    rows = []
+    for stage, current in report["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if not previous:
+            continue
+        rows.append(
+            {
+                "stage": stage,
+                "p50_ms": f"{previous['p50_ms']:.3f} → {current['p50_ms']:.3f}",
+                "p95_ms": f"{previous['p95_ms']:.3f} → {current['p95_ms']:.3f}",
+                "p99_ms": f"{previous['p99_ms']:.3f} → {current['p99_ms']:.3f}",
+                "per_s": f"{previous['per_s']} → {current['per_s']}",
+                "speedup": round(current["per_s"] / previous["per_s"], 2) if previous["per_s"] else None,
+            }
+        )
+    print("\n[기준 대비]")
+    print_table(rows, ["stage", "p50_ms", "p95_ms", "p99_ms", "per_s", "speedup"])
+    for kind in ("strict", "overlap"):
+        old = baseline.get("accuracy", {}).get(kind, {}).get("f1")
+        new = report.get("accuracy", {}).get(kind, {}).get("f1")
+        if old is not None and new is not None:
+            print(f"F1({kind}): {old:.4f} → {new:.4f} ({new - old:+.4f})")
+    old_peak = baseline.get("memory", {}).get("peak_rss_mb")
+    if old_peak:
+        print(f"최대 RSS: {old_peak:.1f}MB → {report['memory']['peak_rss_mb']:.1f}MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default=DEFAULT_DATASET, help="코퍼스 경로 (data.jsonl / data_dist.jsonl)")
+    parser.add_argument("--limit", type=int, default=2000, help="사용할 문장 수 (0이면 전체)")
+    parser.add_argument("--stages", default=",".join(STAGES), help="쉼표로 구분한 단계 목록")
+    parser.add_argument("--fusion-mode", default=None, choices=FUSION_MODES, help="기본값은 FUSION_MODE")
+    parser.add_argument("--batch-size", type=int, default=NER_BATCH_MAX_SIZE, help="batch 단계의 배치 크기")
+    parser.add_argument("--cache", action="store_true", help="마스킹 결과 캐시를 비우지 않고 측정")
+    parser.add_argument("--output", default="", help="JSON 보고서 저장 경로")
+    parser.add_argument("--baseline", default="", help="비교할 이전 JSON 보고서")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"알 수 없는 단계: {', '.join(unknown)} (가능: {', '.join(STAGES)})")
+
+    samples = load_corpus(args.dataset, args.limit)
+    if not samples:
+        print(f"{args.dataset}에서 문장을 읽지 못했습니다.", file=sys.stderr)
+        sys.exit(1)
+    print(f"문장 {len(samples)}개 ({args.dataset})")
+
+    rss_before = rss_mb()
+    warmup = run_warmup()
+    rss_after_warmup = rss_mb()
+
+    stage_results, predictions = run_benchmark(
+        samples, stages, fusion_mode=args.fusion_mode, batch_size=args.batch_size, use_cache=args.cache
+    )
+    active = masking_service._active_config(args.fusion_mode)
+    config_names = (
+        "numeric_model_path",
+        "disable_local_ner",
+        "disable_presidio",
+        "default_locale",
+        "presidio_mode",
+        "rule_engine",
+        "ner_backend",
+        "ner_quantize",
+        "fusion_mode",
+    )
+    report: Dict[str, object] = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "dataset": os.path.relpath(os.path.abspath(args.dataset), REPO_ROOT),
+        "samples": len(samples),
+        "config": dict(zip(config_names, active)),
+        "warmup": warmup,
+        "stages": stage_results,
+        "memory": {
+            "rss_before_models_mb": round(rss_before, 1),
+            "rss_after_warmup_mb": round(rss_after_warmup, 1),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        },
+    }
+    if predictions:
+        report["accuracy"] = score([gold for _, gold in samples], predictions)
+
+    print_table(
+        [{"stage": stage, **result} for stage, result in stage_results.items()],
+        ["stage", "samples", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "per_s", "chars_per_s"],
+    )
+    memory = report["memory"]
+    print(
+        f"RSS: 로딩 전 {memory['rss_before_models_mb']}MB, 예열 후 {memory['rss_after_warmup_mb']}MB, "
+        f"최대 {memory['peak_rss_mb']}MB"
+    )
+    if "accuracy" in report:
+        accuracy = report["accuracy"]
+        print(
+            f"엔티티 {accuracy['predicted_entities']}개 예측 / 정답 {accuracy['gold_entities']}개, "
+            f"strict P/R/F1 {accuracy['strict']['precision']}/{accuracy['strict']['recall']}/{accuracy['strict']['f1']}, "
+            f"overlap P/R/F1 {accuracy['overlap']['precision']}/{accuracy['overlap']['recall']}/{accuracy['overlap']['f1']}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"보고서 저장: {args.output}")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            compare_with_baseline(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""`fuse_and_resolve` 포함 관계 제거 단계: 기존 이중 루프 vs 정렬 후 1회 스캔.
+
+후보 수에 따른 실행 시간을 비교합니다.
+두 구현의 결과가 같은지는 Server/tests/test_fusion.py에서 확인합니다.
+
+실행 예:
+    python -m Server.bench.bench_fusion --sizes 100,1000,10000
+"""
+
+import argparse
+import random
+from typing import List
+
+try:
+    from ..nlp.fusion import RULE_SOURCES, _longer_first_key, fuse_and_resolve
+    from ..nlp.spans import Span
+    from .common import print_table, time_calls
+except Exception:  # pragma: no cover
+    from backend.nlp.fusion import RULE_SOURCES, _longer_first_key, fuse_and_resolve  # type: ignore
+    from backend.nlp.spans import Span  # type: ignore
+    from backend.bench.common import print_table, time_calls  # type: ignore
+
+_SOURCES = ("NumericRecognizer", "TextRecognizer") + RULE_SOURCES
+
+
+def reference_fuse_and_resolve(results_local: List[Span], results_rules: List[Span] = None) -> List[Span]:
+    """변경 전 O(n²) 구현 (비교 기준)."""
+    combined = list(results_local)
+    if results_rules:
+        combined.extend(results_rules)
+    if not combined:
+        return []
+    indices_to_discard = set()
+    for i, a in enumerate(combined):
+        if a.source not in RULE_SOURCES:
+            continue
+        for j, b in enumerate(combined):
+            if i == j:
+                continue
+            if b.start <= a.start and b.end >= a.end:
+                indices_to_discard.add(i)
+                break
+    filtered = [r for idx, r in enumerate(combined) if idx not in indices_to_discard]
+    filtered.sort(key=_longer_first_key)
+    final: List[Span] = []
+    last_end = -1
+    for res in filtered:
+        if res.start >= last_end:
+            final.append(res)
+            last_end = res.end
+    return final
+
+
+def random_spans(rng: random.Random, n: int, text_len: int, max_len: int = 20) -> List[Span]:
+    """무작위 구간. (entity_type에 일련번호)"""
+    spans = []
+    for k in range(n):
+        start = rng.randrange(text_len)
+        spans.append(Span(f"X{k}", start, start + rng.randint(1, max_len), 1.0, rng.choice(_SOURCES)))
+    return spans
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,5000,20000", help="쉼표로 구분한 후보 구간 수")
+    parser.add_argument("--reference-max", type=int, default=5000, help="기존 구현을 측정할 최대 후보 수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = []
+    for n in (int(x) for x in args.sizes.split(",")):
+        # 실제 PDF처럼 CVC 등 규칙 결과가 대부분인 분포
+        spans = random_spans(rng, n, text_len=n * 8)
+        impls = {"sweep": fuse_and_resolve}
+        if n <= args.reference_max:
+            impls = {"nested_loop": reference_fuse_and_resolve, **impls}
+        repeat = max(1, 20000 // n)
+        baseline = None
+        for name, fn in impls.items():
+            stats = time_calls(lambda: fn(spans), repeat=repeat, warmup=0)
+            if baseline is None:
+                baseline = stats["mean_ms"]
+            rows.append(
+                {
+                    "spans": n,
+                    "impl": name,
+                    "repeat": repeat,
+                    "mean_ms": stats["mean_ms"],
+                    "p95_ms": stats["p95_ms"],
+                    "speedup": baseline / stats["mean_ms"] if stats["mean_ms"] else 0.0,
+                }
+            )
+    print_table(rows, ["spans", "impl", "repeat", "mean_ms", "p95_ms", "speedup"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""NER 백엔드 비교: torch 파이프라인 vs ONNX Runtime.
+
+같은 입력에 대해 두 백엔드의 결과(엔티티 종류/위치, 점수 차이)가 같은지 확인하고
+입력 길이별 지연 시간을 비교합니다. 먼저 `python -m Server.tools.export_onnx`로 내보내야 합니다.
+
+실행 예:
+    python -m Server.bench.bench_onnx --model numeric --repeat 20
+"""
+
+import argparse
+import sys
+from typing import List
+
+try:
+    from ..config import NUMERIC_MODEL_PATH, TEXT_MODEL_PATH
+    from ..nlp import local_pipeline
+    from ..nlp.onnx_backend import load_onnx_pipeline
+    from ..nlp.spans import Span
+    from .common import SAMPLE_TEXTS, make_text, print_table, time_calls
+except Exception:  # pragma: no cover
+    from backend.config import NUMERIC_MODEL_PATH, TEXT_MODEL_PATH  # type: ignore
+    from backend.nlp import local_pipeline  # type: ignore
+    from backend.nlp.onnx_backend import load_onnx_pipeline  # type: ignore
+    from backend.nlp.spans import Span  # type: ignore
+    from backend.bench.common import SAMPLE_TEXTS, make_text, print_table, time_calls  # type: ignore
+
+
+def compare(expected: List[Span], actual: List[Span], score_tol: float) -> List[str]:
+    """두 결과 목록의 차이를 설명하는 문자열 목록. (같으면 빈 목록)"""
+    problems = []
+    key = lambda r: (r.start, r.end, r.entity_type)  # noqa: E731
+    if [key(r) for r in expected] != [key(r) for r in actual]:
+        problems.append(f"엔티티 불일치: {[key(r) for r in expected]} != {[key(r) for r in actual]}")
+    else:
+        for e, a in zip(expected, actual):
+            if abs(e.score - a.score) > score_tol:
+                problems.append(f"점수 차이 {abs(e.score - a.score):.2e} at {key(e)}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="numeric", help="numeric | text | 모델 폴더 경로")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--score-tol", type=float, default=1e-3, help="허용 점수 차이")
+    args = parser.parse_args()
+
+    model_path = {"numeric": NUMERIC_MODEL_PATH, "text": TEXT_MODEL_PATH}.get(args.model, args.model)
+    torch_pipe = local_pipeline.pipeline(
+        "ner",
+        model=local_pipeline.AutoModelForTokenClassification.from_pretrained(model_path),
+        tokenizer=local_pipeline.AutoTokenizer.from_pretrained(model_path),
+        aggregation_strategy="simple",
+        device=-1,
+    )
+    onnx_pipe = load_onnx_pipeline(model_path)
+    backends = {"torch": torch_pipe, "onnx": onnx_pipe}
+
+    inputs = {f"sample{i}": t for i, t in enumerate(SAMPLE_TEXTS)}
+    inputs["512B"] = make_text(512)
+    inputs["batch8"] = SAMPLE_TEXTS * 3
+
+    rows = []
+    failures = 0
+    for name, text in inputs.items():
+        outputs = {b: pipe(text) for b, pipe in backends.items()}
+        batched = isinstance(text, list)
+        expected_list = outputs["torch"] if batched else [outputs["torch"]]
+        actual_list = outputs["onnx"] if batched else [outputs["onnx"]]
+        for expected, actual in zip(expected_list, actual_list):
+            problems = compare(
+                local_pipeline._convert(expected, "x"), local_pipeline._convert(actual, "x"), args.score_tol
+            )
+            if problems:
+                failures += 1
+                print(f"[{name}] " + "; ".join(problems[:3]), file=sys.stderr)
+        baseline = None
+        for backend, pipe in backends.items():
+            stats = time_calls(lambda: pipe(text), repeat=args.repeat)
+            if baseline is None:
+                baseline = stats["mean_ms"]
+            rows.append(
+                {
+                    "input": name,
+                    "backend": backend,
+                    "mean_ms": stats["mean_ms"],
+                    "p50_ms": stats["p50_ms"],
+                    "p95_ms": stats["p95_ms"],
+                    "speedup": baseline / stats["mean_ms"] if stats["mean_ms"] else 0.0,
+                }
+            )
+    print_table(rows, ["input", "backend", "mean_ms", "p50_ms", "p95_ms", "speedup"])
+    print(f"결과 일치 확인: 불일치 {failures}건")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
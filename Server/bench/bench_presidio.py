@@ -0,0 +1,88 @@
+"""Presidio 실행 방식별 지연 시간 비교.
+
+- legacy: en 분석 + ko(KR_RRN) 분석 + 커스텀 인식기 4개 개별 실행
+- single_pass: 모든 패턴 인식기를 한 레지스트리에 등록해 NLP 엔진 없이 한 번 분석
+
+병합(`fuse_and_resolve`) 후 legacy가 가리는 구간을 single_pass도 모두 가리는지 확인합니다.
+(single_pass가 더 많이 찾는 것은 허용, 빠뜨린 구간이 있으면 실패)
+
+실행 예:
+    python -m Server.bench.bench_presidio --repeat 200
+"""
+
+import argparse
+import sys
+from typing import List, Tuple
+
+try:
+    from ..nlp import presidio_adapter
+    from ..nlp.fusion import fuse_and_resolve
+    from .common import SAMPLE_TEXTS, make_text, print_table, time_calls
+except Exception:  # pragma: no cover
+    from backend.nlp import presidio_adapter  # type: ignore
+    from backend.nlp.fusion import fuse_and_resolve  # type: ignore
+    from backend.bench.common import SAMPLE_TEXTS, make_text, print_table, time_calls  # type: ignore
+
+# 내장 인식기와 커스텀 인식기가 같은 구간을 내는 문장 (전화번호=AN, 주민번호=KR_RRN/SSN)
+PARITY_TEXT = "홍길동 010-1234-5678 주민 800101-1234567"
+
+
+def missed_spans(text: str) -> List[Tuple[int, int]]:
+    """legacy 병합 결과 중 single_pass 병합 결과의 어떤 구간에도 덮이지 않는 구간."""
+    legacy = fuse_and_resolve([], presidio_adapter._analyze_legacy(text))
+    single = fuse_and_resolve([], presidio_adapter._analyze_single_pass(text))
+    return [
+        (r.start, r.end)
+        for r in legacy
+        if not any(s.start <= r.start and r.end <= s.end for s in single)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=100, help="입력별 반복 횟수")
+    args = parser.parse_args()
+
+    inputs = {
+        "parity": PARITY_TEXT,
+        "short": SAMPLE_TEXTS[0],
+        "1KB": make_text(1024),
+        "10KB": make_text(10 * 1024),
+    }
+    modes = {
+        "legacy": presidio_adapter._analyze_legacy,
+        "single_pass": presidio_adapter._analyze_single_pass,
+    }
+    # 엔진 생성 비용은 측정에서 제외
+    presidio_adapter._get_engine()
+    presidio_adapter._get_single_pass_engine()
+
+    rows = []
+    failures = 0
+    for input_name, text in inputs.items():
+        missed = missed_spans(text)
+        if missed:
+            failures += 1
+            print(f"[{input_name}] single_pass가 가리지 않는 구간: {[text[s:e] for s, e in missed[:5]]}", file=sys.stderr)
+        baseline = None
+        for mode_name, fn in modes.items():
+            stats = time_calls(lambda: fn(text), repeat=args.repeat)
+            if baseline is None:
+                baseline = stats["mean_ms"]
+            rows.append(
+                {
+                    "input": input_name,
+                    "mode": mode_name,
+                    "entities": len(fn(text)),
+                    **stats,
+                    "speedup": baseline / stats["mean_ms"] if stats["mean_ms"] else 0.0,
+                }
+            )
+    print_table(rows, ["input", "mode", "entities", "mean_ms", "p50_ms", "p95_ms", "min_ms", "speedup"])
+    print(f"legacy 대비 누락 확인: 불일치 {failures}건")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""마스킹 결과 렌더링: 엔티티마다 문자열을 다시 만드는 기존 방식 vs 조각 목록 1회 결합.
+
+긴 텍스트에 엔티티가 많을 때의 시간을 비교하고 두 방식의 출력이 같은지 확인합니다.
+
+실행 예:
+    python -m Server.bench.bench_render --sizes 10KB,1MB
+"""
+
+import argparse
+import random
+import sys
+from typing import Dict, List, Tuple
+
+try:
+    from ..nlp.label_mapping import to_display_label, to_standard_label
+    from ..nlp.spans import Span
+    from ..services.masking_service import _mask_from_results
+    from .common import make_text, parse_size, print_table, time_calls
+except Exception:  # pragma: no cover
+    from backend.nlp.label_mapping import to_display_label, to_standard_label  # type: ignore
+    from backend.nlp.spans import Span  # type: ignore
+    from backend.services.masking_service import _mask_from_results  # type: ignore
+    from backend.bench.common import make_text, parse_size, print_table, time_calls  # type: ignore
+
+_LABELS = ("PS", "PN", "AN", "SSN", "CVC", "PPS", "EMAIL_ADDRESS", "UNKNOWN_LABEL")
+
+
+def reference_mask_from_results(text: str, results: List[Span], locale: str = "ko") -> Tuple[str, List[Dict]]:
+    """변경 전 구현 (비교 기준)."""
+    masked = text
+    masked_entities: List[Dict] = []
+    for r in sorted(results, key=lambda x: x.start, reverse=True):
+        entity_text = text[r.start : r.end]
+        code = to_standard_label(r.entity_type) or r.entity_type
+        display = to_display_label(code, locale=locale)
+        masked = masked[: r.start] + f"[{display}]" + masked[r.end :]
+        masked_entities.append({"entity": entity_text, "label": display})
+    seen = set()
+    uniq: List[Dict] = []
+    for item in masked_entities:
+        key = (item["entity"], item["label"])
+        if key not in seen:
+            seen.add(key)
+            uniq.append(item)
+    return masked, uniq
+
+
+def random_entities(rng: random.Random, text_len: int, count: int) -> List[Span]:
+    """겹치지 않는 엔티티 구간 (fuse_and_resolve 결과와 같은 형태)."""
+    starts = sorted(rng.sample(range(0, text_len, 8), min(count, text_len // 8)))
+    return [Span(rng.choice(_LABELS), s, s + rng.randint(1, 7), 1.0, "x") for s in starts]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10KB,100KB,1MB", help="쉼표로 구분한 입력 크기")
+    parser.add_argument("--density", type=float, default=0.02, help="글자당 엔티티 수")
+    parser.add_argument("--locale", default="ko")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    rows = []
+    mismatches = 0
+    for label in args.sizes.split(","):
+        size = parse_size(label)
+        text = make_text(size)
+        entities = random_entities(rng, len(text), int(len(text) * args.density))
+        impls = {
+            "slicing": lambda: reference_mask_from_results(text, entities, args.locale),
+            "segments": lambda: _mask_from_results(text, entities, args.locale),
+        }
+        expected = impls["slicing"]()
+        if impls["segments"]() != expected:
+            mismatches += 1
+            print(f"[{label}] 출력이 다릅니다.", file=sys.stderr)
+        repeat = max(1, 2_000_000 // max(size, 1) // 10)
+        baseline = None
+        for name, fn in impls.items():
+            stats = time_calls(fn, repeat=repeat, warmup=0)
+            if baseline is None:
+                baseline = stats["mean_ms"]
+            rows.append(
+                {
+                    "size": label.strip(),
+                    "entities": len(entities),
+                    "impl": name,
+                    "mean_ms": stats["mean_ms"],
+                    "speedup": baseline / stats["mean_ms"] if stats["mean_ms"] else 0.0,
+                }
+            )
+    print_table(rows, ["size", "entities", "impl", "mean_ms", "speedup"])
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""커스텀 규칙 탐지: Presidio PatternRecognizer 4개 개별 실행 vs 통합 정규식 1회 스캔.
+
+입력 크기별(기본 1KB/100KB/10MB) 지연 시간과 처리량을 비교하고,
+두 방식의 `fuse_and_resolve` 결과가 같은지 확인합니다.
+
+실행 예:
+    python -m Server.bench.bench_rule_engine --sizes 1KB,100KB,10MB
+"""
+
+import argparse
+import sys
+from typing import List
+
+try:
+    from ..nlp import presidio_adapter
+    from ..nlp.fusion import fuse_and_resolve
+    from ..nlp.rule_engine import scan_rules
+    from ..nlp.spans import Span
+    from .common import make_text, parse_size, print_table, time_calls
+except Exception:  # pragma: no cover
+    from backend.nlp import presidio_adapter  # type: ignore
+    from backend.nlp.fusion import fuse_and_resolve  # type: ignore
+    from backend.nlp.rule_engine import scan_rules  # type: ignore
+    from backend.nlp.spans import Span  # type: ignore
+    from backend.bench.common import make_text, parse_size, print_table, time_calls  # type: ignore
+
+
+def _presidio_rules(text: str) -> List[Span]:
+    results = []
+    for recognizer in presidio_adapter._get_rule_recognizers():
+        results.extend(recognizer.analyze(text=text, entities=recognizer.supported_entities))
+    return presidio_adapter._to_spans(results)
+
+
+def _spans(results: List[Span]) -> List[tuple]:
+    return sorted((r.start, r.end, r.entity_type, r.source) for r in results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1KB,100KB,10MB", help="쉼표로 구분한 입력 크기")
+    parser.add_argument("--repeat", type=int, default=200, help="1KB 기준 반복 횟수 (큰 입력은 비례해 줄임)")
+    parser.add_argument(
+        "--presidio-max-size",
+        default="1MB",
+        help="Presidio를 측정할 최대 입력 크기 (중복 제거가 O(n²)라 10MB는 수십 분 걸림)",
+    )
+    args = parser.parse_args()
+
+    engines = {"regex": scan_rules}
+    if presidio_adapter._get_rule_recognizers():
+        engines = {"presidio": _presidio_rules, **engines}
+    else:
+        print("presidio_analyzer가 없어 통합 정규식만 측정합니다.", file=sys.stderr)
+
+    presidio_max_size = parse_size(args.presidio_max_size)
+    rows = []
+    mismatches = 0
+    for label in args.sizes.split(","):
+        size = parse_size(label)
+        text = make_text(size)
+        repeat = max(1, args.repeat * 1024 // max(size, 1))
+        outputs = {}
+        baseline = None
+        for name, fn in engines.items():
+            if name == "presidio" and size > presidio_max_size:
+                continue
+            outputs[name] = fn(text)
+            stats = time_calls(lambda: fn(text), repeat=repeat, warmup=0)
+            if baseline is None:
+                baseline = stats["mean_ms"]
+            rows.append(
+                {
+                    "size": label.strip(),
+                    "engine": name,
+                    "repeat": repeat,
+                    "entities": len(outputs[name]),
+                    "mean_ms": stats["mean_ms"],
+                    "p95_ms": stats["p95_ms"],
+                    "MB/s": (size / 1024 / 1024) / (stats["mean_ms"] / 1000) if stats["mean_ms"] else 0.0,
+                    "speedup": baseline / stats["mean_ms"] if stats["mean_ms"] else 0.0,
+                }
+            )
+        if "presidio" in outputs:
+            fused = {name: _spans(fuse_and_resolve([], out)) for name, out in outputs.items()}
+            if fused["presidio"] != fused["regex"]:
+                mismatches += 1
+                print(f"[{label}] fuse_and_resolve 결과가 다릅니다.", file=sys.stderr)
+    print_table(rows, ["size", "engine", "repeat", "entities", "mean_ms", "p95_ms", "MB/s", "speedup"])
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
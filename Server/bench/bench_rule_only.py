@@ -0,0 +1,146 @@
+"""규칙 전용 모드(DISABLE_LOCAL_NER=1) 요청 경로: Presidio 단일 패스 vs 압축 스캐너(RULE_ENGINE=compact).
+
+입력 크기별로 탐지 → 병합 → 치환 한 번에 걸리는 시간과 tracemalloc 기준 요청당
+최대 메모리/할당 블록 수를 비교하고, 두 경로가 찾은 구간이 같은지 확인합니다.
+
+알려진 차이는 맞춘 뒤 비교하며, 그 밖의 차이가 있으면 종료 코드 1로 끝납니다.
+- Presidio 내장 전화번호 인식기는 "(010-3333-4444"처럼 여는 괄호까지 잡음 → 괄호를 빼고 비교
+- 전화번호 형식 숫자("010-1234-5678", "01-2345-6789")는 계좌번호 패턴에도 맞아, Presidio 경로는
+  계좌번호(AN), 압축 경로는 전화번호로 고르는 등 경로마다 라벨이 다름 → 둘을 같은 라벨로 보고 비교
+
+실행 예:
+    python -m Server.bench.bench_rule_only --sizes 1KB,100KB,1MB
+"""
+
+import argparse
+import sys
+import tracemalloc
+from typing import Callable, Dict, List, Set, Tuple
+
+try:
+    from ..nlp import presidio_adapter
+    from ..nlp.fusion import fuse_and_resolve, resolve_indices
+    from ..nlp.rule_engine import KIND_ENTITY, KIND_SCORE, scan_compact
+    from ..services.masking_service import _mask_compact, _mask_from_results
+    from .common import make_text, parse_size, print_table, time_calls
+except Exception:  # pragma: no cover
+    from backend.nlp import presidio_adapter  # type: ignore
+    from backend.nlp.fusion import fuse_and_resolve, resolve_indices  # type: ignore
+    from backend.nlp.rule_engine import KIND_ENTITY, KIND_SCORE, scan_compact  # type: ignore
+    from backend.services.masking_service import _mask_compact, _mask_from_results  # type: ignore
+    from backend.bench.common import make_text, parse_size, print_table, time_calls  # type: ignore
+
+
+# 경로마다 라벨이 갈리는 전화번호/계좌번호는 같은 라벨로 봄 (모듈 docstring 참고)
+_PHONE_OR_ACCOUNT = ("PHONE_NUMBER", "AN")
+Found = Set[Tuple[int, int, str]]
+
+
+def _normalize(text: str, found: List[Tuple[int, int, str]]) -> Found:
+    """알려진 차이(전화번호의 여는 괄호, 전화번호/계좌번호 라벨)를 맞춘 (시작, 끝, 라벨) 집합."""
+    normalized: Found = set()
+    for start, end, label in found:
+        if label == "PHONE_NUMBER" and text.startswith("(", start):
+            start += 1
+        if label in _PHONE_OR_ACCOUNT:
+            label = "/".join(_PHONE_OR_ACCOUNT)
+        normalized.add((start, end, label))
+    return normalized
+
+
+def _presidio_found(text: str) -> Found:
+    merged = fuse_and_resolve([], presidio_adapter._analyze_single_pass(text))
+    return _normalize(text, [(r.start, r.end, r.entity_type) for r in merged])
+
+
+def _compact_found(text: str) -> Found:
+    matches = scan_compact(text)
+    selected = resolve_indices(matches.starts, matches.ends, matches.kinds, KIND_SCORE)
+    return _normalize(
+        text, [(matches.starts[i], matches.ends[i], KIND_ENTITY[matches.kinds[i]]) for i in selected]
+    )
+
+
+def _presidio_path(text: str) -> Tuple[str, List[Dict]]:
+    merged = fuse_and_resolve([], presidio_adapter._analyze_single_pass(text))
+    return _mask_from_results(text, merged)
+
+
+def _compact_path(text: str) -> Tuple[str, List[Dict]]:
+    matches = scan_compact(text)
+    selected = resolve_indices(matches.starts, matches.ends, matches.kinds, KIND_SCORE)
+    return _mask_compact(text, matches, selected, "ko")
+
+
+def measure_alloc(fn: Callable[[], object]) -> Dict[str, float]:
+    """fn 1회 실행의 최대 추가 메모리(KB)와 할당 블록 수."""
+    tracemalloc.start()
+    try:
+        before_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        del result
+    finally:
+        tracemalloc.stop()
+    return {"peak_kb": (peak - base) / 1024, "blocks": after_blocks - before_blocks}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1KB,100KB,1MB", help="쉼표로 구분한 입력 크기")
+    parser.add_argument("--repeat", type=int, default=200, help="1KB 기준 반복 횟수 (큰 입력은 비례해 줄임)")
+    args = parser.parse_args()
+
+    paths = {"compact": _compact_path}
+    if presidio_adapter._get_single_pass_engine() is not None:
+        paths = {"presidio": _presidio_path, **paths}
+    else:
+        print("presidio_analyzer가 없어 압축 경로만 측정합니다.", file=sys.stderr)
+
+    rows = []
+    mismatches = 0
+    for label in args.sizes.split(","):
+        size = parse_size(label)
+        text = make_text(size)
+        repeat = max(1, args.repeat * 1024 // max(size, 1))
+        outputs = {}
+        baseline = None
+        for name, fn in paths.items():
+            outputs[name] = fn(text)
+            stats = time_calls(lambda: fn(text), repeat=repeat, warmup=0)
+            alloc = measure_alloc(lambda: fn(text))
+            if baseline is None:
+                baseline = stats["mean_ms"]
+            rows.append(
+                {
+                    "size": label.strip(),
+                    "path": name,
+                    "repeat": repeat,
+                    "entities": len(outputs[name][1]),
+                    "mean_ms": stats["mean_ms"],
+                    "p95_ms": stats["p95_ms"],
+                    "peak_kb": alloc["peak_kb"],
+                    "live_blocks": alloc["blocks"],
+                    "speedup": baseline / stats["mean_ms"] if stats["mean_ms"] else 0.0,
+                }
+            )
+        if "presidio" in outputs:
+            presidio_found, compact_found = _presidio_found(text), _compact_found(text)
+            if presidio_found != compact_found:
+                mismatches += 1
+                only_presidio = sorted(presidio_found - compact_found)[:5]
+                only_compact = sorted(compact_found - presidio_found)[:5]
+                print(
+                    f"[{label}] 탐지 구간이 다릅니다. presidio만: {only_presidio} / compact만: {only_compact}",
+                    file=sys.stderr,
+                )
+    print_table(rows, ["size", "path", "repeat", "entities", "mean_ms", "p95_ms", "peak_kb", "live_blocks", "speedup"])
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
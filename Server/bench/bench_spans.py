@@ -0,0 +1,262 @@
+"""엔티티 구간 표현: 문자열 키 dict vs Span(NamedTuple).
+
+엔티티가 빽빽한 문서에서 변환(모델 출력 → 공통 형식) → 병합 → 치환 전체의 시간과
+tracemalloc 기준 최대 메모리, 엔티티당 메모리를 비교하고 두 방식의 출력이 같은지 확인합니다.
+모델 대신 stub 파이프라인(정규식)의 출력을 숫자 NER 결과로 씁니다.
+dict 쪽은 Span으로 바꾸기 전의 변환/병합/치환 코드를 그대로 옮겨 둔 것입니다. (greedy 병합만)
+
+실행 예:
+    python -m Server.bench.bench_spans --sizes 10KB,100KB,1MB
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:
+    from ..nlp.fusion import RULE_SOURCES, fuse_and_resolve
+    from ..nlp.label_mapping import display_table, to_display_label, to_standard_label
+    from ..nlp.local_pipeline import _convert
+    from ..nlp.rule_engine import scan_rules
+    from ..nlp.spans import spans_to_dicts
+    from ..nlp.stub_backend import StubNerPipeline
+    from ..services.masking_service import _mask_from_results
+    from .common import make_text, parse_size, print_table, time_calls
+except Exception:  # pragma: no cover
+    from backend.nlp.fusion import RULE_SOURCES, fuse_and_resolve  # type: ignore
+    from backend.nlp.label_mapping import display_table, to_display_label, to_standard_label  # type: ignore
+    from backend.nlp.local_pipeline import _convert  # type: ignore
+    from backend.nlp.rule_engine import scan_rules  # type: ignore
+    from backend.nlp.spans import spans_to_dicts  # type: ignore
+    from backend.nlp.stub_backend import StubNerPipeline  # type: ignore
+    from backend.services.masking_service import _mask_from_results  # type: ignore
+    from backend.bench.common import make_text, parse_size, print_table, time_calls  # type: ignore
+
+# 식별자만 이어 붙인 문장 (글자당 엔티티 수가 예시 문장의 몇 배)
+DENSE_TEXTS = [
+    "주민 900101-1234567 카드 4512-3456-7890-1234 CVC 789 폰 010-1234-5678 계좌 110-123-987654 "
+    "여권 M12345678 메일 hong@samsung.law",
+    "계좌 01-2345-6789 폰 010-3333-4444 주민 970101-2345678 카드 5123-6789-1234-5678 CVC 456",
+]
+
+
+# ---------------------------------------------------------------------------
+# 비교 기준: Span으로 바꾸기 전(dict)의 구현을 그대로 옮김
+# (local_pipeline._convert, fusion의 포함 판정/greedy 선택, masking_service의 치환)
+
+
+def reference_convert(pipeline_outputs, recognizer_name: str) -> List[Dict]:
+    results: List[Dict] = []
+    for ent in pipeline_outputs:
+        results.append(
+            {
+                "entity_type": ent.get("entity_group"),
+                "start": int(ent.get("start")),
+                "end": int(ent.get("end")),
+                "score": float(ent.get("score", 0.0)),
+                "source": recognizer_name,
+            }
+        )
+    return results
+
+
+def _reference_greedy_indices(starts: Sequence[int], ends: Sequence[int], order: Iterable[int]) -> List[int]:
+    # 시작 오름차순, 길이 내림차순 정렬 후 겹치지 않는 결과를 앞에서부터 선택
+    final: List[int] = []
+    last_end = -1
+    for i in sorted(order, key=lambda i: (starts[i], starts[i] - ends[i])):
+        if starts[i] >= last_end:
+            final.append(i)
+            last_end = ends[i]
+    return final
+
+
+def _reference_contained(starts: Sequence[int], ends: Sequence[int], candidates: Iterable[int]) -> Set[int]:
+    wanted = set(candidates)
+    if not wanted:
+        return set()
+    order = sorted(range(len(starts)), key=lambda i: (starts[i], -ends[i]))
+    discard: Set[int] = set()
+    prefix_max_end = None
+    pos = 0
+    while pos < len(order):
+        start = starts[order[pos]]
+        group_end = pos
+        while group_end < len(order) and starts[order[group_end]] == start:
+            group_end += 1
+        for k in range(pos, group_end):
+            i = order[k]
+            if i not in wanted:
+                continue
+            end = ends[i]
+            if (
+                (prefix_max_end is not None and prefix_max_end >= end)
+                or k > pos
+                or (k + 1 < group_end and ends[order[k + 1]] == end)
+            ):
+                discard.add(i)
+        group_max_end = ends[order[pos]]
+        if prefix_max_end is None or group_max_end > prefix_max_end:
+            prefix_max_end = group_max_end
+        pos = group_end
+    return discard
+
+
+def _reference_contained_indices(spans: List[Dict], candidates: Iterable[int]) -> Set[int]:
+    return _reference_contained([s["start"] for s in spans], [s["end"] for s in spans], candidates)
+
+
+def _reference_select_greedy(filtered: List[Dict]) -> List[Dict]:
+    starts = [r["start"] for r in filtered]
+    ends = [r["end"] for r in filtered]
+    return [filtered[i] for i in _reference_greedy_indices(starts, ends, range(len(filtered)))]
+
+
+def reference_fuse_and_resolve(results_local: List[Dict], results_rules: List[Dict] = None) -> List[Dict]:
+    combined = list(results_local)
+    if results_rules:
+        combined.extend(results_rules)
+
+    if not combined:
+        return []
+
+    # 1) 규칙 기반 결과가 다른 결과에 완전히 포함되면 제거
+    indices_to_discard = _reference_contained_indices(
+        combined, (i for i, r in enumerate(combined) if r.get("source") in RULE_SOURCES)
+    )
+    filtered = [r for idx, r in enumerate(combined) if idx not in indices_to_discard]
+
+    return _reference_select_greedy(filtered)
+
+
+def _reference_display_label(label: str, table: Dict[str, str], locale: str) -> str:
+    display = table.get(label)
+    if display is None:
+        display = to_display_label(to_standard_label(label) or label, locale=locale)
+    return display
+
+
+def reference_iter_segments(text: str, results: List[Dict], locale: str) -> Iterator[Tuple[str, Optional[Dict]]]:
+    table = display_table(locale)
+    cursor = 0
+    for r in sorted(results, key=lambda x: x["start"]):
+        start, end = r["start"], r["end"]
+        if start < cursor:
+            continue
+        display = _reference_display_label(r["entity_type"], table, locale)
+        if start > cursor:
+            yield text[cursor:start], None
+        yield f"[{display}]", {"entity": text[start:end], "label": display, "start": start, "end": end}
+        cursor = end
+    if cursor < len(text):
+        yield text[cursor:], None
+
+
+def reference_mask_from_results(text: str, results: List[Dict], locale: str = "ko") -> Tuple[str, List[Dict]]:
+    # 조각 목록을 만든 뒤 한 번에 이어 붙임 (엔티티마다 문자열 전체를 복사하지 않음)
+    pieces: List[str] = []
+    masked_entities: List[Dict] = []
+    for piece, entity in reference_iter_segments(text, results, locale):
+        pieces.append(piece)
+        if entity is not None:
+            masked_entities.append({"entity": entity["entity"], "label": entity["label"]})
+    masked = "".join(pieces)
+
+    # 중복 제거(첫 등장 우선, 기존과 같이 뒤쪽 엔티티부터)
+    seen = set()
+    uniq_entities: List[Dict] = []
+    for item in reversed(masked_entities):
+        key = (item["entity"], item["label"])
+        if key in seen:
+            continue
+        seen.add(key)
+        uniq_entities.append(item)
+
+    return masked, uniq_entities
+
+
+# ---------------------------------------------------------------------------
+
+
+def measure_peak_kb(fn: Callable[[], object]) -> Tuple[float, float]:
+    """fn 1회 실행 중 최대 추가 메모리(KB)와 끝난 뒤 결과가 잡고 있는 메모리(KB)."""
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        result = fn()
+        held, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return (peak - base) / 1024, (held - base) / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10KB,100KB,1MB", help="쉼표로 구분한 입력 크기")
+    parser.add_argument("--repeat", type=int, default=200, help="10KB 기준 반복 횟수 (큰 입력은 비례해 줄임)")
+    args = parser.parse_args()
+
+    # 서버(gunicorn.conf.py)처럼 로딩된 모듈 객체를 GC 대상에서 빼 둠.
+    # Span(튜플)은 dict와 달리 생성 즉시 GC 추적 대상이라, 그대로 두면 전체 수집이
+    # torch/transformers 객체까지 훑는 시간이 Span 쪽 측정에만 섞임
+    gc.collect()
+    gc.freeze()
+
+    stub = StubNerPipeline()
+    rows = []
+    mismatches = 0
+    for label in args.sizes.split(","):
+        size = parse_size(label)
+        text = make_text(size, DENSE_TEXTS)
+        # 탐지기 원본 출력은 미리 만들어 두고 변환 이후 단계만 잽니다.
+        ner_raw = stub(text)
+        rules_raw = spans_to_dicts(scan_rules(text))
+        rules_spans = scan_rules(text)
+
+        def dict_path():
+            merged = reference_fuse_and_resolve(reference_convert(ner_raw, "NumericRecognizer"), rules_raw)
+            return reference_mask_from_results(text, merged)
+
+        def span_path():
+            merged = fuse_and_resolve(_convert(ner_raw, "NumericRecognizer"), rules_spans)
+            return _mask_from_results(text, merged)
+
+        paths = {
+            "dict": (dict_path, lambda: reference_convert(ner_raw, "NumericRecognizer")),
+            "span": (span_path, lambda: _convert(ner_raw, "NumericRecognizer")),
+        }
+        outputs = {name: run() for name, (run, _) in paths.items()}
+        if outputs["dict"] != outputs["span"]:
+            mismatches += 1
+            print(f"[{label}] 두 방식의 마스킹 결과가 다릅니다.", file=sys.stderr)
+
+        repeat = max(1, args.repeat * 10 * 1024 // max(size, 1))
+        baseline = None
+        for name, (run, convert) in paths.items():
+            stats = time_calls(run, repeat=repeat)
+            peak_kb, _ = measure_peak_kb(run)
+            _, held_kb = measure_peak_kb(convert)
+            if baseline is None:
+                baseline = stats["mean_ms"]
+            rows.append(
+                {
+                    "size": label.strip(),
+                    "repr": name,
+                    "entities": len(ner_raw) + len(rules_raw),
+                    "mean_ms": stats["mean_ms"],
+                    "p95_ms": stats["p95_ms"],
+                    "peak_kb": peak_kb,
+                    "B/entity": held_kb * 1024 / max(len(ner_raw), 1),
+                    "speedup": baseline / stats["mean_ms"] if stats["mean_ms"] else 0.0,
+                }
+            )
+    print_table(rows, ["size", "repr", "entities", "mean_ms", "p95_ms", "peak_kb", "B/entity", "speedup"])
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
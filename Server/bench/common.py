@@ -0,0 +1,104 @@
+import os
+import resource
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Sequence
+
+# 벤치마크용 예시 문장 (Ai/code/local_only.py의 시나리오와 같은 형식)
+SAMPLE_TEXTS: List[str] = [
+    "삼성전자의 변호사인 45세 남성 홍길동(생년월일: 1980년 1월 1일, 주민번호: 800101-1234567, 여권번호: M12345678, "
+    "이메일: hong@samsung.law, 전화번호: 010-1234-5678)씨는 2025년 8월 13일 서울에서, 본인의 신한은행 계좌(110-123-987654)와 "
+    "연동된 신용카드(카드번호: 4512-3456-7890-1234, CVC: 789)의 도용 사실을 신고했다.",
+    "부산의 IT 개발자인 이서연씨(여성, 28세)는 2024년 12월 24일에 카카오로부터 온 알림을 통해 자신의 국민카드"
+    "(5123-6789-1234-5678, CVC: 456)가 도용되었음을 확인했고, 여권번호(M87654321)와 주민등록번호(970101-2345678)를 "
+    "이용해 본인 인증 후, 해당 내역이 자신의 기업은행 계좌(01-2345-6789)와 관련 없음을 전화(010-3333-4444) 및 "
+    "이메일(seoyeon.lee@email.com)로 신고했습니다.",
+    "회의는 다음 주 화요일 오후 3시에 진행합니다. 안건은 3개이며 자료는 사전에 공유드리겠습니다.",
+]
+
+
+_UNITS = {"KB": 1024, "MB": 1024 * 1024}
+
+
+def parse_size(value: str) -> int:
+    """"1KB", "10MB", "512" 같은 크기 문자열을 바이트 수로 바꿉니다."""
+    value = value.strip().upper()
+    for unit, factor in _UNITS.items():
+        if value.endswith(unit):
+            return int(float(value[: -len(unit)]) * factor)
+    return int(value)
+
+
+def make_text(size_bytes: int, base: Sequence[str] = SAMPLE_TEXTS) -> str:
+    """예시 문장을 반복해 UTF-8 기준 size_bytes 크기의 텍스트를 만듭니다."""
+    chunk = " ".join(base)
+    chunk_bytes = len(chunk.encode("utf-8"))
+    repeat = max(1, size_bytes // chunk_bytes + 1)
+    text = (chunk + "\n") * repeat
+    return text.encode("utf-8")[:size_bytes].decode("utf-8", errors="ignore")
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """nearest-rank 방식 백분위수."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples_ms: Sequence[float]) -> Dict[str, float]:
+    """지연(ms) 표본의 평균/백분위수/최소/최대."""
+    if not samples_ms:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "min_ms": 0.0, "max_ms": 0.0}
+    return {
+        "mean_ms": statistics.fmean(samples_ms),
+        "p50_ms": percentile(samples_ms, 50),
+        "p95_ms": percentile(samples_ms, 95),
+        "p99_ms": percentile(samples_ms, 99),
+        "min_ms": min(samples_ms),
+        "max_ms": max(samples_ms),
+    }
+
+
+def time_calls(fn: Callable[[], object], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """fn을 repeat번 실행해 호출당 지연(ms) 통계를 반환합니다."""
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def rss_mb() -> float:
+    """현재 프로세스의 상주 메모리(MB). (/proc이 없으면 최대 상주 메모리로 대신함)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """프로세스 시작 이후 최대 상주 메모리(MB)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def print_table(rows: List[Dict[str, object]], columns: Sequence[str]) -> None:
+    """간단한 고정폭 표 출력."""
+    widths = [max(len(c), *(len(_fmt(r.get(c))) for r in rows)) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in rows:
+        print("  ".join(_fmt(r.get(c)).ljust(w) for c, w in zip(columns, widths)))
+
+
+def _fmt(value: object) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return "" if value is None else str(value)
@@ -0,0 +1,460 @@
+"""마스킹 서버 HTTP 부하 테스트.
+
+실제 요청과 같은 형식의 페이로드(question1~question6 JSON, 여러 크기의 PDF 첨부, 배치, 스트리밍)를
+정해진 동시 요청 수로 반복 전송하고, 시나리오별 처리량(req/s), 지연 시간(p50/p95/p99), 오류율을 보고합니다.
+페이로드는 시작 전에 시드 기반으로 미리 만들어 두므로 실행마다 같은 부하가 재현됩니다.
+
+--url을 주지 않으면 이 프로세스 안에서 `create_app()`을 스레드 서버로 띄워 측정합니다.
+--stub을 주면 NER_BACKEND=stub(정규식 기반 가짜 모델)으로 띄워 모델 가중치 없이
+웹/PDF/융합 단계의 오버헤드만 측정할 수 있습니다. (Presidio도 빼려면 DISABLE_PRESIDIO=1)
+외부 서버(--url)를 stub으로 측정하려면 서버를 `NER_BACKEND=stub`으로 실행하세요.
+서버의 /metrics가 켜져 있으면 측정 구간의 단계별 평균 시간(masking_stage_seconds)도 함께 보여줍니다.
+(gunicorn 등 멀티 프로세스 서버에서는 요청을 받은 워커 하나의 값)
+
+페이로드마다 본문이 달라 처음 한 번은 캐시에 맞지 않지만, --duration 동안 --requests개를 반복하면
+두 번째부터는 마스킹/PDF 캐시에 맞습니다. 캐시 없는 처리량을 보려면 --requests를 충분히 늘리거나
+--no-cache(프로세스 안 서버) 또는 서버의 MASK_CACHE_SIZE=0을 사용하세요.
+
+실행 예:
+    python -m Server.bench.loadtest --stub --concurrency 16 --duration 30
+    python -m Server.bench.loadtest --url http://127.0.0.1:9814 --mix json=6,pdf=2,batch=1,stream=1 --output load.json
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from .common import SAMPLE_TEXTS, make_text, parse_size, print_table, summarize
+except Exception:  # pragma: no cover
+    from backend.bench.common import SAMPLE_TEXTS, make_text, parse_size, print_table, summarize  # type: ignore
+
+SCENARIOS = ("json", "pdf", "batch", "stream")
+DEFAULT_MIX = "json=6,pdf=2,batch=1,stream=1"
+
+# 질문별 짧은 답변 (question2는 --text-sizes 크기의 본문으로 채움)
+SHORT_ANSWERS = (
+    "개인정보 마스킹 도구 도입",
+    "",
+    "고객 상담 기록을 외부 LLM에 보내기 전 개인정보 제거",
+    "주민번호, 계좌번호, 카드번호, 연락처",
+    "주 1회 정기 점검",
+    "담당자: 홍길동 (010-1234-5678)",
+)
+
+# PDF 본문용 ASCII 문장 (내장 Helvetica 글꼴은 한글을 표현하지 못함)
+PDF_LINES = (
+    "Customer Hong Gildong, RRN 800101-1234567, passport M12345678.",
+    "Contact 010-1234-5678 or hong@samsung.law for account 110-123-987654.",
+    "Card 4512-3456-7890-1234 was reported stolen on 2025-08-13.",
+    "Meeting notes: the quarterly review is scheduled for next Tuesday.",
+)
+
+
+class Payload:
+    """미리 직렬화한 요청 하나."""
+
+    __slots__ = ("scenario", "path", "body", "content_type", "size")
+
+    def __init__(self, scenario: str, path: str, body: bytes, content_type: str, size: str) -> None:
+        self.scenario = scenario
+        self.path = path
+        self.body = body
+        self.content_type = content_type
+        self.size = size
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """"json=6,pdf=2" 형식의 시나리오 가중치를 읽습니다."""
+    mix: Dict[str, int] = {}
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"알 수 없는 시나리오: {name} (가능: {', '.join(SCENARIOS)})")
+        mix[name] = int(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("가중치가 0보다 큰 시나리오가 하나 이상 필요합니다.")
+    return mix
+
+
+def make_pdf(pages: Sequence[str]) -> bytes:
+    """페이지마다 텍스트 한 줄이 들어 있는 최소 PDF를 만듭니다. (텍스트 레이어가 있어 OCR 없이 추출됨)"""
+    objects: List[bytes] = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for i, text in enumerate(pages):
+        page_id = 4 + 2 * i
+        kids.append(f"{page_id} 0 R")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {page_id + 1} 0 R >>".encode("ascii")
+        )
+        escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        stream = f"BT /F1 10 Tf 36 756 Td ({escaped}) Tj ET".encode("latin-1", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode("ascii")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % (i + 1) + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _prompt(rng: random.Random, body: str) -> Dict[str, str]:
+    answers = {f"question{i + 1}": answer for i, answer in enumerate(SHORT_ANSWERS)}
+    # 같은 본문이 서버 캐시에 맞지 않도록 요청마다 다른 번호를 붙임
+    answers["question2"] = f"#{rng.randrange(10**9)} {body}"
+    return answers
+
+
+def _multipart(fields: Dict[str, str], files: Dict[str, Tuple[str, bytes, str]]) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts: List[bytes] = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode("utf-8")
+            + value.encode("utf-8")
+            + b"\r\n"
+        )
+    for name, (filename, data, content_type) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode("utf-8")
+            + data
+            + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode("ascii"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def build_payloads(
+    count: int,
+    mix: Dict[str, int],
+    text_sizes: Sequence[int],
+    pdf_pages: Sequence[int],
+    batch_items: int,
+    seed: int,
+) -> List[Payload]:
+    """시나리오 가중치대로 count개의 요청을 미리 만듭니다. (같은 시드면 같은 페이로드)"""
+    rng = random.Random(seed)
+    texts = {size: make_text(size) for size in text_sizes}
+    names = [name for name in SCENARIOS if mix.get(name)]
+    weights = [mix[name] for name in names]
+
+    payloads: List[Payload] = []
+    for _ in range(count):
+        scenario = rng.choices(names, weights)[0]
+        size = rng.choice(text_sizes)
+        if scenario == "json":
+            target = rng.choice(("question2", "prompt"))
+            body = json.dumps({"prompt_json": _prompt(rng, texts[size]), "mask_target": target}, ensure_ascii=False)
+            payloads.append(Payload("json", "/api/masking", body.encode("utf-8"), "application/json", f"{size}B"))
+        elif scenario == "pdf":
+            pages = rng.choice(pdf_pages)
+            nonce = rng.randrange(10**9)
+            lines = [f"{PDF_LINES[(i + rng.randrange(4)) % len(PDF_LINES)]} ({nonce}-{i + 1})" for i in range(pages)]
+            data, content_type = _multipart(
+                {"prompt_json": json.dumps(_prompt(rng, SAMPLE_TEXTS[0]), ensure_ascii=False), "mask_target": "prompt_pdf"},
+                {"pdf_file": ("load.pdf", make_pdf(lines), "application/pdf")},
+            )
+            payloads.append(Payload("pdf", "/api/masking", data, content_type, f"{pages}p"))
+        elif scenario == "batch":
+            items = [_prompt(rng, texts[rng.choice(text_sizes)]) for _ in range(batch_items)]
+            body = json.dumps({"items": items, "mask_target": "question2"}, ensure_ascii=False)
+            payloads.append(
+                Payload("batch", "/api/masking/batch", body.encode("utf-8"), "application/json", f"{batch_items}x")
+            )
+        else:
+            body = json.dumps({"prompt_json": _prompt(rng, texts[size]), "mask_target": "prompt"}, ensure_ascii=False)
+            payloads.append(
+                Payload("stream", "/api/masking/stream", body.encode("utf-8"), "application/json", f"{size}B")
+            )
+    return payloads
+
+
+def send(base_url: str, payload: Payload, timeout: float) -> Dict[str, Any]:
+    """요청 하나를 보내고 (시나리오, 상태 코드, 지연 ms, 첫 바이트 ms, 오류)를 기록합니다.
+
+    스트리밍 응답은 끝까지 읽으며, 도중에 error 레코드가 오면 그 상태 코드로 실패 처리합니다.
+    """
+    request = urllib.request.Request(
+        base_url + payload.path, data=payload.body, headers={"Content-Type": payload.content_type}, method="POST"
+    )
+    result: Dict[str, Any] = {"scenario": payload.scenario, "size": payload.size, "status": 0, "error": None}
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            result["status"] = response.status
+            if payload.scenario == "stream":
+                for line in response:
+                    if "ttfb_ms" not in result:
+                        result["ttfb_ms"] = (time.perf_counter() - started) * 1000
+                    record = json.loads(line)
+                    if record.get("type") == "error":
+                        result["status"] = record.get("status", 500)
+                        result["error"] = record.get("message")
+            else:
+                response.read()
+    except urllib.error.HTTPError as e:
+        result["status"] = e.code
+        result["error"] = e.reason
+        e.close()
+    except Exception as e:  # 연결 실패/시간 초과 등
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["latency_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def run_load(
+    base_url: str,
+    payloads: Sequence[Payload],
+    concurrency: int,
+    duration: float,
+    timeout: float,
+) -> Tuple[List[Dict[str, Any]], float]:
+    """동시 요청 수를 고정한 닫힌 루프로 payloads를 차례로 보냅니다.
+
+    duration(초)이 0보다 크면 그 시간 동안 payloads를 반복해서 보내고, 아니면 한 번씩만 보냅니다.
+    반환: (요청별 결과, 실제 측정 시간(초))
+    """
+    results: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+    cursor = [0]
+    deadline = time.perf_counter() + duration if duration > 0 else None
+
+    def next_payload() -> Optional[Payload]:
+        with lock:
+            i = cursor[0]
+            cursor[0] += 1
+        if deadline is None:
+            return payloads[i] if i < len(payloads) else None
+        return payloads[i % len(payloads)] if time.perf_counter() < deadline else None
+
+    def worker() -> None:
+        while True:
+            payload = next_payload()
+            if payload is None:
+                return
+            result = send(base_url, payload, timeout)
+            with lock:
+                results.append(result)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, name=f"load-{i}", daemon=True) for i in range(max(1, concurrency))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - started
+
+
+def summarize_results(results: Sequence[Dict[str, Any]], elapsed: float) -> Dict[str, Dict[str, Any]]:
+    """시나리오별(및 전체) 요청 수, req/s, 오류율, 상태 코드 분포, 지연 시간 통계."""
+    groups: Dict[str, List[Dict[str, Any]]] = {"all": list(results)}
+    for result in results:
+        groups.setdefault(result["scenario"], []).append(result)
+
+    summary: Dict[str, Dict[str, Any]] = {}
+    for name in ("all",) + SCENARIOS:
+        group = groups.get(name)
+        if not group:
+            continue
+        ok = [r for r in group if r["status"] == 200 and not r["error"]]
+        errors = len(group) - len(ok)
+        row: Dict[str, Any] = {
+            "requests": len(group),
+            "req_per_s": round(len(group) / elapsed, 2) if elapsed else 0.0,
+            "errors": errors,
+            "error_rate": round(errors / len(group), 4),
+            "status": dict(sorted(Counter(str(r["status"]) for r in group).items())),
+            **{k: round(v, 2) for k, v in summarize([r["latency_ms"] for r in ok]).items()},
+        }
+        ttfb = [r["ttfb_ms"] for r in ok if "ttfb_ms" in r]
+        if ttfb:
+            row["ttfb"] = {k: round(v, 2) for k, v in summarize(ttfb).items()}
+        summary[name] = row
+    return summary
+
+
+_STAGE_LINE = re.compile(r'^masking_stage_seconds_(sum|count)\{stage="([^"]+)"\} (\S+)$')
+
+
+def scrape_stage_totals(base_url: str) -> Optional[Dict[str, Dict[str, float]]]:
+    """서버 /metrics에서 단계별 누적 (sum, count)를 읽습니다. (메트릭이 꺼져 있으면 None)"""
+    try:
+        with urllib.request.urlopen(base_url + "/metrics", timeout=10) as response:
+            text = response.read().decode("utf-8")
+    except Exception:
+        return None
+    totals: Dict[str, Dict[str, float]] = {}
+    for line in text.splitlines():
+        match = _STAGE_LINE.match(line)
+        if match:
+            kind, stage, value = match.groups()
+            totals.setdefault(stage, {"sum": 0.0, "count": 0.0})[kind] = float(value)
+    return totals
+
+
+def stage_deltas(before: Dict[str, Dict[str, float]], after: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """측정 구간의 단계별 호출 수와 평균 시간(ms)."""
+    deltas: Dict[str, Dict[str, float]] = {}
+    for stage, values in after.items():
+        prev = before.get(stage, {"sum": 0.0, "count": 0.0})
+        count = values["count"] - prev["count"]
+        if count > 0:
+            deltas[stage] = {
+                "count": int(count),
+                "mean_ms": round((values["sum"] - prev["sum"]) / count * 1000, 3),
+                "total_s": round(values["sum"] - prev["sum"], 3),
+            }
+    return deltas
+
+
+def wait_ready(base_url: str, timeout: float) -> None:
+    """/ready가 200을 반환할 때까지 기다립니다. (예열 중인 서버에 요청을 보내지 않도록)"""
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(base_url + "/ready", timeout=5) as response:
+                if response.status == 200:
+                    return
+        except urllib.error.HTTPError as e:
+            e.close()
+            if e.code not in (503, 404):
+                raise
+            if e.code == 404:  # /ready가 없는 서버
+                return
+        except urllib.error.URLError:
+            pass
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"{timeout:.0f}초 안에 서버가 준비되지 않았습니다: {base_url}")
+        time.sleep(0.5)
+
+
+def start_local_server(stub: bool, port: int, no_cache: bool = False):
+    """이 프로세스 안에서 `create_app()`을 멀티 스레드 WSGI 서버로 띄웁니다. 반환: (기본 URL, 서버)
+
+    설정은 임포트 시점의 환경 변수로 정해지므로 서버 모듈은 NER_BACKEND를 정한 뒤에 임포트합니다.
+    """
+    if stub:
+        os.environ["NER_BACKEND"] = "stub"
+    if no_cache:
+        os.environ["MASK_CACHE_SIZE"] = "0"
+    from werkzeug.serving import make_server
+
+    try:
+        from ..server import create_app
+    except Exception:  # pragma: no cover
+        from backend.server import create_app  # type: ignore
+
+    server = make_server("127.0.0.1", port, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, name="loadtest-server", daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="", help="대상 서버 (비우면 프로세스 안에서 create_app() 실행)")
+    parser.add_argument("--stub", action="store_true", help="프로세스 안 서버를 NER_BACKEND=stub으로 실행")
+    parser.add_argument("--no-cache", action="store_true", help="프로세스 안 서버의 마스킹 캐시 끄기")
+    parser.add_argument("--port", type=int, default=0, help="프로세스 안 서버 포트 (0이면 빈 포트)")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 요청 수")
+    parser.add_argument("--duration", type=float, default=30.0, help="측정 시간(초), 0이면 --requests개만 전송")
+    parser.add_argument("--requests", type=int, default=200, help="미리 만들 요청 수 (duration 동안은 반복 전송)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"시나리오 가중치 (기본 {DEFAULT_MIX})")
+    parser.add_argument("--text-sizes", default="256,2KB,16KB", help="question2 본문 크기 목록")
+    parser.add_argument("--pdf-pages", default="1,5,20", help="PDF 페이지 수 목록")
+    parser.add_argument("--batch-items", type=int, default=8, help="배치 요청당 항목 수")
+    parser.add_argument("--warmup-requests", type=int, default=10, help="측정 전에 보내는 예열 요청 수")
+    parser.add_argument("--timeout", type=float, default=120.0, help="요청당 시간 제한(초)")
+    parser.add_argument("--ready-timeout", type=float, default=600.0, help="서버 준비 대기 시간(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="", help="JSON 보고서 저장 경로")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    text_sizes = [parse_size(s) for s in args.text_sizes.split(",") if s.strip()]
+    pdf_pages = [int(s) for s in args.pdf_pages.split(",") if s.strip()]
+
+    server = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        base_url, server = start_local_server(args.stub, args.port, args.no_cache)
+    print(f"대상: {base_url}")
+    wait_ready(base_url, args.ready_timeout)
+
+    payloads = build_payloads(args.requests, mix, text_sizes, pdf_pages, args.batch_items, args.seed)
+    if args.warmup_requests:
+        warmup = build_payloads(args.warmup_requests, mix, text_sizes, pdf_pages, args.batch_items, args.seed + 1)
+        run_load(base_url, warmup, args.concurrency, 0, args.timeout)
+
+    before = scrape_stage_totals(base_url)
+    print(f"동시 요청 {args.concurrency}개, " + (f"{args.duration:.0f}초" if args.duration > 0 else f"요청 {len(payloads)}개"))
+    results, elapsed = run_load(base_url, payloads, args.concurrency, args.duration, args.timeout)
+    after = scrape_stage_totals(base_url)
+    if server is not None:
+        server.shutdown()
+
+    summary = summarize_results(results, elapsed)
+    print_table(
+        [{"scenario": name, **row} for name, row in summary.items()],
+        ["scenario", "requests", "req_per_s", "errors", "error_rate", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"],
+    )
+    for name, row in summary.items():
+        if name != "all" and row["errors"]:
+            print(f"  {name} 상태 코드: {row['status']}")
+    if "ttfb" in summary.get("stream", {}):
+        ttfb = summary["stream"]["ttfb"]
+        print(f"stream 첫 바이트: p50 {ttfb['p50_ms']}ms, p95 {ttfb['p95_ms']}ms")
+    stages = stage_deltas(before, after) if before is not None and after is not None else {}
+    if stages:
+        print("서버 단계별 평균 시간:")
+        print_table([{"stage": stage, **row} for stage, row in stages.items()], ["stage", "count", "mean_ms", "total_s"])
+
+    if args.output:
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "target": base_url if args.url else ("in-process (stub)" if args.stub else "in-process"),
+            "config": {
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "mix": mix,
+                "text_sizes": text_sizes,
+                "pdf_pages": pdf_pages,
+                "batch_items": args.batch_items,
+                "seed": args.seed,
+            },
+            "elapsed_s": round(elapsed, 3),
+            "scenarios": summary,
+            "server_stages": stages,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"보고서 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
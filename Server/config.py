@@ -17,6 +17,8 @@ class AppConfig:
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
     port: int = int(os.getenv("PORT", "9814"))
     default_locale: str = os.getenv("DEFAULT_LOCALE", "ko")
+    # 요청에 mask_target이 없을 때의 마스킹 대상 (question2 | prompt | prompt_pdf)
+    default_mask_target: str = os.getenv("DEFAULT_MASK_TARGET", "question2")
     app_version: str = os.getenv("APP_VERSION", "0.1.0")
     text_model_path: str = os.getenv(
         "TEXT_MODEL_PATH", "Leo97/KoELECTRA-small-v3-modu-ner"
@@ -27,6 +29,80 @@ class AppConfig:
     use_cuda: bool = _getenv_bool("USE_CUDA", True)
     disable_local_ner: bool = _getenv_bool("DISABLE_LOCAL_NER", False)
     disable_presidio: bool = _getenv_bool("DISABLE_PRESIDIO", False)
+    # NER 추론 백엔드: torch(기본) | onnx(ONNX Runtime, `Server.tools.export_onnx`로 먼저 내보내기)
+    #   | stub(모델 없이 정규식으로 흉내 내는 가짜 파이프라인, 부하 테스트용)
+    ner_backend: str = os.getenv("NER_BACKEND", "torch")
+    # stub 백엔드의 배치 호출당 가짜 추론 지연(ms)
+    ner_stub_latency_ms: float = float(os.getenv("NER_STUB_LATENCY_MS", "0"))
+    # ONNX 모델 보관 폴더 (비우면 각 모델 폴더 아래 onnx/, 허브 id면 HF 캐시의 스냅샷 폴더 아래),
+    # 세션 스레드 수 (0이면 ONNX Runtime 기본값)
+    onnx_model_dir: str = os.getenv("ONNX_MODEL_DIR", "")
+    onnx_threads: int = int(os.getenv("ONNX_THREADS", "0"))
+    # 숫자 NER 모델 양자화: ""(fp32) | int8(CPU 동적 양자화, torch는 로딩 시 변환, onnx는 model_int8.onnx 사용)
+    ner_quantize: str = os.getenv("NER_QUANTIZE", "")
+    # 서버 시작 시 모델 로딩 + 더미 추론으로 예열 (끝나기 전까지 /ready는 503)
+    warmup_on_start: bool = _getenv_bool("WARMUP_ON_START", True)
+    # pre-fork 멀티 프로세스 서빙(gunicorn.conf.py): 워커 프로세스 수, 워커당 요청 스레드 수
+    web_workers: int = int(os.getenv("WEB_WORKERS", "2"))
+    web_threads: int = int(os.getenv("WEB_THREADS", "8"))
+    # 워커당 torch CPU 스레드 수 (0이면 코어 수를 워커 수로 나눈 값)
+    torch_num_threads: int = int(os.getenv("TORCH_NUM_THREADS", "0"))
+    # /metrics(Prometheus 텍스트 형식) 엔드포인트와 HTTP 요청 시간 기록
+    enable_metrics: bool = _getenv_bool("ENABLE_METRICS", True)
+    # 멀티 프로세스 메트릭: 워커별 스냅샷 파일을 둘 디렉터리(비우면 프로세스별 값)와 쓰기 주기(초)
+    # (gunicorn.conf.py로 실행하면 지정하지 않아도 임시 디렉터리를 만들어 씀)
+    metrics_multiproc_dir: str = os.getenv("METRICS_MULTIPROC_DIR", "")
+    metrics_flush_interval: float = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+    # Presidio 실행 방식: legacy(en/ko 분석 + 인식기 개별 실행) | single_pass(한 번에 분석)
+    presidio_mode: str = os.getenv("PRESIDIO_MODE", "legacy")
+    # 커스텀 규칙(계좌/CVC/여권/주민번호) 실행 엔진: presidio(PatternRecognizer) | regex(통합 정규식)
+    #   | compact(regex와 같되, 규칙 전용 모드(DISABLE_LOCAL_NER=1)에서는 Presidio 없이
+    #     이메일/전화번호/카드번호/IBAN/IP/URL까지 한 번에 훑어 정수 배열로 병합·치환.
+    #     Presidio 내장 인식기와 달리 전화번호는 한국 형식, URL은 스킴/www.가 있는 주소만 찾음)
+    rule_engine: str = os.getenv("RULE_ENGINE", "presidio")
+    # 겹치는 탐지 결과 선택 방식: greedy(시작/길이 우선) | weighted(우선순위×점수×길이 최대화)
+    fusion_mode: str = os.getenv("FUSION_MODE", "greedy")
+    # 동시 요청의 NER 호출을 모아 배치로 추론하는 마이크로 배칭 설정
+    enable_micro_batching: bool = _getenv_bool("ENABLE_MICRO_BATCHING", True)
+    ner_batch_max_size: int = int(os.getenv("NER_BATCH_MAX_SIZE", "16"))
+    ner_batch_max_wait_ms: float = float(os.getenv("NER_BATCH_MAX_WAIT_MS", "5"))
+    # 배치 안의 입력을 토큰 길이 버킷으로 나눠 패딩 낭비를 줄임 (버킷 패딩 비율 상한 0~1)
+    ner_bucketing: bool = _getenv_bool("NER_BUCKETING", True)
+    ner_bucket_max_padding: float = float(os.getenv("NER_BUCKET_MAX_PADDING", "0.25"))
+    # 긴 텍스트를 겹치는 토큰 창으로 나눠 추론 (창 크기/겹침은 토큰 수, 0이면 분할 안 함)
+    ner_chunk_size: int = int(os.getenv("NER_CHUNK_SIZE", "510"))
+    ner_chunk_stride: int = int(os.getenv("NER_CHUNK_STRIDE", "128"))
+    # 탐지기(NER/Presidio) 병렬 실행 풀 크기와 탐지기별 제한 시간(초)
+    detection_workers: int = int(os.getenv("DETECTION_WORKERS", "8"))
+    ner_timeout: float = float(os.getenv("NER_TIMEOUT", "10"))
+    presidio_timeout: float = float(os.getenv("PRESIDIO_TIMEOUT", "5"))
+    # 스트리밍 마스킹에서 한 번에 출력하는 최대 글자 수와, 경계에 걸친 엔티티를 찾으려고 앞뒤로 더 읽는 글자 수
+    # (겹침은 창 크기의 절반까지만 사용)
+    stream_window_chars: int = int(os.getenv("STREAM_WINDOW_CHARS", "4000"))
+    stream_window_overlap: int = int(os.getenv("STREAM_WINDOW_OVERLAP", "256"))
+    # 마스킹 결과 캐시 (0이면 비활성화, TTL은 초 단위, 너무 긴 텍스트는 저장 안 함)
+    mask_cache_size: int = int(os.getenv("MASK_CACHE_SIZE", "1024"))
+    mask_cache_ttl: float = float(os.getenv("MASK_CACHE_TTL", "300"))
+    mask_cache_max_chars: int = int(os.getenv("MASK_CACHE_MAX_CHARS", "20000"))
+    batch_max_items: int = int(os.getenv("BATCH_MAX_ITEMS", "64"))
+    # 추론/PDF 작업을 처리하는 제한된 실행기 설정 (대기열 초과 시 503)
+    inference_workers: int = int(os.getenv("INFERENCE_WORKERS", "8"))
+    inference_queue_size: int = int(os.getenv("INFERENCE_QUEUE_SIZE", "64"))
+    inference_timeout: float = float(os.getenv("INFERENCE_TIMEOUT", "30"))
+    pdf_workers: int = int(os.getenv("PDF_WORKERS", "2"))
+    pdf_queue_size: int = int(os.getenv("PDF_QUEUE_SIZE", "8"))
+    # 페이지 단위 OCR 프로세스 수 (0이면 요청 스레드에서 순차 처리)
+    pdf_ocr_workers: int = int(os.getenv("PDF_OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+    # PDF 추출 결과 캐시 (내용 해시 기준, 디스크 경로가 비어 있으면 메모리만 사용)
+    pdf_cache_max_bytes: int = int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    # 주의: 디스크 캐시는 마스킹 전 PDF 원문(개인정보 포함)을 평문 파일로 저장합니다.
+    # PDF_CACHE_DIR만으로는 켜지지 않고 PDF_CACHE_DISK_ALLOW_PLAINTEXT=1로 명시해야 사용합니다.
+    # (암호화된 볼륨 등 접근이 통제된 경로에서만 사용 권장)
+    pdf_cache_dir: str = os.getenv("PDF_CACHE_DIR", "")
+    pdf_cache_disk_allow_plaintext: bool = _getenv_bool("PDF_CACHE_DISK_ALLOW_PLAINTEXT", False)
+    # 디스크 캐시 한도: 전체 크기(바이트)를 넘으면 오래 안 쓴 파일부터 삭제, TTL(초)이 지난 파일은 무시/삭제
+    pdf_cache_disk_max_bytes: int = int(os.getenv("PDF_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+    pdf_cache_disk_ttl: float = float(os.getenv("PDF_CACHE_DISK_TTL", str(7 * 24 * 3600)))
 
 
 CONFIG = AppConfig()
@@ -54,11 +130,54 @@ def get_device() -> int:
 LOG_LEVEL = CONFIG.log_level
 APP_PORT = CONFIG.port
 DEFAULT_LOCALE = CONFIG.default_locale
+DEFAULT_MASK_TARGET = CONFIG.default_mask_target
 APP_VERSION = CONFIG.app_version
 TEXT_MODEL_PATH = CONFIG.text_model_path
 NUMERIC_MODEL_PATH = CONFIG.numeric_model_path
 DISABLE_LOCAL_NER = CONFIG.disable_local_ner
 DISABLE_PRESIDIO = CONFIG.disable_presidio
+NER_BACKEND = CONFIG.ner_backend
+NER_STUB_LATENCY_MS = CONFIG.ner_stub_latency_ms
+ONNX_MODEL_DIR = CONFIG.onnx_model_dir
+ONNX_THREADS = CONFIG.onnx_threads
+NER_QUANTIZE = CONFIG.ner_quantize
+WARMUP_ON_START = CONFIG.warmup_on_start
+WEB_WORKERS = CONFIG.web_workers
+WEB_THREADS = CONFIG.web_threads
+TORCH_NUM_THREADS = CONFIG.torch_num_threads
+ENABLE_METRICS = CONFIG.enable_metrics
+METRICS_MULTIPROC_DIR = CONFIG.metrics_multiproc_dir
+METRICS_FLUSH_INTERVAL = CONFIG.metrics_flush_interval
+PRESIDIO_MODE = CONFIG.presidio_mode
+RULE_ENGINE = CONFIG.rule_engine
+FUSION_MODE = CONFIG.fusion_mode
+STREAM_WINDOW_CHARS = CONFIG.stream_window_chars
+STREAM_WINDOW_OVERLAP = CONFIG.stream_window_overlap
+ENABLE_MICRO_BATCHING = CONFIG.enable_micro_batching
+NER_BATCH_MAX_SIZE = CONFIG.ner_batch_max_size
+NER_BATCH_MAX_WAIT_MS = CONFIG.ner_batch_max_wait_ms
+NER_BUCKETING = CONFIG.ner_bucketing
+NER_BUCKET_MAX_PADDING = CONFIG.ner_bucket_max_padding
+NER_CHUNK_SIZE = CONFIG.ner_chunk_size
+NER_CHUNK_STRIDE = CONFIG.ner_chunk_stride
+DETECTION_WORKERS = CONFIG.detection_workers
+NER_TIMEOUT = CONFIG.ner_timeout
+PRESIDIO_TIMEOUT = CONFIG.presidio_timeout
+MASK_CACHE_SIZE = CONFIG.mask_cache_size
+MASK_CACHE_TTL = CONFIG.mask_cache_ttl
+MASK_CACHE_MAX_CHARS = CONFIG.mask_cache_max_chars
+BATCH_MAX_ITEMS = CONFIG.batch_max_items
+INFERENCE_WORKERS = CONFIG.inference_workers
+INFERENCE_QUEUE_SIZE = CONFIG.inference_queue_size
+INFERENCE_TIMEOUT = CONFIG.inference_timeout
+PDF_WORKERS = CONFIG.pdf_workers
+PDF_QUEUE_SIZE = CONFIG.pdf_queue_size
+PDF_OCR_WORKERS = CONFIG.pdf_ocr_workers
+PDF_CACHE_MAX_BYTES = CONFIG.pdf_cache_max_bytes
+PDF_CACHE_DIR = CONFIG.pdf_cache_dir
+PDF_CACHE_DISK_ALLOW_PLAINTEXT = CONFIG.pdf_cache_disk_allow_plaintext
+PDF_CACHE_DISK_MAX_BYTES = CONFIG.pdf_cache_disk_max_bytes
+PDF_CACHE_DISK_TTL = CONFIG.pdf_cache_disk_ttl
 
 
 __all__ = [
@@ -67,11 +186,54 @@ __all__ = [
     "LOG_LEVEL",
     "APP_PORT",
     "DEFAULT_LOCALE",
+    "DEFAULT_MASK_TARGET",
     "APP_VERSION",
     "TEXT_MODEL_PATH",
     "NUMERIC_MODEL_PATH",
     "DISABLE_LOCAL_NER",
     "DISABLE_PRESIDIO",
+    "NER_BACKEND",
+    "NER_STUB_LATENCY_MS",
+    "ONNX_MODEL_DIR",
+    "ONNX_THREADS",
+    "NER_QUANTIZE",
+    "WARMUP_ON_START",
+    "WEB_WORKERS",
+    "WEB_THREADS",
+    "TORCH_NUM_THREADS",
+    "ENABLE_METRICS",
+    "METRICS_MULTIPROC_DIR",
+    "METRICS_FLUSH_INTERVAL",
+    "PRESIDIO_MODE",
+    "RULE_ENGINE",
+    "FUSION_MODE",
+    "STREAM_WINDOW_CHARS",
+    "STREAM_WINDOW_OVERLAP",
+    "ENABLE_MICRO_BATCHING",
+    "NER_BATCH_MAX_SIZE",
+    "NER_BATCH_MAX_WAIT_MS",
+    "NER_BUCKETING",
+    "NER_BUCKET_MAX_PADDING",
+    "NER_CHUNK_SIZE",
+    "NER_CHUNK_STRIDE",
+    "DETECTION_WORKERS",
+    "NER_TIMEOUT",
+    "PRESIDIO_TIMEOUT",
+    "MASK_CACHE_SIZE",
+    "MASK_CACHE_TTL",
+    "MASK_CACHE_MAX_CHARS",
+    "BATCH_MAX_ITEMS",
+    "INFERENCE_WORKERS",
+    "INFERENCE_QUEUE_SIZE",
+    "INFERENCE_TIMEOUT",
+    "PDF_WORKERS",
+    "PDF_QUEUE_SIZE",
+    "PDF_OCR_WORKERS",
+    "PDF_CACHE_MAX_BYTES",
+    "PDF_CACHE_DIR",
+    "PDF_CACHE_DISK_ALLOW_PLAINTEXT",
+    "PDF_CACHE_DISK_MAX_BYTES",
+    "PDF_CACHE_DISK_TTL",
     "AppConfig",
 ]
 
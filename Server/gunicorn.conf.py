@@ -0,0 +1,132 @@
+"""pre-fork 멀티 프로세스 서빙 설정 (gunicorn).
+
+마스터 프로세스가 앱과 모델 가중치를 한 번만 로딩한 뒤 워커를 fork하므로
+워커 N개가 같은 가중치 메모리를 copy-on-write로 공유합니다. (워커 수만큼 모델이 복제되지 않음)
+
+- 마스터: 앱 생성(예열 보류) → 모델 로딩(추론 없음) → gc.freeze()로 로딩된 객체를 GC 대상에서 제외
+  (GC가 객체 헤더를 건드려 공유 페이지가 복사되는 것을 막음)
+- 워커: torch 스레드 수 조정 → 더미 추론으로 예열 (끝나기 전까지 /ready는 503)
+
+GPU(USE_CUDA=1이고 CUDA 사용 가능)면 마스터는 숫자 모델을 로딩하지 않습니다.
+CUDA는 fork 이전에 초기화되면 워커에서 다시 쓸 수 없으므로("Cannot re-initialize CUDA in forked
+subprocess") 워커마다 모델을 따로 로딩하며, 이 경우 가중치 메모리는 공유되지 않습니다.
+CPU만 쓰면서 공유를 원하면 USE_CUDA=0으로 실행합니다.
+마스터의 GPU 확인(torch.cuda.is_available)도 기본 방식은 CUDA 드라이버를 초기화하므로
+PYTORCH_NVML_BASED_CUDA_CHECK=1로 NVML 기반 확인을 씁니다.
+
+메트릭은 프로세스별이라 /metrics가 워커 하나의 값만 내면 스크랩마다 카운터가 뒤로 갈 수 있습니다.
+그래서 워커마다 METRICS_MULTIPROC_DIR에 스냅샷을 METRICS_FLUSH_INTERVAL초마다 쓰고, /metrics에
+응답하는 워커가 모든 파일을 합칩니다. (지정하지 않으면 실행마다 임시 디렉터리를 만들고 종료 시 삭제)
+종료된 워커의 카운터/히스토그램은 dead.json 하나에 누적해 남기고 게이지만 뺍니다.
+
+실행 예 (저장소 루트에서):
+    gunicorn -c Server/gunicorn.conf.py
+
+`gunicorn` 패키지가 필요합니다. 워커/스레드 수는 WEB_WORKERS, WEB_THREADS로 조정합니다.
+"""
+
+import gc
+import os
+import shutil
+import sys
+import tempfile
+
+# 마스터에서 get_device()로 GPU를 확인하기 전에 설정 (fork 이후 워커의 CUDA 초기화가 막히지 않도록)
+os.environ.setdefault("PYTORCH_NVML_BASED_CUDA_CHECK", "1")
+
+# 설정(Server.config) 임포트 전에 정해야 앱과 워커가 같은 디렉터리를 씀
+_own_metrics_dir = not os.getenv("METRICS_MULTIPROC_DIR")
+if _own_metrics_dir:
+    os.environ["METRICS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="masking-metrics-")
+
+try:  # package-relative import
+    from Server.config import (
+        APP_PORT,
+        ENABLE_METRICS,
+        LOG_LEVEL,
+        METRICS_FLUSH_INTERVAL,
+        METRICS_MULTIPROC_DIR,
+        TORCH_NUM_THREADS,
+        WARMUP_ON_START,
+        WEB_THREADS,
+        WEB_WORKERS,
+    )
+except Exception:  # pragma: no cover - fallback for script execution
+    from config import (  # type: ignore
+        APP_PORT,
+        ENABLE_METRICS,
+        LOG_LEVEL,
+        METRICS_FLUSH_INTERVAL,
+        METRICS_MULTIPROC_DIR,
+        TORCH_NUM_THREADS,
+        WARMUP_ON_START,
+        WEB_THREADS,
+        WEB_WORKERS,
+    )
+
+wsgi_app = "Server.server:create_app(warmup=False)"
+bind = f"0.0.0.0:{APP_PORT}"
+workers = max(1, WEB_WORKERS)
+worker_class = "gthread"
+threads = max(1, WEB_THREADS)
+preload_app = True
+loglevel = LOG_LEVEL.lower()
+# 첫 요청 전 예열 시간이 워커 타임아웃에 걸리지 않도록 여유를 둠
+timeout = 120
+
+
+def on_starting(server) -> None:
+    """이전 실행이 남긴 메트릭 스냅샷을 지웁니다. (합계가 이전 실행 값에서 시작하지 않도록)"""
+    os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+    for name in os.listdir(METRICS_MULTIPROC_DIR):
+        if name.endswith(".json"):
+            os.remove(os.path.join(METRICS_MULTIPROC_DIR, name))
+
+
+def when_ready(server) -> None:
+    """워커를 fork하기 전에 마스터에서 모델 가중치를 로딩합니다."""
+    from Server.services.warmup import preload_shared_models
+
+    if WARMUP_ON_START:
+        preload_shared_models()
+    gc.freeze()
+
+
+def post_fork(server, worker) -> None:
+    """워커마다 torch 스레드 수를 나눠 잡고 예열을 시작합니다."""
+    import torch
+
+    from Server.services.warmup import start_warmup
+    from Server.utils.metrics import start_snapshot_writer
+
+    # 워커마다 모든 코어를 쓰면 스레드가 과다해지므로 코어를 워커 수로 나눔
+    num_threads = TORCH_NUM_THREADS or max(1, (os.cpu_count() or 1) // workers)
+    torch.set_num_threads(num_threads)
+    start_warmup(enabled=WARMUP_ON_START)
+    if ENABLE_METRICS:
+        start_snapshot_writer(METRICS_FLUSH_INTERVAL)
+
+
+def worker_exit(server, worker) -> None:
+    """워커 종료 직전 NER 마이크로 배처를 비우고 마지막 메트릭 스냅샷을 씁니다. (워커 프로세스에서 실행)"""
+    from Server.utils.metrics import REGISTRY
+
+    # 모델 모듈을 이미 불러온 경우에만 (종료하면서 torch/transformers를 새로 임포트하지 않도록)
+    local_pipeline = sys.modules.get("Server.nlp.local_pipeline")
+    if local_pipeline is not None:
+        local_pipeline.shutdown_numeric_batcher()
+    if ENABLE_METRICS:
+        REGISTRY.write_snapshot()
+
+
+def child_exit(server, worker) -> None:
+    """종료된 워커의 게이지를 합계에서 빼고 누적 값은 dead.json에 합칩니다. (마스터에서 실행)"""
+    from Server.utils.metrics import mark_process_dead
+
+    mark_process_dead(METRICS_MULTIPROC_DIR, worker.pid)
+
+
+def on_exit(server) -> None:
+    """직접 만든 임시 메트릭 디렉터리를 지웁니다."""
+    if _own_metrics_dir:
+        shutil.rmtree(METRICS_MULTIPROC_DIR, ignore_errors=True)
@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from queue import Empty, Queue
+from typing import Any, Callable, List, Sequence, Tuple
+
+# 여러 요청에서 들어온 단건 입력을 짧은 시간 동안 모아
+# 한 번의 배치 호출로 처리하는 마이크로 배처입니다.
+# 호출자는 Future를 받아 자신의 결과만 돌려받습니다.
+
+# 대기열에 넣어 작업 스레드에 종료를 알리는 표식
+_STOP = object()
+
+
+class MicroBatcher:
+    """단건 입력을 모아 `batch_fn(items) -> outputs`로 한 번에 처리합니다.
+
+    - max_batch_size: 한 배치에 담을 최대 입력 수
+    - max_wait_ms: 첫 입력이 들어온 뒤 다음 입력을 기다리는 최대 시간
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        name: str = "micro-batcher",
+    ) -> None:
+        self._batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self._queue: "Queue[Tuple[Any, Future]]" = Queue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    def submit(self, item: Any) -> Future:
+        """입력 하나를 대기열에 넣고 결과를 받을 Future를 반환합니다. (종료 후에는 RuntimeError)"""
+        fut: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name}: 종료된 배처에는 입력을 넣을 수 없습니다.")
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._queue.put((item, fut))
+        return fut
+
+    def submit_many(self, items: Sequence[Any]) -> List[Future]:
+        """여러 입력을 순서대로 넣습니다. (같은 배치에 묶일 가능성이 높음)"""
+        return [self.submit(item) for item in items]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """새 입력을 받지 않고, 이미 넣은 입력을 모두 처리한 뒤 작업 스레드를 끝냅니다.
+
+        wait=True면 작업 스레드가 끝날 때까지 기다립니다. 여러 번 호출해도 됩니다.
+        """
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                if self._thread is not None and self._thread.is_alive():
+                    self._queue.put(_STOP)  # type: ignore[arg-type]
+            thread = self._thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _collect(self) -> Tuple[List[Tuple[Any, Future]], bool]:
+        """(배치, 종료 표식을 만났는지)"""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    entry = self._queue.get(timeout=remaining)
+                else:
+                    # 대기 시간이 끝났어도 이미 쌓여 있는 입력은 함께 처리
+                    entry = self._queue.get_nowait()
+            except Empty:
+                break
+            if entry is _STOP:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            batch, stop = self._collect()
+            # 취소된 요청은 제외
+            batch = [(item, fut) for item, fut in batch if fut.set_running_or_notify_cancel()]
+            if batch:
+                self._dispatch(batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch: List[Tuple[Any, Future]]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            outputs = self._batch_fn(items)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # 한 입력 때문에 배치 전체가 실패하지 않도록 단건으로 재시도
+            logging.warning("%s: 배치 처리 실패, 단건으로 재시도합니다.", self.name)
+            for entry in batch:
+                self._dispatch_one(entry)
+            return
+        outputs = list(outputs)
+        if len(outputs) != len(batch):
+            # zip으로 짝지으면 남는 요청의 Future가 끝나지 않으므로 모두 실패 처리
+            error = RuntimeError(f"{self.name}: 배치 결과 수({len(outputs)})가 입력 수({len(batch)})와 다릅니다.")
+            for _, fut in batch:
+                fut.set_exception(error)
+            return
+        for (_, fut), out in zip(batch, outputs):
+            fut.set_result(out)
+
+    def _dispatch_one(self, entry: Tuple[Any, Future]) -> None:
+        item, fut = entry
+        try:
+            fut.set_result(self._batch_fn([item])[0])
+        except Exception as e:
+            fut.set_exception(e)
+
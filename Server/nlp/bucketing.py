@@ -0,0 +1,218 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import torch
+    from transformers.pipelines.base import pad_collate_fn
+except ImportError:  # pragma: no cover - torch/transformers 없이도 pipe(texts)로 실행
+    torch = None  # type: ignore[assignment]
+    pad_collate_fn = None  # type: ignore[assignment]
+
+# 토큰 길이 기준 버킷 배칭입니다.
+# HF 파이프라인에 여러 문장을 넘기면 입력 순서대로 batch_size씩 묶어 가장 긴 문장에 맞춰 패딩하므로
+# 20자 질문과 수 KB 문서가 한 배치에 섞이면 대부분이 패딩 연산이 됩니다.
+# 여기서는 파이프라인의 전처리(토큰화)를 한 번만 실행해 길이를 얻고, 길이순으로 정렬한 뒤
+# 패딩 비율이 한도를 넘지 않게 버킷을 나눠 같은 토큰화 결과로 순전파/후처리를 실행합니다.
+# 창 나누기(windower)를 주면 긴 문장도 한 번만 토큰화하고 그 결과를 잘라 창마다 순전파합니다.
+# 단계별 인자는 파이프라인을 하위 클래스로 만들 때 구현하는 `_sanitize_parameters`로 한 번만 만들고,
+# 이 메서드가 없는 파이프라인(다른 버전/가짜 파이프라인)은 `pipe(texts, batch_size=...)`로 실행합니다.
+
+# (토큰 오프셋, 글자 수) → [(토큰 시작, 토큰 끝, 유지 시작 글자, 유지 끝 글자), ...]
+# 토큰 위치는 특수 토큰을 뺀 본문 기준이며, 창마다 유지 구간에서 시작하는 개체만 남깁니다.
+Windower = Callable[[Sequence[Tuple[int, int]], int], List[Tuple[int, int, int, int]]]
+
+
+def plan_buckets(lengths: Sequence[int], max_batch_size: int, max_padding_ratio: float) -> List[List[int]]:
+    """입력 인덱스를 토큰 길이 버킷으로 나눕니다.
+
+    길이순으로 훑으며 버킷에 추가했을 때 배치 크기가 max_batch_size를 넘거나
+    패딩 비율(패딩 토큰 / 전체 토큰)이 max_padding_ratio를 넘으면 새 버킷을 시작합니다.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    buckets: List[List[int]] = []
+    current: List[int] = []
+    real = 0
+    for i in order:
+        length = lengths[i]
+        if current:
+            padded = length * (len(current) + 1)  # 정렬되어 있어 새 입력이 가장 긺
+            if len(current) >= max_batch_size or 1 - (real + length) / padded > max_padding_ratio:
+                buckets.append(current)
+                current, real = [], 0
+        current.append(i)
+        real += length
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def _unbatch(outputs: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """배치 순전파 결과에서 index번째 입력의 결과를 배치 크기 1 형태로 꺼냅니다."""
+    item: Dict[str, Any] = {}
+    for key, value in outputs.items():
+        if value is None:
+            item[key] = None
+        elif hasattr(value, "unsqueeze"):
+            item[key] = value[index].unsqueeze(0)
+        else:
+            item[key] = value[index]
+    return item
+
+
+class LengthBucketScheduler:
+    """토큰 분류 파이프라인을 토큰 길이 버킷 단위로 실행합니다. (결과는 `pipe(texts)`와 같음)
+
+    패딩 비율과 초당 처리 토큰 수를 누적해 `stats()`로 제공합니다.
+    windower가 있으면 창 나누기도 맡으므로 호출자는 원문을 그대로 넘기고, 결과 오프셋은 원문 기준입니다.
+    pipeline_kwargs에는 파이프라인을 만들 때 넘긴 인자(예: aggregation_strategy)를 줍니다.
+    """
+
+    def __init__(
+        self,
+        pipe,
+        max_batch_size: int = 16,
+        max_padding_ratio: float = 0.25,
+        windower: Optional[Windower] = None,
+        pipeline_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.pipe = pipe
+        self.windower = windower
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_padding_ratio = max(0.0, float(max_padding_ratio))
+        # (전처리, 순전파, 후처리) 인자. None이면 버킷 없이 pipe(texts)로 실행
+        self._params: Optional[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]] = None
+        self._collate = None
+        sanitize = getattr(pipe, "_sanitize_parameters", None)
+        if callable(sanitize) and pad_collate_fn is not None:
+            self._params = sanitize(**(pipeline_kwargs or {}))
+            self._collate = pad_collate_fn(pipe.tokenizer, None)
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._sequences = 0
+        self._real_tokens = 0
+        self._padded_tokens = 0
+        self._forward_seconds = 0.0
+
+    def _encode(self, text: str) -> Iterator[Tuple[Dict[str, Any], Optional[Tuple[int, int]]]]:
+        """문장을 한 번 토큰화해 (모델 입력, 유지 구간) 청크를 만듭니다. (창 나누기가 없으면 유지 구간 None)"""
+        if self.windower is None:
+            for model_inputs in self.pipe.preprocess(text, **self._params[0]):
+                yield model_inputs, None
+            return
+        encoding = self.pipe.tokenizer(
+            text, return_offsets_mapping=True, return_special_tokens_mask=True, verbose=False
+        )
+        special = encoding["special_tokens_mask"]
+        # 앞뒤 특수 토큰([CLS]/[SEP] 등)은 창마다 그대로 붙임
+        head, tail = 0, len(special)
+        while head < tail and special[head]:
+            head += 1
+        while tail > head and special[tail - 1]:
+            tail -= 1
+        for start, end, keep_start, keep_end in self.windower(encoding["offset_mapping"][head:tail], len(text)):
+            positions = [*range(head), *range(head + start, head + end), *range(tail, len(special))]
+            model_inputs: Dict[str, Any] = {
+                key: torch.tensor([[values[p] for p in positions]]) for key, values in encoding.items()
+            }
+            # 오프셋이 원문 기준이라 후처리도 원문을 기준으로 함
+            model_inputs["sentence"] = text
+            model_inputs["is_last"] = True
+            yield model_inputs, (keep_start, keep_end)
+
+    def _postprocess(self, outputs: List[Tuple[Dict[str, Any], Optional[Tuple[int, int]]]]) -> List[Dict]:
+        params = self._params[2]
+        if len(outputs) == 1 or outputs[0][1] is None:
+            return self.pipe.postprocess([output for output, _ in outputs], **params)
+        # 창마다 따로 후처리하고 겹친 구간은 자신의 유지 구간에서 시작하는 개체만 남김
+        merged: List[Dict] = []
+        seen = set()
+        for output, (keep_start, keep_end) in outputs:
+            for ent in self.pipe.postprocess([output], **params):
+                key = (ent["start"], ent["end"], ent.get("entity_group"))
+                if keep_start <= ent["start"] < keep_end and key not in seen:
+                    seen.add(key)
+                    merged.append(ent)
+        return merged
+
+    def _run_plain(self, texts: Sequence[str]) -> List[List[Dict]]:
+        """버킷 없이 파이프라인에 그대로 넘깁니다. (창 나누기가 있으면 창 텍스트를 넘기고 원문 위치로 되돌림)"""
+        if self.windower is None:
+            return list(self.pipe(list(texts), batch_size=min(len(texts), self.max_batch_size)))
+        # (문장 번호, 창 시작 글자, 유지 시작, 유지 끝, 창 텍스트)
+        windows: List[Tuple[int, int, int, int, str]] = []
+        for idx, text in enumerate(texts):
+            offsets = self.pipe.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+            if not offsets:
+                windows.append((idx, 0, 0, len(text), text))
+                continue
+            for start, end, keep_start, keep_end in self.windower(offsets, len(text)):
+                char_start, char_end = offsets[start][0], offsets[end - 1][1]
+                windows.append((idx, char_start, keep_start, keep_end, text[char_start:char_end]))
+        outputs = self.pipe([w[4] for w in windows], batch_size=min(len(windows), self.max_batch_size))
+        results: List[List[Dict]] = [[] for _ in texts]
+        seen = set()
+        for (idx, shift, keep_start, keep_end, _), entities in zip(windows, outputs):
+            for ent in entities:
+                ent = dict(ent, start=ent["start"] + shift, end=ent["end"] + shift)
+                key = (idx, ent["start"], ent["end"], ent.get("entity_group"))
+                if keep_start <= ent["start"] < keep_end and key not in seen:
+                    seen.add(key)
+                    results[idx].append(ent)
+        return results
+
+    def __call__(self, texts: Sequence[str]) -> List[List[Dict]]:
+        if self._params is None:
+            return self._run_plain(texts)
+        # 전처리(토큰화)는 문장당 한 번 (긴 문장은 여러 청크가 나올 수 있음)
+        chunks: List[Tuple[int, Dict[str, Any], Optional[Tuple[int, int]]]] = []
+        for idx, text in enumerate(texts):
+            for model_inputs, keep in self._encode(text):
+                chunks.append((idx, model_inputs, keep))
+        lengths = [inputs["input_ids"].shape[-1] for _, inputs, _ in chunks]
+
+        chunk_outputs: List[Dict[str, Any]] = [{}] * len(chunks)
+        for bucket in plan_buckets(lengths, self.max_batch_size, self.max_padding_ratio):
+            batch = self._collate([chunks[i][1] for i in bucket])
+            started = time.perf_counter()
+            outputs = self.pipe.forward(batch, **self._params[1])
+            self._record(
+                len(bucket),
+                sum(lengths[i] for i in bucket),
+                max(lengths[i] for i in bucket) * len(bucket),
+                time.perf_counter() - started,
+            )
+            for pos, i in enumerate(bucket):
+                chunk_outputs[i] = _unbatch(outputs, pos)
+
+        per_text: List[List[Tuple[Dict[str, Any], Optional[Tuple[int, int]]]]] = [[] for _ in texts]
+        for (idx, _, keep), output in zip(chunks, chunk_outputs):
+            per_text[idx].append((output, keep))
+        return [self._postprocess(outputs) for outputs in per_text]
+
+    def _record(self, sequences: int, real_tokens: int, padded_tokens: int, seconds: float) -> None:
+        with self._lock:
+            self._batches += 1
+            self._sequences += sequences
+            self._real_tokens += real_tokens
+            self._padded_tokens += padded_tokens
+            self._forward_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """누적 배치 수/평균 배치 크기/패딩 비율/초당 토큰 수."""
+        with self._lock:
+            batches, sequences = self._batches, self._sequences
+            real, padded, seconds = self._real_tokens, self._padded_tokens, self._forward_seconds
+        return {
+            "batches": batches,
+            "sequences": sequences,
+            "avg_batch_size": round(sequences / batches, 2) if batches else 0.0,
+            "real_tokens": real,
+            "padded_tokens": padded,
+            "padding_ratio": round(1 - real / padded, 4) if padded else 0.0,
+            "tokens_per_sec": round(real / seconds, 1) if seconds else 0.0,
+            "forward_seconds": round(seconds, 3),
+        }
+
+
+__all__ = ["Windower", "plan_buckets", "LengthBucketScheduler"]
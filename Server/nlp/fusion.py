@@ -1,12 +1,41 @@
-from typing import Dict, List
+from bisect import bisect_right
+from typing import Iterable, List, Sequence, Set
 
+try:
+    from .spans import Span
+except Exception:  # pragma: no cover
+    from backend.nlp.spans import Span  # type: ignore
 
-def _has_conflict(a: Dict, b: Dict) -> bool:
-    return not (a["end"] <= b["start"] or b["end"] <= a["start"])
+# 다른 결과에 포함되면 제거되는 규칙 기반 결과의 source
+RULE_SOURCES = (
+    "Presidio",
+    "AccountNumberRecognizer",
+    "CvcRecognizer",
+    "PassportRecognizer",
+    "SSMRecognizer",
+    # 규칙 전용 압축 스캐너(rule_engine.COMPACT_PATTERNS)에만 있는 인식기
+    "CreditCardRecognizer",
+    "PhoneRecognizer",
+    "EmailRecognizer",
+    "IpRecognizer",
+    "IbanRecognizer",
+    "UrlRecognizer",
+)
 
+# 겹치는 결과 선택 방식
+# - greedy: 시작이 빠르고 긴 결과부터 선택 (기존 방식)
+# - weighted: 출처 우선순위 × 점수 × 길이의 합이 최대가 되도록 선택
+FUSION_MODE_GREEDY = "greedy"
+FUSION_MODE_WEIGHTED = "weighted"
+FUSION_MODES = (FUSION_MODE_GREEDY, FUSION_MODE_WEIGHTED)
 
-def _longer_first_key(x: Dict):
-    return (x["start"], -(x["end"] - x["start"]))
+
+def _has_conflict(a: Span, b: Span) -> bool:
+    return not (a.end <= b.start or b.end <= a.start)
+
+
+def _longer_first_key(x: Span):
+    return (x.start, x.start - x.end)
 
 
 def _priority(source: str) -> int:
@@ -18,11 +47,136 @@ def _priority(source: str) -> int:
     return 1
 
 
-def fuse_and_resolve(results_local: List[Dict], results_rules: List[Dict] = None) -> List[Dict]:
+def _weight(x: Span) -> float:
+    return _priority(x.source) * x.score * (x.end - x.start)
+
+
+# 아래 선택/포함 판정은 시작·끝 위치 배열과 인덱스로 동작하므로
+# Span 결과(fuse_and_resolve)와 규칙 전용 압축 배열(resolve_indices)이 같은 구현을 씁니다.
+
+
+def _greedy_indices(starts: Sequence[int], ends: Sequence[int], order: Iterable[int]) -> List[int]:
+    # 시작 오름차순, 길이 내림차순 정렬 후 겹치지 않는 결과를 앞에서부터 선택
+    final: List[int] = []
+    last_end = -1
+    for i in sorted(order, key=lambda i: (starts[i], starts[i] - ends[i])):
+        if starts[i] >= last_end:
+            final.append(i)
+            last_end = ends[i]
+    return final
+
+
+def _weighted_indices(
+    starts: Sequence[int], ends: Sequence[int], weights: Sequence[float], order: Iterable[int]
+) -> List[int]:
+    """가중 구간 스케줄링: 겹치지 않는 결과 중 가중치 합이 최대인 집합. (O(n log n))
+
+    끝 위치로 정렬한 뒤 j번째 결과를 고를 때/안 고를 때의 최적값을 동적 계획법으로 구합니다.
+    (같은 가중치면 결과를 덜 고르는 쪽을 택함)
+    """
+    items = sorted(order, key=lambda i: (ends[i], starts[i]))
+    if not items:
+        return []
+    sorted_ends = [ends[i] for i in items]
+    best = [0.0] * (len(items) + 1)  # best[j]: 앞의 j개 결과로 만들 수 있는 최대 가중치
+    take = [False] * len(items)
+    prev = [0] * len(items)  # j번째를 고를 때 함께 고를 수 있는 앞쪽 결과 수
+    for j, i in enumerate(items):
+        prev[j] = bisect_right(sorted_ends, starts[i], 0, j)
+        with_item = weights[i] + best[prev[j]]
+        if with_item > best[j]:
+            best[j + 1] = with_item
+            take[j] = True
+        else:
+            best[j + 1] = best[j]
+
+    final: List[int] = []
+    j = len(items)
+    while j > 0:
+        if take[j - 1]:
+            final.append(items[j - 1])
+            j = prev[j - 1]
+        else:
+            j -= 1
+    final.reverse()
+    return final
+
+
+def _contained(starts: Sequence[int], ends: Sequence[int], candidates: Iterable[int]) -> Set[int]:
+    """candidates 중 다른 결과에 완전히 포함되는(같은 범위 포함) 항목의 인덱스.
+
+    시작 오름차순/끝 내림차순으로 한 번 정렬한 뒤 훑습니다. (O(n log n))
+    - 시작이 더 앞선 결과들의 최대 끝 위치가 자신의 끝 이상이면 포함됨
+    - 시작이 같은 결과들 중에서는 자신보다 앞(끝이 더 큼)에 있거나,
+      맨 앞이더라도 같은 끝을 가진 다른 결과가 있으면 포함됨
+    """
+    wanted = set(candidates)
+    if not wanted:
+        return set()
+    order = sorted(range(len(starts)), key=lambda i: (starts[i], -ends[i]))
+    discard: Set[int] = set()
+    prefix_max_end = None
+    pos = 0
+    while pos < len(order):
+        start = starts[order[pos]]
+        group_end = pos
+        while group_end < len(order) and starts[order[group_end]] == start:
+            group_end += 1
+        for k in range(pos, group_end):
+            i = order[k]
+            if i not in wanted:
+                continue
+            end = ends[i]
+            if (
+                (prefix_max_end is not None and prefix_max_end >= end)
+                or k > pos
+                or (k + 1 < group_end and ends[order[k + 1]] == end)
+            ):
+                discard.add(i)
+        group_max_end = ends[order[pos]]
+        if prefix_max_end is None or group_max_end > prefix_max_end:
+            prefix_max_end = group_max_end
+        pos = group_end
+    return discard
+
+
+def contained_indices(spans: List[Span], candidates: Iterable[int]) -> Set[int]:
+    """candidates 중 다른 결과에 완전히 포함되는(같은 범위 포함) 항목의 인덱스."""
+    return _contained([s.start for s in spans], [s.end for s in spans], candidates)
+
+
+def resolve_indices(
+    starts: Sequence[int],
+    ends: Sequence[int],
+    kinds: Sequence[int],
+    kind_scores: Sequence[float],
+    mode: str = FUSION_MODE_GREEDY,
+) -> List[int]:
+    """규칙 결과만 있는 압축 배열용 `fuse_and_resolve`. 선택된 인덱스를 시작 위치 순으로 반환합니다.
+
+    kinds는 결과별 종류 번호, kind_scores는 종류별 점수입니다.
+    모든 결과가 규칙 기반이므로 다른 결과에 포함되는 결과를 모두 제거한 뒤 선택합니다.
+    (가중치의 출처 우선순위는 모두 같음)
+    """
+    if not starts:
+        return []
+    discard = _contained(starts, ends, range(len(starts)))
+    keep = [i for i in range(len(starts)) if i not in discard]
+    if mode == FUSION_MODE_WEIGHTED:
+        weights = [kind_scores[k] * (e - s) for s, e, k in zip(starts, ends, kinds)]
+        return _weighted_indices(starts, ends, weights, keep)
+    return _greedy_indices(starts, ends, keep)
+
+
+def fuse_and_resolve(
+    results_local: List[Span], results_rules: List[Span] = None, mode: str = FUSION_MODE_GREEDY
+) -> List[Span]:
     """충돌 해결:
     1) 규칙 기반 결과가 다른 결과에 완전히 포함되면 규칙 결과 제거
-    2) 시작 오름차순, 길이 내림차순 정렬
-    3) 그리디하게 겹치지 않는 결과 선택
+    2) 겹치지 않는 결과 선택
+       - greedy: 시작 오름차순, 길이 내림차순 정렬 후 그리디 선택
+       - weighted: 출처 우선순위(Numeric > Text > Presidio) × 점수 × 길이 합이 최대인 조합 선택
+    결과는 시작 위치 오름차순입니다.
     """
     combined = list(results_local)
     if results_rules:
@@ -31,30 +185,19 @@ def fuse_and_resolve(results_local: List[Dict], results_rules: List[Dict] = None
     if not combined:
         return []
 
-    # 1) 규칙 기반 결과가 다른 결과에 완전히 포함되면 제거
-    indices_to_discard = set()
-    for i, a in enumerate(combined):
-        if a.get("source") not in ("Presidio", "AccountNumberRecognizer", "CvcRecognizer", "PassportRecognizer", "SSMRecognizer"):
-            continue
-        for j, b in enumerate(combined):
-            if i == j:
-                continue
-            if b["start"] <= a["start"] and b["end"] >= a["end"]:
-                indices_to_discard.add(i)
-                break
-    filtered = [r for idx, r in enumerate(combined) if idx not in indices_to_discard]
-
-    # 2) 시작 오름차순, 길이 내림차순 정렬
-    filtered.sort(key=_longer_first_key)
-
-    # 3) 그리디 선택
-    final: List[Dict] = []
-    last_end = -1
-    for res in filtered:
-        if res["start"] >= last_end:
-            final.append(res)
-            last_end = res["end"]
-
-    return final
+    # 시작/끝 위치 배열은 한 번만 만들고 두 단계가 인덱스로 함께 씀 (결과 복사/재정렬 없음)
+    starts = [r.start for r in combined]
+    ends = [r.end for r in combined]
 
+    # 1) 규칙 기반 결과가 다른 결과에 완전히 포함되면 제거
+    indices_to_discard = _contained(
+        starts, ends, (i for i, r in enumerate(combined) if r.source in RULE_SOURCES)
+    )
+    keep = [i for i in range(len(combined)) if i not in indices_to_discard]
 
+    if mode == FUSION_MODE_WEIGHTED:
+        weights = [_weight(r) for r in combined]
+        selected = _weighted_indices(starts, ends, weights, keep)
+    else:
+        selected = _greedy_indices(starts, ends, keep)
+    return [combined[i] for i in selected]
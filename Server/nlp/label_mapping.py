@@ -1,4 +1,5 @@
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Optional
 
 
 # 원본 라벨 -> 표준 코드(약어) 정규화
@@ -104,3 +105,12 @@ def to_display_label(label: str, locale: str = "ko") -> str:
     return code
 
 
+@lru_cache(maxsize=8)
+def display_table(locale: str = "ko") -> Dict[str, str]:
+    """알려진 모든 원본/표준 라벨 → 표시명 표.
+
+    엔티티마다 정규화/조회를 반복하지 않도록 locale별로 한 번만 만듭니다.
+    (표에 없는 라벨은 `to_display_label`로 처리)
+    """
+    labels = set(_MAP_TO_CODE) | set(_MAP_TO_CODE.values())
+    return {label: to_display_label(to_standard_label(label) or label, locale=locale) for label in labels}
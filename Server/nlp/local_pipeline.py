@@ -1,69 +1,359 @@
-from typing import Dict, List
+import os
+import sys
+from typing import Callable, Dict, List, Tuple
 
 from functools import lru_cache
 from transformers import AutoModelForTokenClassification, AutoTokenizer, pipeline
 
 # 실행 환경에 따라 임포트 경로가 달라질 수 있어 두 경로를 지원합니다.
 try:
-    from ..config import TEXT_MODEL_PATH, NUMERIC_MODEL_PATH, get_device  # type: ignore
+    from ..config import (  # type: ignore
+        TEXT_MODEL_PATH,
+        NUMERIC_MODEL_PATH,
+        NER_BACKEND,
+        NER_QUANTIZE,
+        ENABLE_MICRO_BATCHING,
+        NER_BATCH_MAX_SIZE,
+        NER_BATCH_MAX_WAIT_MS,
+        NER_BUCKETING,
+        NER_BUCKET_MAX_PADDING,
+        NER_CHUNK_SIZE,
+        NER_CHUNK_STRIDE,
+        get_device,
+    )
+    from .batcher import MicroBatcher
+    from .bucketing import LengthBucketScheduler
+    from .spans import Span, span_from_tuple
+    from ..utils.metrics import REGISTRY
 except Exception:  # pragma: no cover
-    from backend.config import TEXT_MODEL_PATH, NUMERIC_MODEL_PATH, get_device  # type: ignore
+    from backend.config import (  # type: ignore
+        TEXT_MODEL_PATH,
+        NUMERIC_MODEL_PATH,
+        NER_BACKEND,
+        NER_QUANTIZE,
+        ENABLE_MICRO_BATCHING,
+        NER_BATCH_MAX_SIZE,
+        NER_BATCH_MAX_WAIT_MS,
+        NER_BUCKETING,
+        NER_BUCKET_MAX_PADDING,
+        NER_CHUNK_SIZE,
+        NER_CHUNK_STRIDE,
+        get_device,
+    )
+    from backend.nlp.batcher import MicroBatcher  # type: ignore
+    from backend.nlp.bucketing import LengthBucketScheduler  # type: ignore
+    from backend.nlp.spans import Span, span_from_tuple  # type: ignore
+    from backend.utils.metrics import REGISTRY  # type: ignore
+
+
+# 토큰 분류 파이프라인 생성 인자 (버킷 스케줄러도 같은 인자로 단계별 인자를 만듦)
+_PIPELINE_KWARGS = {"aggregation_strategy": "simple"}
+
+
+def _build_pipe(model_path: str, quantize: bool = False):
+    """NER_BACKEND에 맞는 토큰 분류 파이프라인을 만듭니다. (결과 형식은 백엔드와 무관)
+
+    quantize=True면 INT8 모델을 사용합니다. (torch는 로딩 후 동적 양자화, CPU 전용)
+    stub 백엔드는 모델 경로/양자화와 무관하게 정규식 기반 가짜 파이프라인을 돌려줍니다.
+    """
+    if NER_BACKEND == "stub":
+        try:
+            from .stub_backend import load_stub_pipeline  # type: ignore
+        except Exception:  # pragma: no cover
+            from backend.nlp.stub_backend import load_stub_pipeline  # type: ignore
+        return load_stub_pipeline()
+    if NER_BACKEND == "onnx":
+        try:
+            from .onnx_backend import load_onnx_pipeline  # type: ignore
+        except Exception:  # pragma: no cover
+            from backend.nlp.onnx_backend import load_onnx_pipeline  # type: ignore
+        return load_onnx_pipeline(model_path, quantized=quantize)
+    model = AutoModelForTokenClassification.from_pretrained(model_path)
+    device = get_device()
+    if quantize:
+        try:
+            from .quantization import quantize_torch_model  # type: ignore
+        except Exception:  # pragma: no cover
+            from backend.nlp.quantization import quantize_torch_model  # type: ignore
+        model = quantize_torch_model(model)
+        device = -1
+    return pipeline(
+        "ner",
+        model=model,
+        tokenizer=AutoTokenizer.from_pretrained(model_path),
+        device=device,
+        **_PIPELINE_KWARGS,
+    )
 
 
 # 일반 텍스트에서 개체를 찾는 파이프라인을 준비합니다.
 # 한 번 만든 뒤 캐시에 보관해 재사용합니다.
 @lru_cache(maxsize=1)
 def _get_text_pipe():
-    return pipeline(
-        "ner",
-        model=AutoModelForTokenClassification.from_pretrained(TEXT_MODEL_PATH),
-        tokenizer=AutoTokenizer.from_pretrained(TEXT_MODEL_PATH),
-        aggregation_strategy="simple",
-        device=get_device(),
-    )
+    return _build_pipe(TEXT_MODEL_PATH)
 
 
 # 숫자·식별자 같은 패턴 위주의 개체를 찾는 파이프라인을 준비합니다.
 # 한 번 만든 뒤 캐시에 보관해 재사용합니다.
 @lru_cache(maxsize=1)
 def _get_numeric_pipe():
-    return pipeline(
-        "ner",
-        model=AutoModelForTokenClassification.from_pretrained(NUMERIC_MODEL_PATH),
-        tokenizer=AutoTokenizer.from_pretrained(NUMERIC_MODEL_PATH),
-        aggregation_strategy="simple",
-        device=get_device(),
-    )
+    return _build_pipe(NUMERIC_MODEL_PATH, quantize=NER_QUANTIZE == "int8")
 
 
-# 모델 출력 목록을 공통 딕셔너리 형식으로 바꿉니다.
-# entity_type/start/end/score/source 키를 사용합니다.
-def _convert(pipeline_outputs, recognizer_name: str) -> List[Dict]:
-    results: List[Dict] = []
-    for ent in pipeline_outputs:
-        results.append(
-            {
-                "entity_type": ent.get("entity_group"),
-                "start": int(ent.get("start")),
-                "end": int(ent.get("end")),
-                "score": float(ent.get("score", 0.0)),
-                "source": recognizer_name,
-            }
+# 모델 출력 목록을 공통 구간 형식(Span)으로 바꿉니다.
+# 라벨은 엔티티마다 새 문자열로 나오므로 intern해 같은 라벨끼리 한 객체를 공유합니다.
+# (점수는 numpy float32로 올 수 있어 float로 변환)
+def _convert(pipeline_outputs, recognizer_name: str) -> List[Span]:
+    intern = sys.intern
+    source = intern(recognizer_name)
+    return [
+        span_from_tuple(
+            (
+                intern(ent.get("entity_group") or ""),
+                int(ent.get("start")),
+                int(ent.get("end")),
+                float(ent.get("score", 0.0)),
+                source,
+            )
         )
+        for ent in pipeline_outputs
+    ]
+
+
+# 창 크기(토큰 수): NER_CHUNK_SIZE를 모델 최대 길이에서 [CLS]/[SEP] 자리를 뺀 값으로 제한합니다.
+def _chunk_size(tokenizer) -> int:
+    size = NER_CHUNK_SIZE
+    max_len = getattr(tokenizer, "model_max_length", 0) or 0
+    if 2 < max_len < 100_000:
+        size = min(size, max_len - 2)
+    return size
+
+
+# 토큰 오프셋을 서로 겹치는 창으로 나눕니다.
+# (토큰 시작, 토큰 끝, 유지 시작, 유지 끝) 목록을 반환하며 유지 구간은 문자 오프셋입니다.
+# 겹친 구간은 가운데 토큰을 기준으로 앞 창과 뒤 창이 나눠 가집니다.
+def _plan_windows(offsets, text_len: int, size: int) -> List[Tuple[int, int, int, int]]:
+    n = len(offsets)
+    if n <= size:
+        return [(0, n, 0, text_len)]
+
+    # 겹침은 (모델 한도로 줄어든) 창 크기의 절반까지만: 창이 최소 size // 2 토큰씩 전진하므로
+    # 창 수가 토큰 수 / (size // 2)를 넘지 않음 (겹침이 창 크기에 가까우면 창이 한 토큰씩만 전진)
+    stride = min(max(0, NER_CHUNK_STRIDE), size // 2)
+    token_windows: List[Tuple[int, int]] = []
+    s = 0
+    while True:
+        e = min(s + size, n)
+        token_windows.append((s, e))
+        if e >= n:
+            break
+        s += size - stride
+
+    windows: List[Tuple[int, int, int, int]] = []
+    keep_start = 0
+    for i, (s, e) in enumerate(token_windows):
+        if i == len(token_windows) - 1:
+            keep_end = text_len
+        else:
+            next_start = token_windows[i + 1][0]
+            keep_end = offsets[(next_start + e) // 2][0]
+        windows.append((s, e, keep_start, keep_end))
+        keep_start = keep_end
+    return windows
+
+
+# 긴 텍스트를 서로 겹치는 토큰 창(window)으로 나눕니다.
+# (창 시작, 창 끝, 유지 시작, 유지 끝) 문자 오프셋 목록을 반환합니다.
+def _window_spans(tokenizer, text: str) -> List[Tuple[int, int, int, int]]:
+    whole = [(0, len(text), 0, len(text))]
+    # 토큰은 최소 한 글자이므로 글자 수가 창 크기 이하면 토큰화 없이 통과
+    if NER_CHUNK_SIZE <= 0 or len(text) <= _chunk_size(tokenizer):
+        return whole
+
+    offsets = tokenizer(
+        text, add_special_tokens=False, return_offsets_mapping=True, verbose=False
+    )["offset_mapping"]
+    windows = _plan_windows(offsets, len(text), _chunk_size(tokenizer))
+    if len(windows) == 1:
+        return whole
+    last = len(windows) - 1
+    return [
+        (0 if i == 0 else offsets[s][0], len(text) if i == last else offsets[e - 1][1], keep_start, keep_end)
+        for i, (s, e, keep_start, keep_end) in enumerate(windows)
+    ]
+
+
+# 여러 텍스트를 창 단위로 나눠 한 번에 실행하고, 결과 오프셋을 원문 기준으로 되돌립니다.
+# 겹친 구간의 개체는 자신의 유지 구간에서 시작하는 것만 남겨 중복을 없앱니다.
+def _run_windowed(
+    texts: List[str], tokenizer, run_batch: Callable[[List[str]], List[List[Span]]]
+) -> List[List[Span]]:
+    spans_per_text = [_window_spans(tokenizer, text) for text in texts]
+    flat = [text[cs:ce] for text, spans in zip(texts, spans_per_text) for cs, ce, _, _ in spans]
+    flat_out = run_batch(flat) if flat else []
+
+    results: List[List[Span]] = []
+    k = 0
+    for spans in spans_per_text:
+        if len(spans) == 1:
+            results.append(flat_out[k])
+            k += 1
+            continue
+        merged: List[Span] = []
+        seen = set()
+        for cs, _, keep_start, keep_end in spans:
+            for ent in flat_out[k]:
+                start, end = ent.start + cs, ent.end + cs
+                if not (keep_start <= start < keep_end):
+                    continue
+                key = (start, end, ent.entity_type)
+                if key in seen:
+                    continue
+                seen.add(key)
+                merged.append(ent._replace(start=start, end=end))
+            k += 1
+        results.append(merged)
     return results
 
 
 # 텍스트용과 숫자용 모델을 모두 실행하고 결과를 하나로 합칩니다.
-def run_dual_pipelines(text: str) -> List[Dict]:
-    text_out = _get_text_pipe()(text)
-    num_out = _get_numeric_pipe()(text)
-    return _convert(text_out, "TextRecognizer") + _convert(num_out, "NumericRecognizer")
+def run_dual_pipelines(text: str) -> List[Span]:
+    text_pipe = _get_text_pipe()
+
+    def run_text(texts: List[str]) -> List[List[Span]]:
+        outputs = text_pipe(texts, batch_size=min(len(texts), NER_BATCH_MAX_SIZE))
+        return [_convert(out, "TextRecognizer") for out in outputs]
+
+    text_results = _run_windowed([text], text_pipe.tokenizer, run_text)[0]
+    return text_results + run_numeric_pipeline(text)
+
+
+# 버킷 배칭은 HF 파이프라인의 전처리/순전파를 직접 호출하므로 stub 백엔드에서는 쓰지 않습니다.
+_BUCKETING = NER_BUCKETING and NER_BACKEND != "stub"
+
+
+# 버킷 스케줄러의 창 나누기: 스케줄러가 한 번 토큰화한 결과의 오프셋으로 창을 정합니다.
+def _numeric_windows(offsets, text_len: int) -> List[Tuple[int, int, int, int]]:
+    tokenizer = _get_numeric_pipe().tokenizer
+    if NER_CHUNK_SIZE <= 0:
+        # 창 나누기를 끄면 파이프라인처럼 모델 최대 길이에서 자름
+        max_len = getattr(tokenizer, "model_max_length", 0) or 0
+        n = min(len(offsets), max_len - 2) if 2 < max_len < 100_000 else len(offsets)
+        return [(0, n, 0, text_len)]
+    return _plan_windows(offsets, text_len, _chunk_size(tokenizer))
+
+
+# 숫자 모델 앞에서 입력을 토큰 길이 버킷으로 묶어 실행하는 스케줄러입니다.
+# 창 나누기도 스케줄러가 맡아 긴 텍스트도 한 번만 토큰화합니다.
+@lru_cache(maxsize=1)
+def _get_numeric_scheduler() -> LengthBucketScheduler:
+    return LengthBucketScheduler(
+        _get_numeric_pipe(),
+        max_batch_size=NER_BATCH_MAX_SIZE,
+        max_padding_ratio=NER_BUCKET_MAX_PADDING,
+        windower=_numeric_windows,
+        pipeline_kwargs=_PIPELINE_KWARGS,
+    )
+
+
+# 여러 문장을 한 번의 배치 추론으로 처리합니다.
+# 버킷 배칭이 켜져 있으면 길이가 비슷한 입력끼리 묶어 패딩을 줄이고,
+# 꺼져 있으면 파이프라인이 입력 순서대로 묶어 배치 내 가장 긴 입력에 맞춰 패딩합니다.
+def _numeric_batch(texts: List[str]) -> List[List[Span]]:
+    if _BUCKETING:
+        outputs = _get_numeric_scheduler()(list(texts))
+    else:
+        outputs = _get_numeric_pipe()(list(texts), batch_size=min(len(texts), NER_BATCH_MAX_SIZE))
+    return [_convert(out, "NumericRecognizer") for out in outputs]
+
+
+def get_numeric_batch_stats() -> Dict:
+    """숫자 모델 버킷 배칭의 누적 패딩 비율/초당 토큰 수 등 통계. (버킷 배칭을 쓰지 않으면 빈 dict)"""
+    if not _BUCKETING or _get_numeric_scheduler.cache_info().currsize == 0:
+        return {}
+    return _get_numeric_scheduler().stats()
+
+
+# 패딩 비율/초당 토큰 수 같은 비율 값은 워커별 스냅샷을 더하면 틀어지므로 내보내지 않습니다.
+# 합산되는 카운터에서 Prometheus가 계산합니다. (예: 1 - ner_tokens_total{kind="real"} / ner_tokens_total{kind="padded"},
+# rate(ner_tokens_total{kind="real"}[5m]) / rate(ner_forward_seconds_total[5m]))
+def _batch_metrics():
+    stats = get_numeric_batch_stats()
+    if not stats:
+        return []
+    return [
+        ("ner_batches_total", "counter", "숫자 NER 순전파 배치 수", [({}, stats["batches"])]),
+        ("ner_sequences_total", "counter", "숫자 NER 순전파 입력 수", [({}, stats["sequences"])]),
+        (
+            "ner_tokens_total",
+            "counter",
+            "숫자 NER 순전파 토큰 수 (real: 실제, padded: 패딩 포함)",
+            [({"kind": "real"}, stats["real_tokens"]), ({"kind": "padded"}, stats["padded_tokens"])],
+        ),
+        ("ner_forward_seconds_total", "counter", "숫자 NER 순전파 누적 시간(초)", [({}, stats["forward_seconds"])]),
+    ]
+
+
+REGISTRY.register_collector(_batch_metrics)
+
+
+# 동시에 들어온 단건 요청을 모아 배치로 넘기는 배처입니다.
+@lru_cache(maxsize=1)
+def _get_numeric_batcher() -> MicroBatcher:
+    return MicroBatcher(
+        _numeric_batch,
+        max_batch_size=NER_BATCH_MAX_SIZE,
+        max_wait_ms=NER_BATCH_MAX_WAIT_MS,
+        name="numeric-ner-batcher",
+    )
+
+
+def shutdown_numeric_batcher(wait: bool = True) -> None:
+    """만들어 둔 마이크로 배처가 있으면 대기 중인 입력을 처리하고 종료합니다. (다음 호출 때 새로 만듦)
+
+    wait=True면 작업 스레드가 끝날 때까지 기다립니다. (워커 종료 시 gunicorn.conf.py의 worker_exit)
+    """
+    if _get_numeric_batcher.cache_info().currsize:
+        _get_numeric_batcher().shutdown(wait=wait)
+    _get_numeric_batcher.cache_clear()
+
+
+# 부모 프로세스의 배처 스레드/대기열은 fork된 자식에서 쓸 수 없으므로 닫고 새로 만들게 합니다.
+# (자식에는 작업 스레드가 없으므로 기다리지 않음. 모델 파이프라인 캐시는 그대로 두어 가중치를 copy-on-write로 공유)
+os.register_at_fork(after_in_child=lambda: shutdown_numeric_batcher(wait=False))
+
+
+# 창(또는 짧은 문장) 목록을 숫자 모델로 실행합니다.
+# 마이크로 배칭이 켜져 있으면 다른 요청의 입력과 함께 묶입니다.
+def _run_numeric(texts: List[str]) -> List[List[Span]]:
+    if ENABLE_MICRO_BATCHING:
+        futures = _get_numeric_batcher().submit_many(texts)
+        return [f.result() for f in futures]
+    return _numeric_batch(texts)
 
 
 # 숫자/식별자 전용 모델만 실행합니다.
-def run_numeric_pipeline(text: str) -> List[Dict]:
-    """숫자/식별자 전용 모델만 실행합니다."""
-    num_out = _get_numeric_pipe()(text)
-    return _convert(num_out, "NumericRecognizer")
+def run_numeric_pipeline(text: str) -> List[Span]:
+    """숫자/식별자 전용 모델만 실행합니다. (긴 텍스트는 겹치는 창으로 나눠 실행)"""
+    return run_numeric_pipeline_batch([text])[0]
+
+
+# 여러 문장을 한꺼번에 숫자/식별자 모델로 실행합니다. (입력 순서대로 반환)
+def run_numeric_pipeline_batch(texts: List[str]) -> List[List[Span]]:
+    """여러 문장을 배치로 실행합니다."""
+    if not texts:
+        return []
+    if _BUCKETING:
+        # 버킷 스케줄러가 창 나누기까지 하므로 원문을 그대로 넘김 (결과 오프셋도 원문 기준)
+        return _run_numeric(list(texts))
+    return _run_windowed(list(texts), _get_numeric_pipe().tokenizer, _run_numeric)
 
 
+# 서버 시작 시 숫자 모델과 배처를 미리 만들어 둡니다. (첫 요청의 모델 로딩 지연 제거)
+def preload_models() -> None:
+    """숫자/식별자 모델 파이프라인과 (켜져 있으면) 버킷 스케줄러, 마이크로 배처를 미리 만듭니다."""
+    _get_numeric_pipe()
+    if _BUCKETING:
+        _get_numeric_scheduler()
+    if ENABLE_MICRO_BATCHING:
+        _get_numeric_batcher()
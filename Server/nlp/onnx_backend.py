@@ -0,0 +1,158 @@
+import inspect
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import torch
+from transformers import AutoConfig, AutoTokenizer, TokenClassificationPipeline
+
+# ONNX Runtime으로 NER 모델을 실행하는 백엔드입니다.
+# HF 토큰 분류 파이프라인의 전처리/후처리(aggregation)를 그대로 쓰고
+# 모델 순전파만 ONNX Runtime 세션으로 바꾸므로 결과 형식이 torch 백엔드와 같습니다.
+# onnxruntime은 선택 의존성이라 NER_BACKEND=onnx일 때만 임포트합니다.
+
+try:
+    from ..config import ONNX_MODEL_DIR, ONNX_THREADS  # type: ignore
+    from .quantization import quantize_onnx_file
+except Exception:  # pragma: no cover
+    from backend.config import ONNX_MODEL_DIR, ONNX_THREADS  # type: ignore
+    from backend.nlp.quantization import quantize_onnx_file  # type: ignore
+
+ONNX_FILE_NAME = "model.onnx"
+ONNX_INT8_FILE_NAME = "model_int8.onnx"
+
+
+def _local_model_dir(model_path: str) -> str:
+    """모델 경로가 로컬 폴더면 그대로, HF 허브 id면 로컬 캐시의 스냅샷 폴더를 돌려줍니다."""
+    if os.path.isdir(model_path):
+        return model_path
+    try:
+        from huggingface_hub import snapshot_download
+
+        # 네트워크 없이 캐시에서만 찾음 (내보내기는 모델을 먼저 내려받은 뒤 호출)
+        return snapshot_download(model_path, local_files_only=True)
+    except Exception as e:
+        raise FileNotFoundError(
+            f"{model_path}는 로컬 폴더가 아니고 HF 캐시에서도 찾지 못했습니다. "
+            "ONNX 모델을 둘 폴더를 ONNX_MODEL_DIR로 지정하세요."
+        ) from e
+
+
+def onnx_dir_for(model_path: str) -> str:
+    """모델 경로에 대응하는 ONNX 모델 폴더.
+
+    ONNX_MODEL_DIR가 지정되면 그 아래 모델 폴더 이름으로, 아니면 `<모델 폴더>/onnx`.
+    모델 경로가 HF 허브 id(NUMERIC_MODEL_PATH=org/model)면 로컬 캐시의 스냅샷 폴더 아래에 둡니다.
+    """
+    if ONNX_MODEL_DIR:
+        return os.path.join(ONNX_MODEL_DIR, os.path.basename(os.path.normpath(model_path)))
+    return os.path.join(_local_model_dir(model_path), "onnx")
+
+
+def export_onnx(
+    model_path: str, output_dir: Optional[str] = None, opset: int = 17, quantize: bool = False
+) -> str:
+    """torch 모델을 ONNX로 내보내고 토크나이저/설정을 함께 저장합니다. 반환: 저장 폴더
+
+    배치 크기와 시퀀스 길이는 동적 축으로 내보냅니다.
+    quantize=True면 INT8 동적 양자화 모델(model_int8.onnx)도 함께 만듭니다.
+    """
+    from transformers import AutoModelForTokenClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForTokenClassification.from_pretrained(model_path)
+    model.eval()
+    # 허브 id면 위에서 내려받은 뒤라 캐시의 스냅샷 폴더를 찾을 수 있음
+    output_dir = output_dir or onnx_dir_for(model_path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    sample = tokenizer(["홍길동 010-1234-5678", "800101-1234567"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes: Dict[str, Dict[int, str]] = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch", 1: "sequence"}
+
+    # torch 2.5+는 기본 내보내기가 dynamo로 바뀌므로 기존(TorchScript) 방식을 명시.
+    # 그 이전 버전에는 dynamo 인자가 없어 넘기지 않음
+    extra = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    path = os.path.join(output_dir, ONNX_FILE_NAME)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            **extra,
+        )
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+    logging.info("ONNX 모델 저장: %s", path)
+    if quantize:
+        quantize_onnx_file(path, os.path.join(output_dir, ONNX_INT8_FILE_NAME))
+    return output_dir
+
+
+class OnnxTokenClassifier(torch.nn.Module):
+    """ONNX Runtime 세션을 HF 파이프라인이 기대하는 모델처럼 감쌉니다. (CPU 전용)"""
+
+    def __init__(self, onnx_path: str, config) -> None:
+        super().__init__()
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if ONNX_THREADS > 0:
+            options.intra_op_num_threads = ONNX_THREADS
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names: List[str] = [i.name for i in self.session.get_inputs()]
+        self.config = config
+
+    @property
+    def device(self) -> torch.device:
+        return torch.device("cpu")
+
+    @property
+    def dtype(self) -> torch.dtype:
+        return torch.float32
+
+    def can_generate(self) -> bool:
+        return False
+
+    def forward(self, **inputs) -> Dict[str, torch.Tensor]:
+        feeds = {name: inputs[name].cpu().numpy() for name in self.input_names if name in inputs}
+        (logits,) = self.session.run(["logits"], feeds)
+        return {"logits": torch.from_numpy(logits)}
+
+
+class _OnnxTokenClassificationPipeline(TokenClassificationPipeline):
+    def check_model_type(self, supported_models) -> None:
+        # 모델 클래스가 HF 매핑에 없어도 되는 ONNX 래퍼이므로 검사 생략
+        return None
+
+
+@lru_cache(maxsize=4)
+def load_onnx_pipeline(model_path: str, quantized: bool = False) -> TokenClassificationPipeline:
+    """`export_onnx`로 만든 모델을 읽어 torch 백엔드와 같은 설정의 NER 파이프라인을 만듭니다.
+
+    quantized=True면 INT8 모델(model_int8.onnx)을 사용합니다.
+    """
+    onnx_dir = onnx_dir_for(model_path)
+    onnx_path = os.path.join(onnx_dir, ONNX_INT8_FILE_NAME if quantized else ONNX_FILE_NAME)
+    if not os.path.exists(onnx_path):
+        option = " --quantize" if quantized else ""
+        raise FileNotFoundError(
+            f"{onnx_path}가 없습니다. `python -m Server.tools.export_onnx --model {model_path}{option}`로 먼저 내보내세요."
+        )
+    config = AutoConfig.from_pretrained(onnx_dir)
+    return _OnnxTokenClassificationPipeline(
+        model=OnnxTokenClassifier(onnx_path, config),
+        tokenizer=AutoTokenizer.from_pretrained(onnx_dir),
+        aggregation_strategy="simple",
+        device=-1,
+    )
+
+
+__all__ = ["ONNX_FILE_NAME", "ONNX_INT8_FILE_NAME", "onnx_dir_for", "export_onnx", "load_onnx_pipeline", "OnnxTokenClassifier"]
@@ -1,5 +1,6 @@
+import logging
 from functools import lru_cache
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 # Presidio를 사용할 수 있으면 엔진을 쓰고,
 # 없으면 간단한 정규식 인식기로 대체합니다.
@@ -10,9 +11,28 @@ try:
         AnalyzerEngine,
         Pattern,
         PatternRecognizer,
+        RecognizerRegistry,
     )  # type: ignore
+    from presidio_analyzer.nlp_engine import NlpArtifacts, NlpEngine  # type: ignore
 except Exception:  # pragma: no cover
     AnalyzerEngine = None  # type: ignore
+    PatternRecognizer = None  # type: ignore
+    NlpEngine = object  # type: ignore
+
+try:
+    from ..config import DISABLE_LOCAL_NER, PRESIDIO_MODE, RULE_ENGINE  # type: ignore
+    from .rule_engine import scan_compact, scan_rules
+    from .spans import Span, make_span
+except Exception:  # pragma: no cover
+    from backend.config import DISABLE_LOCAL_NER, PRESIDIO_MODE, RULE_ENGINE  # type: ignore
+    from backend.nlp.rule_engine import scan_compact, scan_rules  # type: ignore
+    from backend.nlp.spans import Span, make_span  # type: ignore
+
+# 단일 패스 모드에서 모든 인식기를 등록할 언어
+SINGLE_PASS_LANGUAGE = "ko"
+
+# 커스텀 정규식 인식기 이름 (그 외 Presidio 내장 인식기 결과는 source를 "Presidio"로 통일)
+RULE_RECOGNIZER_NAMES = ("AccountNumberRecognizer", "CvcRecognizer", "PassportRecognizer", "SSMRecognizer")
 
 
 # Presidio 분석 엔진을 준비합니다. (없으면 None 반환)
@@ -28,52 +48,223 @@ def _get_engine():  # type: ignore
         return None
 
 
-# 정규식 기반 인식기들을 한 번 만들어 재사용합니다.
-@lru_cache(maxsize=1)
-def _get_rule_recognizers():
-    """패턴 기반 인식기 세트."""
+def _build_rule_recognizers(language: str = "en") -> List:
+    """패턴 기반 인식기 세트를 주어진 언어로 만듭니다. (패턴은 rule_engine.RULE_PATTERNS와 동일)"""
     try:
         account_recognizer = PatternRecognizer(
             supported_entity="AN",
             name="AccountNumberRecognizer",
             patterns=[Pattern(name="계좌번호 패턴", regex=r"\b\d{2,6}[-]\d{2,6}[-]\d{2,6}\b", score=1.0)],
+            supported_language=language,
         )
         cvc_recognizer = PatternRecognizer(
             supported_entity="CVC",
             name="CvcRecognizer",
             patterns=[Pattern(name="CVC 패턴", regex=r"\b\d{3}\b", score=0.9)],
+            supported_language=language,
         )
         passport_recognizer = PatternRecognizer(
             supported_entity="PPS",
             name="PassportRecognizer",
             patterns=[Pattern(name="여권번호 패턴", regex=r"\b[A-Za-z]\d{8}\b", score=1.0)],
+            supported_language=language,
         )
         ssn_recognizer = PatternRecognizer(
             supported_entity="SSN",
             name="SSMRecognizer",
             patterns=[Pattern(name="주민번호 패턴", regex=r"\b\d{6}[-]\d{7}\b", score=1.0)],
+            supported_language=language,
         )
         return [account_recognizer, cvc_recognizer, passport_recognizer, ssn_recognizer]
     except Exception:
         return []
 
 
-def analyze_with_presidio(text: str) -> List[Dict]:
+# 정규식 기반 인식기들을 한 번 만들어 재사용합니다.
+@lru_cache(maxsize=1)
+def _get_rule_recognizers():
+    """패턴 기반 인식기 세트."""
+    return _build_rule_recognizers()
+
+
+def _use_regex_engine() -> bool:
+    """커스텀 패턴을 rule_engine의 통합 정규식으로 처리할지 여부.
+
+    RULE_ENGINE=regex|compact이거나 Presidio가 설치되지 않은 경우 True.
+    """
+    return RULE_ENGINE in ("regex", "compact") or PatternRecognizer is None
+
+
+def _run_rule_recognizers(text: str) -> List:
+    """커스텀 패턴 인식기 결과. (통합 정규식 엔진이면 이미 공통 구간 형식)"""
+    if _use_regex_engine():
+        return scan_rules(text)
+    results = []
+    for recognizer in _get_rule_recognizers():
+        try:
+            results.extend(recognizer.analyze(text=text, entities=recognizer.supported_entities))
+        except Exception:
+            continue
+    return results
+
+
+class _NoopNlpEngine(NlpEngine):  # type: ignore[misc, valid-type]
+    """토큰화/NER을 하지 않는 NLP 엔진.
+
+    패턴 인식기만 쓰는 단일 패스 모드에서 spaCy 모델 로딩과
+    언어별 반복 토큰화를 피하기 위해 사용합니다.
+    """
+
+    def __init__(self, languages: List[str]) -> None:
+        self._languages = list(languages)
+
+    def load(self) -> None:
+        return None
+
+    def is_loaded(self) -> bool:
+        return True
+
+    def process_text(self, text: str, language: str):
+        return NlpArtifacts(
+            entities=[], tokens=[], tokens_indices=[], lemmas=[], nlp_engine=self, language=language
+        )
+
+    def process_batch(self, texts, language: str, batch_size: int = 1, n_process: int = 1, **kwargs):
+        for text in texts:
+            yield text, self.process_text(text, language)
+
+    def is_stopword(self, word: str, language: str) -> bool:
+        return False
+
+    def is_punct(self, word: str, language: str) -> bool:
+        return False
+
+    def get_supported_entities(self) -> List[str]:
+        return []
+
+    def get_supported_languages(self) -> List[str]:
+        return self._languages
+
+
+# 단일 패스 엔진: 커스텀 인식기 + KR_RRN + 범용 패턴 인식기를 한 레지스트리에 등록하고
+# NLP 엔진 없이 한 번의 analyze 호출로 분석합니다. (spaCy 기반 PERSON/LOCATION 등은 제외)
+@lru_cache(maxsize=1)
+def _get_single_pass_engine():  # type: ignore
+    if AnalyzerEngine is None:
+        return None
+    try:
+        from presidio_analyzer import predefined_recognizers as predefined  # type: ignore
+
+        lang = SINGLE_PASS_LANGUAGE
+        # 통합 정규식 엔진을 쓰면 커스텀 패턴은 analyze 이후 따로 실행
+        recognizers = [] if _use_regex_engine() else _build_rule_recognizers(language=lang)
+        for class_name, kwargs in (
+            ("KrRrnRecognizer", {}),
+            ("EmailRecognizer", {}),
+            ("PhoneRecognizer", {"supported_regions": ("KR", "US")}),
+            ("CreditCardRecognizer", {}),
+            ("IbanRecognizer", {}),
+            ("IpRecognizer", {}),
+            ("UrlRecognizer", {}),
+        ):
+            recognizer_cls = getattr(predefined, class_name, None)
+            if recognizer_cls is not None:
+                recognizers.append(recognizer_cls(supported_language=lang, **kwargs))
+        registry = RecognizerRegistry(recognizers=recognizers, supported_languages=[lang])
+        return AnalyzerEngine(
+            registry=registry, nlp_engine=_NoopNlpEngine([lang]), supported_languages=[lang]
+        )
+    except Exception:
+        logging.warning("단일 패스 Presidio 엔진 생성 실패", exc_info=True)
+        return None
+
+
+def _to_spans(all_results) -> List[Span]:
+    """RecognizerResult 목록을 공통 구간 형식(Span)으로 바꿉니다."""
+    converted: List[Span] = []
+    for r in all_results:
+        if isinstance(r, Span):
+            converted.append(r)
+            continue
+        try:
+            converted.append(
+                make_span(
+                    getattr(r, "entity_type", None) or getattr(r, "supported_entity", ""),
+                    r.start,
+                    r.end,
+                    getattr(r, "score", 1.0),
+                    getattr(getattr(r, "analysis_explanation", None), "recognizer", "Presidio"),
+                )
+            )
+        except Exception:
+            continue
+    return converted
+
+
+def analyze_with_presidio(text: str) -> List[Span]:
     """룰 기반 탐지.
 
-    Presidio 엔진이 있으면 다국어 분석을 수행하고,
-    항상 커스텀 정규식 인식기 결과도 함께 사용합니다.
-    최종 결과는 공통 딕셔너리 형식으로 바꿔 반환합니다.
+    PRESIDIO_MODE에 따라 실행 방식을 고릅니다.
+    - legacy: Presidio 엔진으로 다국어 분석을 수행하고 커스텀 정규식 인식기를 따로 실행
+    - single_pass: 모든 패턴 인식기를 한 레지스트리에 등록해 NLP 엔진 없이 한 번에 분석
+    커스텀 패턴(계좌/CVC/여권/주민번호)은 RULE_ENGINE=regex이면 통합 정규식으로 한 번에 훑습니다.
+    최종 결과는 공통 구간 형식(Span)으로 바꿔 반환합니다.
     """
-    engine = _get_engine()
+    if PRESIDIO_MODE == "single_pass":
+        return _analyze_single_pass(text)
+    return _analyze_legacy(text)
+
+
+def _analyze_single_pass(text: str) -> List[Span]:
+    """모든 인식기를 한 번의 analyze 호출로 실행합니다. (엔진이 없으면 기존 방식)"""
+    engine = _get_single_pass_engine()
     if engine is None:
-        rule_recognizers = _get_rule_recognizers()
+        return _analyze_legacy(text)
+    try:
+        # 인식기 이름(source)을 유지하려면 decision process를 남겨야 함
+        all_results = engine.analyze(
+            text=text, language=SINGLE_PASS_LANGUAGE, return_decision_process=True
+        )
+    except Exception:
+        logging.warning("단일 패스 Presidio 분석 실패", exc_info=True)
         all_results = []
-        for recognizer in rule_recognizers:
-            try:
-                all_results.extend(recognizer.analyze(text=text, entities=recognizer.supported_entities))
-            except Exception:
-                continue
+    # 기존 방식과 같은 source 값을 쓰도록 내장 인식기 결과는 "Presidio"로 표기
+    converted = [
+        r if r.source in RULE_RECOGNIZER_NAMES else r._replace(source="Presidio") for r in _to_spans(all_results)
+    ]
+    if _use_regex_engine():
+        converted.extend(scan_rules(text))
+    return _dedupe_same_span(converted)
+
+
+def _dedupe_same_span(results: List[Span]) -> List[Span]:
+    """같은 (start, end) 구간의 결과를 하나만 남깁니다.
+
+    단일 패스에서는 내장 인식기(KR_RRN, PHONE_NUMBER 등)와 커스텀 인식기(SSN, AN 등)가
+    같은 구간을 함께 내는데, 병합 단계는 같은 범위도 "포함"으로 보아 규칙 결과를 둘 다 지웁니다.
+    커스텀 인식기 결과를 우선하고, 그 외에는 점수가 높은 결과를 남깁니다. (처음 나온 순서 유지)
+    """
+    best: Dict[Tuple[int, int], int] = {}
+    kept: List[Span] = []
+    for r in results:
+        key = (r.start, r.end)
+        i = best.get(key)
+        if i is None:
+            best[key] = len(kept)
+            kept.append(r)
+            continue
+        cur = kept[i]
+        rank = (r.source in RULE_RECOGNIZER_NAMES, r.score)
+        if rank > (cur.source in RULE_RECOGNIZER_NAMES, cur.score):
+            kept[i] = r
+    return kept
+
+
+def _analyze_legacy(text: str) -> List[Span]:
+    """en 분석 → ko(kr) KR_RRN 분석 → 커스텀 인식기 개별 실행 순으로 탐지합니다."""
+    engine = _get_engine()
+    if engine is None:
+        all_results = _run_rule_recognizers(text)
     else:
         try:
             results_en = engine.analyze(text=text, language="en")
@@ -89,26 +280,19 @@ def analyze_with_presidio(text: str) -> List[Dict]:
         all_results = list(results_en) + list(results_ko)
 
         # 정규식도 추가 병행
-        for recognizer in _get_rule_recognizers():
-            try:
-                all_results.extend(recognizer.analyze(text=text, entities=recognizer.supported_entities))
-            except Exception:
-                continue
+        all_results.extend(_run_rule_recognizers(text))
 
-    converted: List[Dict] = []
-    for r in all_results:
-        try:
-            converted.append(
-                {
-                    "entity_type": getattr(r, "entity_type", None) or getattr(r, "supported_entity", ""),
-                    "start": int(r.start),
-                    "end": int(r.end),
-                    "score": float(getattr(r, "score", 1.0)),
-                    "source": getattr(getattr(r, "analysis_explanation", None), "recognizer", "Presidio"),
-                }
-            )
-        except Exception:
-            continue
-    return converted
+    return _to_spans(all_results)
 
 
+def preload_engines() -> None:
+    """PRESIDIO_MODE/RULE_ENGINE에서 쓰는 엔진과 인식기를 미리 만듭니다. (첫 요청의 로딩 지연 제거)"""
+    if RULE_ENGINE == "compact" and DISABLE_LOCAL_NER:
+        # 규칙 전용 압축 경로는 Presidio 엔진을 쓰지 않으므로 정규식만 컴파일
+        scan_compact("")
+        return
+    # single_pass는 엔진 생성에 실패하면 legacy로 대체되므로 그때만 legacy 엔진을 만듦
+    if PRESIDIO_MODE != "single_pass" or _get_single_pass_engine() is None:
+        _get_engine()
+    if not _use_regex_engine():
+        _get_rule_recognizers()
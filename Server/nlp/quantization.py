@@ -0,0 +1,36 @@
+import logging
+import os
+import warnings
+
+import torch
+
+# CPU 서빙용 INT8 동적 양자화 도우미입니다.
+# 가중치는 INT8로 저장하고 활성값은 실행 시점에 양자화하므로 보정 데이터가 필요 없습니다.
+
+QUANTIZE_INT8 = "int8"
+
+
+def quantize_torch_model(model: torch.nn.Module) -> torch.nn.Module:
+    """모든 nn.Linear를 INT8 동적 양자화 모듈로 바꾼 모델을 반환합니다. (CPU 전용)"""
+    model.eval()
+    with warnings.catch_warnings():
+        # torch.ao.quantization의 사용 중단 예고 경고는 동작과 무관하므로 숨김
+        warnings.simplefilter("ignore")
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantize_onnx_file(src_path: str, dst_path: str) -> str:
+    """ONNX 모델의 가중치를 INT8로 동적 양자화해 dst_path에 저장합니다."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(src_path, dst_path, weight_type=QuantType.QInt8)
+    logging.info(
+        "INT8 ONNX 모델 저장: %s (%.1fMB → %.1fMB)",
+        dst_path,
+        os.path.getsize(src_path) / 1024 / 1024,
+        os.path.getsize(dst_path) / 1024 / 1024,
+    )
+    return dst_path
+
+
+__all__ = ["QUANTIZE_INT8", "quantize_torch_model", "quantize_onnx_file"]
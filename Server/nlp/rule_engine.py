@@ -0,0 +1,195 @@
+import re
+from array import array
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Tuple
+
+try:
+    from .spans import Span
+except Exception:  # pragma: no cover
+    from backend.nlp.spans import Span  # type: ignore
+
+# Presidio 없이 동작하는 순수 정규식 규칙 엔진입니다.
+# 계좌번호/주민번호/여권번호/CVC 패턴을 하나의 정규식으로 합쳐
+# 텍스트를 한 번만 훑고, Presidio 커스텀 인식기와 같은 값을 공통 구간 형식(Span)으로 돌려줍니다.
+
+# (엔티티, 인식기 이름, 정규식, 점수)
+# presidio_adapter의 커스텀 PatternRecognizer와 같은 값이어야 합니다.
+# 같은 위치에서 여러 패턴이 맞으면 앞쪽 항목이 선택되므로 긴 패턴을 먼저 둡니다.
+RULE_PATTERNS: Tuple[Tuple[str, str, str, float], ...] = (
+    ("SSN", "SSMRecognizer", r"\b\d{6}[-]\d{7}\b", 1.0),
+    ("AN", "AccountNumberRecognizer", r"\b\d{2,6}[-]\d{2,6}[-]\d{2,6}\b", 1.0),
+    ("PPS", "PassportRecognizer", r"\b[A-Za-z]\d{8}\b", 1.0),
+    ("CVC", "CvcRecognizer", r"\b\d{3}\b", 0.9),
+)
+
+
+@lru_cache(maxsize=1)
+def _get_scanner() -> "re.Pattern[str]":
+    """모든 패턴을 이름 있는 그룹의 전방 탐색(lookahead) 대안으로 합친 정규식.
+
+    전방 탐색은 길이가 0이라 매 위치에서 시도되므로, 패턴별로 따로 finditer를
+    돌린 것처럼 서로 겹치는 다른 패턴의 결과도 놓치지 않습니다.
+    """
+    alternatives = "|".join(f"(?P<g{i}>{regex})" for i, (_, _, regex, _) in enumerate(RULE_PATTERNS))
+    return re.compile(f"(?=(?:{alternatives}))", flags=re.DOTALL | re.MULTILINE | re.IGNORECASE)
+
+
+def scan_rules(text: str) -> List[Span]:
+    """텍스트를 한 번 훑어 규칙 기반 엔티티를 찾습니다.
+
+    패턴별 finditer와 마찬가지로 같은 패턴의 결과끼리는 겹치지 않습니다.
+    같은 시작 위치에서 더 긴 패턴에 가려진 짧은 결과(예: 계좌번호 앞 3자리의 CVC)는
+    `fuse_and_resolve`의 포함 관계 제거 단계에서 어차피 버려지므로 반환하지 않습니다.
+    """
+    results: List[Span] = []
+    if not text:
+        return results
+    last_end = [0] * len(RULE_PATTERNS)
+    for m in _get_scanner().finditer(text):
+        idx = m.lastindex - 1  # type: ignore[operator]
+        start, end = m.span(idx + 1)
+        if start < last_end[idx]:
+            continue
+        last_end[idx] = end
+        entity_type, name, _, score = RULE_PATTERNS[idx]
+        results.append(Span(entity_type, start, end, score, name))
+    return results
+
+
+# ---------------------------------------------------------------------------
+# 규칙 전용 모드(DISABLE_LOCAL_NER=1, RULE_ENGINE=compact)의 압축 스캐너
+# Presidio를 거치지 않고 커스텀 패턴 + 이메일/전화번호/카드번호를 한 정규식으로 훑어
+# 결과를 Span 목록 대신 시작/끝/종류 번호 정수 배열로 돌려줍니다. (필요할 때만 Span으로 변환)
+
+
+def _luhn_ok(value: str) -> bool:
+    """카드번호 Luhn 검사. (Presidio CreditCardRecognizer와 같은 검증)"""
+    digits = [int(c) for c in value if c.isdigit()]
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        if i % 2:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+_PHONE = (
+    r"(?<![\d+])(?:\+82[- ]?(?:1[016789]|2|[3-6][1-5]|70)|0(?:1[016789]|2|[3-6][1-5]|70))"
+    r"[- .]?\d{3,4}[- .]?\d{4}(?!\d)"
+)
+_CARD = r"(?<!\d)(?:\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}|\d{4}[- ]?\d{6}[- ]?\d{5})(?!\d)"
+_EMAIL = r"(?<![\w.%+-])[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}(?![A-Za-z0-9-])"
+_OCTET = r"(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)"
+_HEX4 = r"[0-9A-Fa-f]{1,4}"
+_IP = (
+    rf"(?<![\w.])(?:{_OCTET}\.){{3}}{_OCTET}(?![\w]|\.\d)"
+    rf"|(?<![\w:])(?:(?:{_HEX4}:){{7}}{_HEX4}|(?:{_HEX4}:){{1,6}}:(?:{_HEX4}:){{0,5}}{_HEX4}|::(?:{_HEX4}:){{0,6}}{_HEX4})(?![\w:])"
+)
+# 스킴(http/https/ftp) 또는 www.로 시작하는 주소 (끝의 문장 부호는 제외)
+_URL = r"(?<![\w@])(?:(?:https?|ftp)://|www\.)[^\s<>\"'`\[\](){}]*[^\s<>\"'`\[\](){}.,;:!?]"
+_IBAN = r"(?<![A-Za-z0-9])[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,3})?(?![A-Za-z0-9])"
+
+
+def _iban_ok(value: str) -> bool:
+    """IBAN mod-97 검사. (Presidio IbanRecognizer와 같은 검증)"""
+    compact = value.replace(" ", "").upper()
+    if not 15 <= len(compact) <= 34:
+        return False
+    digits = "".join(str(int(c, 36)) for c in compact[4:] + compact[:4])
+    return int(digits) % 97 == 1
+
+
+# (엔티티, 인식기 이름, 정규식, 점수, 검증 함수) — 종류 번호는 이 튜플의 인덱스
+# 같은 위치에서는 앞쪽 항목 하나만 남으므로 길거나 구체적인 패턴(카드/전화번호/IP)을 계좌번호/CVC보다 먼저 둡니다.
+# 단일 패스 Presidio의 내장 인식기(KR_RRN은 SSN 패턴, 이메일/전화번호/카드/IBAN/IP/URL)를 대신합니다.
+# (URL은 스킴이나 www.가 있는 주소만, 전화번호는 한국 번호 형식만 찾음)
+COMPACT_PATTERNS: Tuple[Tuple[str, str, str, float, Optional[Callable[[str], bool]]], ...] = (
+    ("SSN", "SSMRecognizer", RULE_PATTERNS[0][2], 1.0, None),
+    ("CREDIT_CARD", "CreditCardRecognizer", _CARD, 1.0, _luhn_ok),
+    ("PHONE_NUMBER", "PhoneRecognizer", _PHONE, 0.7, None),
+    ("IP_ADDRESS", "IpRecognizer", _IP, 0.6, None),
+    ("AN", "AccountNumberRecognizer", RULE_PATTERNS[1][2], 1.0, None),
+    ("IBAN_CODE", "IbanRecognizer", _IBAN, 1.0, _iban_ok),
+    ("PPS", "PassportRecognizer", RULE_PATTERNS[2][2], 1.0, None),
+    ("URL", "UrlRecognizer", _URL, 0.6, None),
+    ("EMAIL_ADDRESS", "EmailRecognizer", _EMAIL, 1.0, None),
+    ("CVC", "CvcRecognizer", RULE_PATTERNS[3][2], 0.9, None),
+)
+KIND_ENTITY: Tuple[str, ...] = tuple(p[0] for p in COMPACT_PATTERNS)
+KIND_SOURCE: Tuple[str, ...] = tuple(p[1] for p in COMPACT_PATTERNS)
+KIND_SCORE: Tuple[float, ...] = tuple(p[3] for p in COMPACT_PATTERNS)
+
+
+@lru_cache(maxsize=None)
+def _get_compact_scanner(first: int = 0) -> "re.Pattern[str]":
+    """first번째 이후 패턴만 합친 전방 탐색 정규식. (검증에 실패한 위치에서 다음 패턴을 다시 시도할 때 사용)"""
+    alternatives = "|".join(f"(?P<k{i}>{p[2]})" for i, p in enumerate(COMPACT_PATTERNS) if i >= first)
+    return re.compile(f"(?=(?:{alternatives}))", flags=re.DOTALL | re.MULTILINE | re.IGNORECASE)
+
+
+class RuleMatches:
+    """압축 스캐너 결과. i번째 엔티티는 (starts[i], ends[i], kinds[i])이며 시작 위치 순입니다."""
+
+    __slots__ = ("starts", "ends", "kinds")
+
+    def __init__(self) -> None:
+        self.starts = array("i")
+        self.ends = array("i")
+        self.kinds = array("b")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def to_spans(self, indices: Optional[Iterable[int]] = None) -> List[Span]:
+        """공통 구간 형식으로 바꿉니다. (탐지 결과를 그대로 돌려줘야 할 때만 사용)"""
+        if indices is None:
+            indices = range(len(self.starts))
+        kinds = self.kinds
+        return [
+            Span(KIND_ENTITY[kinds[i]], self.starts[i], self.ends[i], KIND_SCORE[kinds[i]], KIND_SOURCE[kinds[i]])
+            for i in indices
+        ]
+
+
+def scan_compact(text: str) -> RuleMatches:
+    """텍스트를 한 번 훑어 규칙 엔티티를 정수 배열로 모읍니다. (중복/포함 규칙은 `scan_rules`와 같음)"""
+    matches = RuleMatches()
+    scanner = _get_compact_scanner()  # 빈 텍스트로 호출하면 컴파일만 함 (예열용)
+    if not text:
+        return matches
+    starts, ends, kinds = matches.starts, matches.ends, matches.kinds
+    last_end = [0] * len(COMPACT_PATTERNS)
+    for m in scanner.finditer(text):
+        kind = m.lastindex - 1  # type: ignore[operator]
+        start, end = m.span(kind + 1)
+        validate = COMPACT_PATTERNS[kind][4]
+        # 검증 실패(예: Luhn 불일치 카드번호)면 같은 위치에서 뒤쪽 패턴을 다시 시도
+        while validate is not None and not validate(text[start:end]):
+            retry = _get_compact_scanner(kind + 1).match(text, start) if kind + 1 < len(COMPACT_PATTERNS) else None
+            if retry is None:
+                kind = -1
+                break
+            kind += retry.lastindex  # type: ignore[operator]
+            start, end = retry.span(retry.lastindex)  # type: ignore[arg-type]
+            validate = COMPACT_PATTERNS[kind][4]
+        if kind < 0 or start < last_end[kind]:
+            continue
+        last_end[kind] = end
+        starts.append(start)
+        ends.append(end)
+        kinds.append(kind)
+    return matches
+
+
+__all__ = [
+    "RULE_PATTERNS",
+    "scan_rules",
+    "COMPACT_PATTERNS",
+    "KIND_ENTITY",
+    "KIND_SOURCE",
+    "KIND_SCORE",
+    "RuleMatches",
+    "scan_compact",
+]
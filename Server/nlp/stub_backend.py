@@ -0,0 +1,67 @@
+import re
+import time
+from typing import Dict, List, Sequence, Union
+
+try:
+    from ..config import NER_STUB_LATENCY_MS  # type: ignore
+except Exception:  # pragma: no cover
+    from backend.config import NER_STUB_LATENCY_MS  # type: ignore
+
+# 모델 가중치 없이 서버를 띄우기 위한 가짜 NER 파이프라인입니다. (NER_BACKEND=stub)
+# 정규식으로 숫자/식별자 엔티티를 찾아 숫자 모델과 같은 라벨/형식으로 돌려주므로
+# 웹/PDF/융합/치환 단계의 오버헤드만 따로 측정할 수 있습니다. (부하 테스트: Server.bench.loadtest)
+# 같은 입력에는 항상 같은 결과를 내며, NER_STUB_LATENCY_MS로 배치 호출당 추론 지연을 흉내 냅니다.
+
+# (모델 라벨, 정규식) — 앞의 패턴이 우선
+_PATTERNS = (
+    ("SSN", r"\d{6}-[1-4]\d{6}"),
+    ("CCD", r"\d{4}-\d{4}-\d{4}-\d{4}"),
+    ("PN", r"01[016789]-\d{3,4}-\d{4}"),
+    ("AN", r"\d{2,6}-\d{2,6}-\d{2,6}"),
+    ("PPS", r"[A-Z]\d{8}"),
+    ("EM", r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"),
+)
+_STUB_RE = re.compile(
+    "|".join(f"(?P<{label}>(?<![\\w-]){pattern}(?![\\w-]))" for label, pattern in _PATTERNS)
+)
+_TOKEN_RE = re.compile(r"\S+")
+
+STUB_SCORE = 0.99
+
+
+class StubTokenizer:
+    """공백 단위 토크나이저. (창 나누기에 필요한 offset_mapping만 지원)"""
+
+    model_max_length = 512
+
+    def __call__(self, text: str, **_: object) -> Dict[str, List]:
+        offsets = [m.span() for m in _TOKEN_RE.finditer(text)]
+        return {"input_ids": list(range(len(offsets))), "offset_mapping": offsets}
+
+
+class StubNerPipeline:
+    """HF 토큰 분류 파이프라인(aggregation_strategy="simple")과 같은 형식을 내는 가짜 파이프라인."""
+
+    def __init__(self, latency_ms: float = 0.0) -> None:
+        self.tokenizer = StubTokenizer()
+        self.latency_ms = max(0.0, float(latency_ms))
+
+    def _detect(self, text: str) -> List[Dict]:
+        return [
+            {"entity_group": m.lastgroup, "score": STUB_SCORE, "word": m.group(), "start": m.start(), "end": m.end()}
+            for m in _STUB_RE.finditer(text)
+        ]
+
+    def __call__(self, inputs: Union[str, Sequence[str]], **_: object):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        if isinstance(inputs, str):
+            return self._detect(inputs)
+        return [self._detect(text) for text in inputs]
+
+
+def load_stub_pipeline() -> StubNerPipeline:
+    return StubNerPipeline(latency_ms=NER_STUB_LATENCY_MS)
+
+
+__all__ = ["StubNerPipeline", "StubTokenizer", "load_stub_pipeline"]
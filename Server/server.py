@@ -1,53 +1,281 @@
 """Flask 기반 마스킹 API 서버 모듈.
 
-- `/health`: 서버 상태 확인용 헬스 체크 엔드포인트
+- `/health`: 서버 프로세스 생존 확인용 헬스 체크 엔드포인트 (모델 로딩 여부와 무관)
+- `/ready`: 모델 예열이 끝났는지 확인하는 준비 상태 엔드포인트 (예열 전/실패 시 503)
+- `/metrics`: 단계별 지연 시간, 입력 크기, 라벨별 엔티티 수, 캐시 적중 등 Prometheus 메트릭 (ENABLE_METRICS)
 - `/api/masking`: 프롬프트와 (선택) PDF를 받아 개인정보/민감정보를 마스킹
+- `/api/masking/batch`: 여러 프롬프트를 한 번에 받아 배치로 마스킹
+- `/api/masking/stream`: 큰 문서를 페이지/창 단위로 마스킹하며 NDJSON으로 바로 응답
+
+모델 추론과 PDF 처리는 크기가 제한된 실행기에서 수행되며,
+대기열이 가득 차면 503(Retry-After 헤더 포함)으로 즉시 응답합니다.
+앱 생성 시 백그라운드에서 모델을 로딩하고 더미 추론으로 예열합니다. (WARMUP_ON_START)
+ASGI 서버로 띄우려면 `asgi.py`를, 여러 프로세스가 모델 가중치를 공유하는
+pre-fork 방식으로 띄우려면 `gunicorn -c Server/gunicorn.conf.py`를 사용하세요.
 
 요청 방식 요약:
-- multipart/form-data: `prompt_json`(문자열), `pdf_file`(선택)
+- multipart/form-data: `prompt_json`(문자열), `pdf_file`(선택), `mask_target`(선택), `fusion_mode`(선택)
 - application/json: {"prompt_json": {...}} 또는 질문 키(question1, ...)를 직접 포함한 객체
+  (최상위 `mask_target`, `fusion_mode` 키 선택)
+
+`mask_target`은 마스킹 대상을 고릅니다. (기본값 DEFAULT_MASK_TARGET)
+- question2: question2만 마스킹 (전체 프롬프트 생성/PDF 추출 생략)
+- prompt: 템플릿으로 만든 전체 프롬프트
+- prompt_pdf: 전체 프롬프트 + PDF 본문 (이때만 PDF를 읽고 추출)
+
+`fusion_mode`는 겹치는 탐지 결과의 선택 방식을 고릅니다. (기본값 FUSION_MODE)
+- greedy: 시작이 빠르고 긴 결과 우선
+- weighted: 출처 우선순위 × 점수 × 길이 합이 최대인 조합
 """
 
 import io
 import json
 import logging
-from typing import Any, Dict, Tuple
+import shutil
+import tempfile
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Iterator, Optional, Tuple
 
-from flask import Flask, request
+from flask import Flask, Response, g, request, stream_with_context
 
 # 패키지 실행과 단일 스크립트 실행을 모두 지원하기 위한 이중 import 처리
 try:  # package-relative import
-    from .config import LOG_LEVEL, APP_PORT, APP_VERSION
-    from .services.prompt_builder import build_prompt
-    from .services.pdf_service import extract_text_from_pdf
-    from .services.masking_service import mask_text_with_models
+    from .config import (
+        LOG_LEVEL,
+        APP_PORT,
+        APP_VERSION,
+        BATCH_MAX_ITEMS,
+        INFERENCE_TIMEOUT,
+        DEFAULT_MASK_TARGET,
+        FUSION_MODE,
+        WARMUP_ON_START,
+        ENABLE_METRICS,
+        METRICS_MULTIPROC_DIR,
+    )
+    from .nlp.fusion import FUSION_MODES
+    from .services.executor import ExecutorBusyError, get_inference_executor, get_pdf_executor
+    from .services.prompt_builder import MASK_TARGETS, MASK_TARGET_PROMPT_PDF, build_mask_text, iter_mask_units
+    from .services.pdf_service import extract_text_from_pdf, iter_pdf_pages
+    from .services.masking_service import (
+        detect_entities,
+        iter_mask_records,
+        mask_text_with_models,
+        mask_texts_with_models,
+    )
+    from .services.warmup import get_readiness, start_warmup
+    from .utils.metrics import (
+        HTTP_REQUEST_SECONDS,
+        INPUT_CHARS,
+        PDF_INPUT_BYTES,
+        STREAM_DURATION_SECONDS,
+        STREAM_TTFB_SECONDS,
+        configure_multiprocess,
+        render_metrics,
+    )
     from .utils.responses import success, error
 except Exception:  # pragma: no cover - fallback for script execution
-    from config import LOG_LEVEL, APP_PORT, APP_VERSION  # type: ignore
-    from services.prompt_builder import build_prompt  # type: ignore
-    from services.pdf_service import extract_text_from_pdf  # type: ignore
-    from services.masking_service import mask_text_with_models  # type: ignore
+    from config import (  # type: ignore
+        LOG_LEVEL,
+        APP_PORT,
+        APP_VERSION,
+        BATCH_MAX_ITEMS,
+        INFERENCE_TIMEOUT,
+        DEFAULT_MASK_TARGET,
+        FUSION_MODE,
+        WARMUP_ON_START,
+        ENABLE_METRICS,
+        METRICS_MULTIPROC_DIR,
+    )
+    from nlp.fusion import FUSION_MODES  # type: ignore
+    from services.executor import ExecutorBusyError, get_inference_executor, get_pdf_executor  # type: ignore
+    from services.prompt_builder import MASK_TARGETS, MASK_TARGET_PROMPT_PDF, build_mask_text, iter_mask_units  # type: ignore
+    from services.pdf_service import extract_text_from_pdf, iter_pdf_pages  # type: ignore
+    from services.masking_service import (  # type: ignore
+        detect_entities,
+        iter_mask_records,
+        mask_text_with_models,
+        mask_texts_with_models,
+    )
+    from services.warmup import get_readiness, start_warmup  # type: ignore
+    from utils.metrics import (  # type: ignore
+        HTTP_REQUEST_SECONDS,
+        INPUT_CHARS,
+        PDF_INPUT_BYTES,
+        STREAM_DURATION_SECONDS,
+        STREAM_TTFB_SECONDS,
+        configure_multiprocess,
+        render_metrics,
+    )
     from utils.responses import success, error  # type: ignore
 
 
-def create_app() -> Flask:
+def _prompt_data_from_json(body_json: Any) -> Dict[str, Any] | None:
+    """JSON 객체에서 프롬프트 답변 dict를 꺼냅니다.
+
+    - {"prompt_json": {...}}
+    - 또는 question* 키를 직접 포함한 dict
+    """
+    if isinstance(body_json, dict):
+        if "prompt_json" in body_json and isinstance(body_json["prompt_json"], dict):
+            return body_json["prompt_json"]
+        if any(k.startswith("question") for k in body_json.keys()):
+            return body_json  # 직접 질문 키 전달
+    return None
+
+
+def _parse_mask_target(raw: Any) -> str | None:
+    """mask_target 값을 검증합니다. (미지정 시 기본값, 잘못된 값이면 None)"""
+    if raw is None or (isinstance(raw, str) and not raw.strip()):
+        return DEFAULT_MASK_TARGET
+    if isinstance(raw, str) and raw.strip() in MASK_TARGETS:
+        return raw.strip()
+    return None
+
+
+def _parse_fusion_mode(raw: Any) -> str | None:
+    """fusion_mode 값을 검증합니다. (미지정 시 기본값, 잘못된 값이면 None)"""
+    if raw is None or (isinstance(raw, str) and not raw.strip()):
+        return FUSION_MODE
+    if isinstance(raw, str) and raw.strip() in FUSION_MODES:
+        return raw.strip()
+    return None
+
+
+class _BadRequestError(Exception):
+    """요청 형식이 올바르지 않을 때 (메시지는 400 응답에 그대로 사용)."""
+
+
+def _read_masking_request() -> Tuple[Dict[str, Any], str, str]:
+    """마스킹 요청에서 (프롬프트 답변 dict, mask_target, fusion_mode)를 읽습니다.
+
+    1) form-data의 prompt_json을 우선 사용하고
+    2) 없으면 JSON 본문({"prompt_json": {...}} 또는 question* 키를 직접 포함한 dict)을 사용합니다.
+    """
+    prompt_data: Dict[str, Any] | None = None
+    raw_target: Any = request.form.get("mask_target")
+    raw_fusion: Any = request.form.get("fusion_mode")
+    if "prompt_json" in request.form:
+        prompt_json_raw: str = request.form.get("prompt_json", "").strip()
+        if prompt_json_raw:
+            try:
+                prompt_data = json.loads(prompt_json_raw)
+            except Exception:
+                raise _BadRequestError("prompt_json JSON 파싱에 실패했습니다.")
+
+    if prompt_data is None:
+        body_json = request.get_json(silent=True) or {}
+        prompt_data = _prompt_data_from_json(body_json)
+        if isinstance(body_json, dict):
+            if raw_target is None:
+                raw_target = body_json.get("mask_target")
+            if raw_fusion is None:
+                raw_fusion = body_json.get("fusion_mode")
+
+    if not isinstance(prompt_data, dict):
+        raise _BadRequestError("필수 입력이 누락되었습니다. form의 prompt_json 또는 JSON 본문을 사용하세요.")
+
+    mask_target = _parse_mask_target(raw_target)
+    if mask_target is None:
+        raise _BadRequestError(f"mask_target은 {', '.join(MASK_TARGETS)} 중 하나여야 합니다.")
+    fusion_mode = _parse_fusion_mode(raw_fusion)
+    if fusion_mode is None:
+        raise _BadRequestError(f"fusion_mode는 {', '.join(FUSION_MODES)} 중 하나여야 합니다.")
+    return prompt_data, mask_target, fusion_mode
+
+
+class _PdfLoadError(Exception):
+    """첨부 PDF를 읽거나 추출하는 중 발생한 오류."""
+
+
+def _busy_response() -> Tuple[Any, int]:
+    """추론 대기열이 가득 찼을 때의 503 응답."""
+    resp, status = error("요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.", 503)
+    resp.headers["Retry-After"] = "1"
+    return resp, status
+
+
+def _timeout_response() -> Tuple[Any, int]:
+    """추론이 INFERENCE_TIMEOUT 안에 끝나지 않았을 때의 504 응답."""
+    return error("처리 시간이 초과되었습니다.", 504)
+
+
+# 스트리밍 요청의 PDF 업로드를 메모리에 둘 최대 크기 (넘으면 임시 파일로 옮김)
+PDF_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+
+def _stream_error(status: int, message: str) -> str:
+    """스트림 도중 실패했을 때 보내는 마지막 NDJSON 레코드."""
+    return json.dumps({"type": "error", "status": status, "message": message}, ensure_ascii=False) + "\n"
+
+
+def create_app(warmup: Optional[bool] = None) -> Flask:
     """
     Flask 애플리케이션 팩토리.
 
     - 로깅 레벨을 설정하고
-    - 헬스 체크 및 마스킹 처리 라우트를 등록합니다.
+    - 모델 예열을 백그라운드에서 시작한 뒤
+    - 헬스 체크/준비 상태 및 마스킹 처리 라우트를 등록합니다.
+
+    Args:
+        warmup: None이면 WARMUP_ON_START를 따르고 True면 항상 예열합니다. False면 예열을
+            미루며, pre-fork 서버가 워커를 fork한 뒤 `start_warmup`을 호출합니다. (gunicorn.conf.py 참고)
 
     Returns:
         Flask: 구성된 Flask 앱 인스턴스
     """
     app = Flask(__name__)
     app.logger.setLevel(LOG_LEVEL)
+    if warmup is not False:
+        start_warmup(enabled=WARMUP_ON_START if warmup is None else True)
+
+    if ENABLE_METRICS:
+        configure_multiprocess(METRICS_MULTIPROC_DIR)
+
+        @app.before_request
+        def _start_timer() -> None:
+            g.request_started = time.perf_counter()
+
+        @app.after_request
+        def _record_request(response: Response) -> Response:
+            started = getattr(g, "request_started", None)
+            if started is not None:
+                # 경로 변수 대신 등록된 라우트 규칙을 라벨로 사용 (라벨 종류 수 제한)
+                endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+                HTTP_REQUEST_SECONDS.observe(
+                    time.perf_counter() - started, endpoint=endpoint, status=str(response.status_code)
+                )
+            return response
+
+        @app.route("/metrics", methods=["GET"])
+        def metrics() -> Response:
+            """Prometheus 텍스트 형식 메트릭. (METRICS_MULTIPROC_DIR가 있으면 모든 워커의 합계)"""
+            return Response(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
     @app.route("/health", methods=["GET"])
     def health() -> Tuple[Any, int]:
         """간단한 헬스 체크 엔드포인트."""
         return success("OK", {"version": APP_VERSION})
 
+    @app.route("/ready", methods=["GET"])
+    def ready() -> Tuple[Any, int]:
+        """모델 예열이 끝나야 200을 반환하는 준비 상태 엔드포인트. (로드 밸런서 readiness 용)"""
+        state = get_readiness()
+        data = {
+            "version": APP_VERSION,
+            "warmup": state["status"],
+            "timings": state["timings"],
+        }
+        if state["ready"]:
+            return success("READY", data)
+        message = "모델을 준비 중입니다."
+        if state["error"]:
+            message = "모델 예열에 실패했습니다."
+            data["error"] = state["error"]
+        resp, status = error(message, 503, data)
+        resp.headers["Retry-After"] = "1"
+        return resp, status
+
     @app.route("/api/masking", methods=["POST"])
     def masking_handler():
         """
@@ -59,81 +287,258 @@ def create_app() -> Flask:
               - pdf_file: (선택) 함께 분석할 PDF 파일
           - application/json:
               - {"prompt_json": {...}} 또는 질문 키(question1, question2, ...)를 직접 포함한 객체
+          - mask_target, fusion_mode: (선택) 모듈 설명 참고
 
         응답 필드:
           - original_prompt: 마스킹 전 원본 프롬프트
           - masked_prompt: 마스킹된 프롬프트
           - masked_entities: 마스킹에 사용된 엔티티 목록/치환 정보
+          - timings: 탐지기별 상태(ok/timeout/disabled)와 소요 시간(ms)
 
         상태 코드:
           - 200: 성공
           - 400: 유효하지 않은 입력
           - 500: 서버 내부 오류
+          - 503: 추론 대기열 초과 (Retry-After 헤더 참고)
+          - 504: 처리 시간 초과
         """
         try:
-            # 1) form-data 우선 처리: prompt_json 필드가 존재하면 이를 먼저 사용
-            prompt_data: Dict[str, Any] | None = None
-            if "prompt_json" in request.form:
-                prompt_json_raw: str = request.form.get("prompt_json", "").strip()
-                if prompt_json_raw:
-                    try:
-                        prompt_data = json.loads(prompt_json_raw)
-                    except Exception:
-                        return error("prompt_json JSON 파싱에 실패했습니다.", 400)
-
-            # 2) JSON 본문 처리(form-data 미제공 시):
-            #    - {"prompt_json": {...}}
-            #    - 또는 question* 키를 직접 포함한 dict
-            if prompt_data is None:
-                body_json = request.get_json(silent=True) or {}
-                if isinstance(body_json, dict):
-                    if "prompt_json" in body_json and isinstance(body_json["prompt_json"], dict):
-                        prompt_data = body_json["prompt_json"]
-                    elif any(k.startswith("question") for k in body_json.keys()):
-                        prompt_data = body_json  # 직접 질문 키 전달
-
-            if not isinstance(prompt_data, dict):
-                return error("필수 입력이 누락되었습니다. form의 prompt_json 또는 JSON 본문을 사용하세요.", 400)
-
-            # 템플릿 답변으로부터 전체 프롬프트 생성
-            original_prompt_all = build_prompt(prompt_data)
-
-            # (선택) PDF 첨부 처리
-            if "pdf_file" in request.files and request.files["pdf_file"]:
+            try:
+                prompt_data, mask_target, fusion_mode = _read_masking_request()
+            except _BadRequestError as e:
+                return error(str(e), 400)
+
+            # (선택) PDF 첨부 처리: prompt_pdf 대상일 때만 호출되어 업로드를 읽고 추출
+            def load_pdf_text() -> str:
+                if "pdf_file" not in request.files or not request.files["pdf_file"]:
+                    return ""
                 try:
                     pdf_storage = request.files["pdf_file"]
                     pdf_bytes = io.BytesIO(pdf_storage.read())
-                    pdf_text = extract_text_from_pdf(pdf_bytes)
-                    if pdf_text:
-                        # 구분자와 함께 PDF 본문을 프롬프트에 추가
-                        original_prompt_all = (
-                            f"{original_prompt_all}\n\n[PDF 내용]\n{pdf_text}"
-                        )
+                    return get_pdf_executor().run(
+                        extract_text_from_pdf, pdf_bytes, timeout=INFERENCE_TIMEOUT
+                    )
+                except (ExecutorBusyError, FutureTimeoutError):
+                    raise
                 except Exception as e:
-                    logging.exception("PDF 파일 처리 중 오류")
-                    return error("PDF 파일 처리 중 오류가 발생했습니다.", 500)
+                    raise _PdfLoadError() from e
 
-            # 반환은 question2의 내용만
-            q2_text = prompt_data.get("question2", "")
-            if not isinstance(q2_text, str):
-                q2_text = ""
+            # 대상에 필요한 텍스트만 생성 (question2면 프롬프트 생성/PDF 추출 생략)
+            try:
+                target_text = build_mask_text(prompt_data, mask_target, load_pdf_text)
+            except _PdfLoadError:
+                logging.exception("PDF 파일 처리 중 오류")
+                return error("PDF 파일 처리 중 오류가 발생했습니다.", 500)
 
-            # 모델들을 활용해 question2 텍스트만 마스킹
-            masked_prompt, masked_entities = mask_text_with_models(q2_text)
+            # 모델들을 활용해 대상 텍스트 마스킹
+            INPUT_CHARS.observe(len(target_text), endpoint="masking")
+            timings: Dict[str, Any] = {}
+            masked_prompt, masked_entities = get_inference_executor().run(
+                mask_text_with_models, target_text, timings, fusion_mode, timeout=INFERENCE_TIMEOUT
+            )
 
             return success(
                 "마스킹 처리가 완료되었습니다.",
                 {
-                    # 반환은 question2만
-                    "original_prompt": q2_text,
+                    # 반환은 mask_target에 해당하는 텍스트만 (기본: question2)
+                    "original_prompt": target_text,
                     "masked_prompt": masked_prompt,
                     "masked_entities": masked_entities,
+                    "timings": timings,
                 },
             )
+        except ExecutorBusyError:
+            return _busy_response()
+        except FutureTimeoutError:
+            return _timeout_response()
         except Exception as e:
             logging.exception("/api/masking 처리 중 오류")
             return error("서버 내부 오류가 발생했습니다.", 500)
 
+    @app.route("/api/masking/batch", methods=["POST"])
+    def masking_batch_handler():
+        """
+        여러 프롬프트를 한 번에 마스킹합니다.
+
+        요청 형식(application/json):
+          - {"items": [prompt_json, ...], "mask_target": "question2" | "prompt", "fusion_mode": "greedy" | "weighted"}
+            각 항목은 {"prompt_json": {...}} 또는 질문 키를 직접 포함한 객체
+
+        응답 필드:
+          - results: 항목 순서대로 original_prompt/masked_prompt/masked_entities 목록
+          - timings: 탐지기별 상태(ok/timeout/disabled)와 소요 시간(ms)
+
+        상태 코드:
+          - 200: 성공
+          - 400: 유효하지 않은 입력
+          - 500: 서버 내부 오류
+          - 503: 추론 대기열 초과 (Retry-After 헤더 참고)
+          - 504: 처리 시간 초과
+        """
+        try:
+            body_json = request.get_json(silent=True) or {}
+            items = body_json.get("items") if isinstance(body_json, dict) else None
+            if not isinstance(items, list) or not items:
+                return error("items 배열이 필요합니다.", 400)
+            if len(items) > BATCH_MAX_ITEMS:
+                return error(f"한 번에 최대 {BATCH_MAX_ITEMS}개까지 처리할 수 있습니다.", 400)
+            # 배치 요청은 PDF를 받지 않으므로 prompt_pdf는 prompt와 같게 처리
+            mask_target = _parse_mask_target(body_json.get("mask_target"))
+            if mask_target is None:
+                return error(f"mask_target은 {', '.join(MASK_TARGETS)} 중 하나여야 합니다.", 400)
+            fusion_mode = _parse_fusion_mode(body_json.get("fusion_mode"))
+            if fusion_mode is None:
+                return error(f"fusion_mode는 {', '.join(FUSION_MODES)} 중 하나여야 합니다.", 400)
+
+            texts = []
+            for idx, item in enumerate(items):
+                prompt_data = _prompt_data_from_json(item)
+                if not isinstance(prompt_data, dict):
+                    return error(f"{idx}번째 항목의 형식이 올바르지 않습니다.", 400)
+                texts.append(build_mask_text(prompt_data, mask_target))
+                INPUT_CHARS.observe(len(texts[-1]), endpoint="batch")
+
+            # 모든 항목의 NER 호출을 배치로 묶어 마스킹
+            timings: Dict[str, Any] = {}
+            masked_list = get_inference_executor().run(
+                mask_texts_with_models, texts, timings, fusion_mode, timeout=INFERENCE_TIMEOUT
+            )
+
+            return success(
+                "마스킹 처리가 완료되었습니다.",
+                {
+                    "results": [
+                        {
+                            "original_prompt": text,
+                            "masked_prompt": masked_prompt,
+                            "masked_entities": masked_entities,
+                        }
+                        for text, (masked_prompt, masked_entities) in zip(texts, masked_list)
+                    ],
+                    "timings": timings,
+                },
+            )
+        except ExecutorBusyError:
+            return _busy_response()
+        except FutureTimeoutError:
+            return _timeout_response()
+        except Exception as e:
+            logging.exception("/api/masking/batch 처리 중 오류")
+            return error("서버 내부 오류가 발생했습니다.", 500)
+
+    @app.route("/api/masking/stream", methods=["POST"])
+    def masking_stream_handler():
+        """
+        큰 문서를 위한 스트리밍 마스킹. 입력 형식은 `/api/masking`과 같습니다.
+
+        PDF는 업로드 스트림에서 페이지 단위로 읽고, 본문은 STREAM_WINDOW_CHARS 크기의
+        창 단위로 탐지/병합/마스킹해 결과가 나오는 대로 NDJSON(한 줄에 JSON 하나)으로 보냅니다.
+        창 경계에 걸친 엔티티도 찾도록 창 앞뒤로 STREAM_WINDOW_OVERLAP 글자를 더 읽어 탐지합니다.
+
+        응답 레코드(type 필드로 구분):
+          - segment: {"offset", "text"} 마스킹된 출력 조각 (순서대로 이으면 전체 결과)
+          - entity: {"entity", "label", "start", "end"} 원문 기준 위치
+          - summary: {"segments", "entities", "chars", "timings", "ttfb_ms", "total_ms"}
+          - error: {"status", "message"} 도중에 실패하면 마지막 레코드로 전송
+
+        상태 코드:
+          - 200: 스트림 시작 (이후 오류는 error 레코드로 전달)
+          - 400: 유효하지 않은 입력
+        """
+        started = time.perf_counter()
+        try:
+            prompt_data, mask_target, fusion_mode = _read_masking_request()
+        except _BadRequestError as e:
+            return error(str(e), 400)
+
+        # 업로드는 요청이 끝나면 닫히므로, 스트림을 시작하기 전에 조각 단위로 복사해 둠
+        # (작은 파일은 메모리, 큰 파일은 임시 파일에 보관)
+        spool = None
+        pdf_storage = request.files.get("pdf_file")
+        if pdf_storage and mask_target == MASK_TARGET_PROMPT_PDF:
+            spool = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_MEMORY)
+            shutil.copyfileobj(pdf_storage.stream, spool, 1024 * 1024)
+            PDF_INPUT_BYTES.observe(spool.tell())
+
+        def detect(window: str, timings: Dict[str, Any]):
+            # 창마다 추론 실행기를 거쳐 다른 요청과 같은 동시 실행 한도를 적용
+            return get_inference_executor().run(
+                detect_entities, window, timings, fusion_mode, timeout=INFERENCE_TIMEOUT
+            )
+
+        # 페이지 추출 상태: 시간 초과로 기다리기를 멈춰도 실행 중인 추출이 끝난 뒤에 정리하기 위함
+        pdf_pages: Optional[Iterator[str]] = None
+        pending_page: Optional[Future] = None
+
+        def pdf_pages_via_executor() -> Iterator[str]:
+            # 페이지 추출(PyPDF2/OCR 대기)도 /api/masking처럼 PDF 실행기를 거쳐
+            # 대기열 한도(503)와 제한 시간(504)을 적용. 페이지 하나씩 실행기에서 꺼냄
+            nonlocal pdf_pages, pending_page
+            pdf_pages = iter_pdf_pages(spool)
+            done = object()
+            while True:
+                pending_page = get_pdf_executor().submit(next, pdf_pages, done)
+                page = pending_page.result(timeout=INFERENCE_TIMEOUT)
+                if page is done:
+                    return
+                yield page
+
+        def release_pdf(_: Any = None) -> None:
+            if pdf_pages is not None:
+                pdf_pages.close()
+            spool.close()
+
+        def close_pdf() -> None:
+            # 응답이 닫힐 때(본문을 끝까지 보냄/클라이언트가 끊음/HEAD 등으로 본문을 읽지 않음 모두) 호출됨
+            if pending_page is not None and not pending_page.done():
+                # 504 등으로 기다리기를 멈췄어도 실행기 스레드가 아직 페이지를 읽는 중이면
+                # 파일/제너레이터를 그 아래에서 닫지 않고 추출이 끝난 뒤 정리
+                pending_page.add_done_callback(release_pdf)
+            else:
+                release_pdf()
+
+        def generate() -> Iterator[str]:
+            ttfb_ms = None
+            try:
+                pages = pdf_pages_via_executor() if spool is not None else None
+                units = iter_mask_units(prompt_data, mask_target, pages)
+                for record in iter_mask_records(units, detect, fusion_mode):
+                    if record["type"] == "summary":
+                        record["ttfb_ms"] = ttfb_ms
+                        elapsed = time.perf_counter() - started
+                        record["total_ms"] = round(elapsed * 1000, 2)
+                        STREAM_DURATION_SECONDS.observe(elapsed)
+                        INPUT_CHARS.observe(record["chars"], endpoint="stream")
+                        logging.info(
+                            "/api/masking/stream ttfb=%sms total=%sms chars=%s",
+                            ttfb_ms,
+                            record["total_ms"],
+                            record["chars"],
+                        )
+                    elif ttfb_ms is None:
+                        ttfb = time.perf_counter() - started
+                        ttfb_ms = round(ttfb * 1000, 2)
+                        STREAM_TTFB_SECONDS.observe(ttfb)
+                    yield json.dumps(record, ensure_ascii=False) + "\n"
+            except ExecutorBusyError:
+                yield _stream_error(503, "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.")
+            except FutureTimeoutError:
+                yield _stream_error(504, "처리 시간이 초과되었습니다.")
+            except Exception:
+                logging.exception("/api/masking/stream 처리 중 오류")
+                yield _stream_error(500, "서버 내부 오류가 발생했습니다.")
+
+        response = Response(
+            stream_with_context(generate()),
+            mimetype="application/x-ndjson",
+            headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"},
+        )
+        if spool is not None:
+            # 제너레이터의 finally는 본문을 한 번도 읽지 않으면 실행되지 않으므로 응답 종료에 정리를 등록
+            # (Response.close()는 본문 제너레이터를 먼저 닫은 뒤 등록된 함수를 호출)
+            response.call_on_close(close_pdf)
+        return response
+
     return app
 
 
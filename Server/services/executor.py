@@ -0,0 +1,123 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable
+
+try:
+    from ..config import (
+        INFERENCE_WORKERS,
+        INFERENCE_QUEUE_SIZE,
+        PDF_WORKERS,
+        PDF_QUEUE_SIZE,
+        DETECTION_WORKERS,
+    )
+    from ..utils.metrics import REGISTRY
+except Exception:  # pragma: no cover
+    from backend.config import (  # type: ignore
+        INFERENCE_WORKERS,
+        INFERENCE_QUEUE_SIZE,
+        PDF_WORKERS,
+        PDF_QUEUE_SIZE,
+        DETECTION_WORKERS,
+    )
+    from backend.utils.metrics import REGISTRY  # type: ignore
+
+
+class ExecutorBusyError(RuntimeError):
+    """실행 중 + 대기 중 작업 수가 한도를 넘어 작업을 받을 수 없을 때 발생합니다."""
+
+
+class BoundedExecutor:
+    """동시 실행 수와 대기열 길이가 제한된 스레드 풀.
+
+    대기열이 가득 차면 기다리지 않고 즉시 ExecutorBusyError를 발생시켜
+    호출 측(HTTP 핸들러)이 429/503으로 응답할 수 있게 합니다.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, name: str) -> None:
+        self.name = name
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._lock = threading.Lock()
+        self._inflight = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorBusyError(f"{self.name} 대기열이 가득 찼습니다.")
+        with self._lock:
+            self._inflight += 1
+        try:
+            fut = self._pool.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        fut.add_done_callback(lambda _: self._release())
+        return fut
+
+    def run(self, fn: Callable[..., Any], *args: Any, timeout: float | None = None, **kwargs: Any) -> Any:
+        """작업을 제출하고 결과를 기다립니다. (시간 초과 시 concurrent.futures.TimeoutError)"""
+        return self.submit(fn, *args, **kwargs).result(timeout=timeout)
+
+    @property
+    def inflight(self) -> int:
+        """실행 중이거나 대기 중인 작업 수."""
+        return self._inflight
+
+    def _release(self) -> None:
+        with self._lock:
+            self._inflight -= 1
+        self._slots.release()
+
+
+# 모델 추론(NER/Presidio/병합) 전용 풀
+@lru_cache(maxsize=1)
+def get_inference_executor() -> BoundedExecutor:
+    return BoundedExecutor(INFERENCE_WORKERS, INFERENCE_QUEUE_SIZE, name="inference")
+
+
+# PDF 추출/OCR 전용 풀 (느린 PDF가 추론 슬롯을 점유하지 않도록 분리)
+@lru_cache(maxsize=1)
+def get_pdf_executor() -> BoundedExecutor:
+    return BoundedExecutor(PDF_WORKERS, PDF_QUEUE_SIZE, name="pdf")
+
+
+# 한 요청 안에서 탐지기(NER/Presidio)를 동시에 돌리는 풀
+@lru_cache(maxsize=1)
+def get_detection_executor() -> BoundedExecutor:
+    return BoundedExecutor(DETECTION_WORKERS, DETECTION_WORKERS * 4, name="detection")
+
+
+def _executor_metrics():
+    samples = []
+    for getter in (get_inference_executor, get_pdf_executor, get_detection_executor):
+        # 아직 만들어지지 않은 풀은 만들지 않고 건너뜀
+        if getter.cache_info().currsize:
+            executor = getter()
+            samples.append(({"executor": executor.name}, executor.inflight))
+    return [("executor_inflight_tasks", "gauge", "실행기별 실행 중 + 대기 중 작업 수", samples)]
+
+
+REGISTRY.register_collector(_executor_metrics)
+
+
+# fork로 만든 자식 프로세스(pre-fork 서버 워커)에는 부모의 풀 스레드가 없으므로
+# 부모에서 풀이 만들어졌더라도 자식에서 새로 만들도록 캐시를 비웁니다.
+def _reset_executors_after_fork() -> None:
+    get_inference_executor.cache_clear()
+    get_pdf_executor.cache_clear()
+    get_detection_executor.cache_clear()
+
+
+os.register_at_fork(after_in_child=_reset_executors_after_fork)
+
+
+__all__ = [
+    "BoundedExecutor",
+    "ExecutorBusyError",
+    "get_inference_executor",
+    "get_pdf_executor",
+    "get_detection_executor",
+]
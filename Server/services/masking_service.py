@@ -1,59 +1,573 @@
-from typing import List, Tuple, Dict
+import logging
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Dict
 
 try:
-    from ..nlp.fusion import fuse_and_resolve
-    from ..nlp.label_mapping import to_standard_label, to_display_label
-    from ..config import DEFAULT_LOCALE
+    from ..nlp.fusion import fuse_and_resolve, resolve_indices
+    from ..nlp.label_mapping import display_table, to_standard_label, to_display_label
+    from ..nlp.rule_engine import KIND_ENTITY, KIND_SCORE, RuleMatches, scan_compact
+    from ..nlp.spans import Span
+    from ..config import (
+        DEFAULT_LOCALE,
+        MASK_CACHE_SIZE,
+        MASK_CACHE_TTL,
+        MASK_CACHE_MAX_CHARS,
+        NER_TIMEOUT,
+        PRESIDIO_TIMEOUT,
+        STREAM_WINDOW_CHARS,
+        STREAM_WINDOW_OVERLAP,
+    )
+    from ..utils.cache import LRUCache
+    from ..utils.metrics import DETECTOR_RUNS, ENTITIES, REGISTRY, cache_stats_family, observe_stage, stage_timer
+    from .executor import ExecutorBusyError, get_detection_executor
 except Exception:  # pragma: no cover
-    from backend.nlp.fusion import fuse_and_resolve  # type: ignore
-    from backend.nlp.label_mapping import to_standard_label, to_display_label  # type: ignore
-    from backend.config import DEFAULT_LOCALE  # type: ignore
-
-
-def _mask_from_results(text: str, results: List[Dict]) -> Tuple[str, List[Dict]]:
-    # 뒤에서 앞으로 치환
-    masked = text
-    masked_entities: List[Dict] = []
-    for r in sorted(results, key=lambda x: x["start"], reverse=True):
-        entity_text = text[r["start"] : r["end"]]
-        code = to_standard_label(r["entity_type"]) or r["entity_type"]
-        display = to_display_label(code, locale=DEFAULT_LOCALE)
-        masked = masked[: r["start"]] + f"[{display}]" + masked[r["end"] :]
-        masked_entities.append({"entity": entity_text, "label": display})
-
-    # 중복 제거(첫 등장 우선)
+    from backend.nlp.fusion import fuse_and_resolve, resolve_indices  # type: ignore
+    from backend.nlp.label_mapping import display_table, to_standard_label, to_display_label  # type: ignore
+    from backend.nlp.rule_engine import KIND_ENTITY, KIND_SCORE, RuleMatches, scan_compact  # type: ignore
+    from backend.nlp.spans import Span  # type: ignore
+    from backend.config import (  # type: ignore
+        DEFAULT_LOCALE,
+        MASK_CACHE_SIZE,
+        MASK_CACHE_TTL,
+        MASK_CACHE_MAX_CHARS,
+        NER_TIMEOUT,
+        PRESIDIO_TIMEOUT,
+        STREAM_WINDOW_CHARS,
+        STREAM_WINDOW_OVERLAP,
+    )
+    from backend.utils.cache import LRUCache  # type: ignore
+    from backend.utils.metrics import (  # type: ignore
+        DETECTOR_RUNS,
+        ENTITIES,
+        REGISTRY,
+        cache_stats_family,
+        observe_stage,
+        stage_timer,
+    )
+    from backend.services.executor import ExecutorBusyError, get_detection_executor  # type: ignore
+
+
+def _display_label(label: str, table: Dict[str, str], locale: str) -> str:
+    display = table.get(label)
+    if display is None:
+        display = to_display_label(to_standard_label(label) or label, locale=locale)
+    return display
+
+
+_span_start = attrgetter("start")
+
+
+def _segments(text: str, entities: Iterable[Tuple[int, int, str]]) -> Iterator[Tuple[str, Optional[Tuple[int, int, str]]]]:
+    """앞에서 뒤로 한 번 훑으며 (출력 조각, (시작, 끝, 표시명) 또는 None)을 내보냅니다.
+
+    entities는 시작 위치 순이어야 하며, 앞 결과와 겹치는 결과는 건너뜁니다.
+    (fuse_and_resolve/resolve_indices 결과는 겹치지 않음)
+    Span 목록과 규칙 전용 압축 배열의 치환이 모두 이 순회를 씁니다.
+    """
+    cursor = 0
+    for entity in entities:
+        start = entity[0]
+        if start < cursor:
+            continue
+        if start > cursor:
+            yield text[cursor:start], None
+        yield f"[{entity[2]}]", entity
+        cursor = entity[1]
+    if cursor < len(text):
+        yield text[cursor:], None
+
+
+def _span_entities(results: List[Span], locale: str) -> Iterator[Tuple[int, int, str]]:
+    """Span 목록을 시작 위치 순 (시작, 끝, 표시명)으로 바꿉니다."""
+    table = display_table(locale)
+    for entity_type, start, end, _, _ in sorted(results, key=_span_start):
+        yield start, end, _display_label(entity_type, table, locale)
+
+
+def _iter_segments(text: str, results: List[Span], locale: str) -> Iterator[Tuple[str, Optional[Dict]]]:
+    """(출력 조각, 엔티티 정보 또는 None)을 내보냅니다.
+
+    엔티티 정보: {"entity": 원문, "label": 표시명, "start": 시작, "end": 끝}
+    """
+    for piece, entity in _segments(text, _span_entities(results, locale)):
+        if entity is None:
+            yield piece, None
+        else:
+            start, end, display = entity
+            yield piece, {"entity": text[start:end], "label": display, "start": start, "end": end}
+
+
+def _render(text: str, entities: Iterable[Tuple[int, int, str]]) -> Tuple[str, List[Dict]]:
+    """조각 목록을 만든 뒤 한 번에 이어 붙입니다. (엔티티마다 문자열 전체를 복사하지 않음)
+
+    엔티티 dict는 중복 제거 후에만 만듭니다.
+    """
+    pieces: List[str] = []
+    found: List[Tuple[str, str]] = []
+    for piece, entity in _segments(text, entities):
+        pieces.append(piece)
+        if entity is not None:
+            found.append((text[entity[0] : entity[1]], entity[2]))
+
+    # 중복 제거(첫 등장 우선, 기존과 같이 뒤쪽 엔티티부터)
     seen = set()
     uniq_entities: List[Dict] = []
-    for item in masked_entities:
-        key = (item["entity"], item["label"])
+    for key in reversed(found):
         if key in seen:
             continue
         seen.add(key)
-        uniq_entities.append(item)
+        uniq_entities.append({"entity": key[0], "label": key[1]})
+
+    return "".join(pieces), uniq_entities
+
+
+def _mask_from_results(text: str, results: List[Span], locale: str = DEFAULT_LOCALE) -> Tuple[str, List[Dict]]:
+    return _render(text, _span_entities(results, locale))
+
+
+def _active_config(fusion_mode: Optional[str] = None) -> Tuple[str, bool, bool, str, str, str, str, str, str]:
+    """결과에 영향을 주는 설정 값을 호출 시점에 읽습니다. (캐시 키에도 사용)
+
+    fusion_mode를 넘기면 FUSION_MODE 설정 대신 사용합니다. (요청별 지정)
+    """
+    try:
+        from .. import config  # type: ignore
+    except Exception:
+        import backend.config as config  # type: ignore
+    return (
+        config.NUMERIC_MODEL_PATH,
+        config.DISABLE_LOCAL_NER,
+        config.DISABLE_PRESIDIO,
+        config.DEFAULT_LOCALE,
+        config.PRESIDIO_MODE,
+        config.RULE_ENGINE,
+        config.NER_BACKEND,
+        config.NER_QUANTIZE,
+        fusion_mode or config.FUSION_MODE,
+    )
+
+
+# 같은 텍스트가 반복 제출될 때를 위한 결과 캐시
+# 키: (텍스트, 모델 경로, DISABLE_LOCAL_NER, DISABLE_PRESIDIO, DEFAULT_LOCALE, PRESIDIO_MODE, RULE_ENGINE, NER_BACKEND, NER_QUANTIZE, 융합 방식)
+@lru_cache(maxsize=1)
+def _get_result_cache() -> LRUCache:
+    return LRUCache(max_entries=MASK_CACHE_SIZE, ttl=MASK_CACHE_TTL)
+
+
+def _cache_key(text: str, active: Tuple) -> Optional[Tuple]:
+    if MASK_CACHE_SIZE <= 0 or len(text) > MASK_CACHE_MAX_CHARS:
+        return None
+    return (text,) + active
+
+
+def _cache_get(key: Optional[Tuple]) -> Optional[Tuple[str, List[Dict]]]:
+    if key is None:
+        return None
+    cached = _get_result_cache().get(key)
+    if cached is None:
+        return None
+    masked, entities = cached
+    # 호출 측이 수정해도 캐시가 오염되지 않도록 복사본 반환
+    return masked, [dict(e) for e in entities]
+
+
+def _cache_put(key: Optional[Tuple], result: Tuple[str, List[Dict]]) -> None:
+    if key is None:
+        return
+    masked, entities = result
+    _get_result_cache().put(key, (masked, tuple(dict(e) for e in entities)))
+
+
+def get_mask_cache_stats() -> Dict[str, Any]:
+    """마스킹 결과 캐시 적중률 등 통계."""
+    return _get_result_cache().stats()
+
+
+REGISTRY.register_collector(lambda: cache_stats_family("mask", get_mask_cache_stats()))
+
+
+def _record_detectors(detector_timings: Dict[str, Dict[str, Any]]) -> None:
+    """탐지기별 상태와 소요 시간(단계 numeric_ner/presidio)을 메트릭에 기록합니다."""
+    for name, t in detector_timings.items():
+        DETECTOR_RUNS.inc(detector=name, status=t["status"])
+        if t["status"] == "ok":
+            observe_stage(name, t["ms"] / 1000)
+
+
+def _record_entities(merged_results: List[Span]) -> None:
+    """병합 결과의 표준 라벨별 개수를 메트릭에 기록합니다."""
+    for r in merged_results:
+        ENTITIES.inc(label=to_standard_label(r.entity_type) or r.entity_type or "UNKNOWN")
+
 
-    return masked, uniq_entities
+def _timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    value = fn()
+    return value, round((time.perf_counter() - started) * 1000, 2)
 
 
-def mask_text_with_models(text: str) -> Tuple[str, List[Dict]]:
+def _run_detectors(
+    tasks: Dict[str, Tuple[Callable[[], Any], float]]
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """탐지기들을 공유 풀에서 동시에 실행합니다.
+
+    tasks: 이름 → (실행 함수, 제한 시간(초))
+    제한 시간을 넘긴 탐지기는 결과를 None으로 두고 나머지 결과만 반환합니다.
+    (탐지기 내부 예외는 그대로 전파)
+    반환: (이름별 결과, 이름별 {"status": ok|timeout, "ms": 소요 시간})
+    """
+    executor = get_detection_executor()
+    started = time.perf_counter()
+    futures = {}
+    for name, (fn, _) in tasks.items():
+        try:
+            futures[name] = executor.submit(_timed, fn)
+        except ExecutorBusyError:
+            futures[name] = None  # 풀이 가득 차면 현재 스레드에서 실행
+
+    values: Dict[str, Any] = {}
+    timings: Dict[str, Dict[str, Any]] = {}
+    for name, (fn, timeout) in tasks.items():
+        fut = futures[name]
+        if fut is None:
+            values[name], ms = _timed(fn)
+            timings[name] = {"status": "ok", "ms": ms}
+            continue
+        remaining = timeout - (time.perf_counter() - started)
+        try:
+            values[name], ms = fut.result(timeout=max(0.0, remaining))
+            timings[name] = {"status": "ok", "ms": ms}
+        except FutureTimeoutError:
+            fut.cancel()
+            logging.warning("%s 탐지기가 %.1f초 안에 끝나지 않아 결과에서 제외합니다.", name, timeout)
+            values[name] = None
+            timings[name] = {"status": "timeout", "ms": round(timeout * 1000, 2)}
+    return values, timings
+
+
+def _detector_tasks(
+    disable_local_ner: bool,
+    disable_presidio: bool,
+    run_ner: Callable[[], Any],
+    run_presidio: Callable[[], Any],
+) -> Tuple[Dict[str, Tuple[Callable[[], Any], float]], Dict[str, Dict[str, Any]]]:
+    tasks: Dict[str, Tuple[Callable[[], Any], float]] = {}
+    skipped: Dict[str, Dict[str, Any]] = {}
+    if disable_local_ner:
+        skipped["numeric_ner"] = {"status": "disabled", "ms": 0.0}
+    else:
+        tasks["numeric_ner"] = (run_ner, NER_TIMEOUT)
+    if disable_presidio:
+        skipped["presidio"] = {"status": "disabled", "ms": 0.0}
+    else:
+        tasks["presidio"] = (run_presidio, PRESIDIO_TIMEOUT)
+    return tasks, skipped
+
+
+def _detect(text: str, active: Tuple) -> Tuple[List[Span], Dict[str, Dict[str, Any]]]:
+    """탐지기 실행 + 병합. 반환: (병합된 결과, 탐지기별 timings)"""
     # 지연 임포트: 필요할 때만 무거운 모듈 로드
     try:
         from ..nlp.local_pipeline import run_numeric_pipeline  # type: ignore
         from ..nlp.presidio_adapter import analyze_with_presidio  # type: ignore
-        from ..config import DISABLE_LOCAL_NER, DISABLE_PRESIDIO  # type: ignore
     except Exception:
         from backend.nlp.local_pipeline import run_numeric_pipeline  # type: ignore
         from backend.nlp.presidio_adapter import analyze_with_presidio  # type: ignore
-        from backend.config import DISABLE_LOCAL_NER, DISABLE_PRESIDIO  # type: ignore
 
-    # 스크립트 방식: 숫자/식별자 전용 NER만 실행
-    local_results = [] if DISABLE_LOCAL_NER else run_numeric_pipeline(text)
-    # Presidio 규칙 결과
-    presidio_results = [] if DISABLE_PRESIDIO else analyze_with_presidio(text)
+    _, disable_local_ner, disable_presidio, *_, mode = active
+    # 스크립트 방식: 숫자/식별자 전용 NER + Presidio 규칙 결과를 동시에 실행
+    tasks, detector_timings = _detector_tasks(
+        disable_local_ner,
+        disable_presidio,
+        lambda: run_numeric_pipeline(text),
+        lambda: analyze_with_presidio(text),
+    )
+    values, ran_timings = _run_detectors(tasks)
+    detector_timings.update(ran_timings)
+    local_results = values.get("numeric_ner") or []
+    presidio_results = values.get("presidio") or []
 
     # 병합/정렬/충돌해결
-    merged_results = fuse_and_resolve(local_results, presidio_results)
+    with stage_timer("fusion"):
+        merged = fuse_and_resolve(local_results, presidio_results, mode=mode)
+    _record_detectors(detector_timings)
+    _record_entities(merged)
+    return merged, detector_timings
+
+
+# ---------------------------------------------------------------------------
+# 규칙 전용 압축 경로 (DISABLE_LOCAL_NER=1, RULE_ENGINE=compact)
+# 탐지 결과를 시작/끝/종류 번호 배열(RuleMatches)로 둔 채 병합과 치환까지 처리하고,
+# dict는 응답에 들어갈 masked_entities(중복 제거 후)에만 만듭니다.
+
+
+def _compact_rule_only(active: Tuple) -> bool:
+    _, disable_local_ner, disable_presidio, _, _, rule_engine, *_ = active
+    return disable_local_ner and not disable_presidio and rule_engine == "compact"
+
+
+@lru_cache(maxsize=8)
+def _kind_labels(locale: str) -> Tuple[str, ...]:
+    """종류 번호별 표시명."""
+    table = display_table(locale)
+    return tuple(_display_label(entity, table, locale) for entity in KIND_ENTITY)
+
+
+def _detect_compact(text: str, active: Tuple) -> Tuple[RuleMatches, List[int], Dict[str, Dict[str, Any]]]:
+    """압축 스캔 + 병합. 반환: (스캔 결과, 선택된 인덱스(시작 위치 순), 탐지기별 timings)
+
+    응답/메트릭 형식을 유지하려고 규칙 탐지기 시간은 presidio 항목으로 기록합니다.
+    """
+    matches, ms = _timed(lambda: scan_compact(text))
+    detector_timings = {"numeric_ner": {"status": "disabled", "ms": 0.0}, "presidio": {"status": "ok", "ms": ms}}
+    with stage_timer("fusion"):
+        selected = resolve_indices(matches.starts, matches.ends, matches.kinds, KIND_SCORE, mode=active[-1])
+    _record_detectors(detector_timings)
+    counts = [0] * len(KIND_ENTITY)
+    for i in selected:
+        counts[matches.kinds[i]] += 1
+    for kind, n in enumerate(counts):
+        if n:
+            ENTITIES.inc(n, label=to_standard_label(KIND_ENTITY[kind]) or KIND_ENTITY[kind])
+    return matches, selected, detector_timings
+
+
+def _mask_compact(text: str, matches: RuleMatches, selected: List[int], locale: str) -> Tuple[str, List[Dict]]:
+    """`_mask_from_results`와 같은 결과를 배열에서 바로 만듭니다. (Span으로 바꾸지 않음)"""
+    labels = _kind_labels(locale)
+    starts, ends, kinds = matches.starts, matches.ends, matches.kinds
+    return _render(text, ((starts[i], ends[i], labels[kinds[i]]) for i in selected))
+
+
+def _mask_rule_only(text: str, active: Tuple) -> Tuple[Tuple[str, List[Dict]], Dict[str, Dict[str, Any]]]:
+    matches, selected, detector_timings = _detect_compact(text, active)
+    with stage_timer("render"):
+        result = _mask_compact(text, matches, selected, active[3])
+    return result, detector_timings
+
+
+def detect_entities(
+    text: str, timings: Optional[Dict[str, Any]] = None, fusion_mode: Optional[str] = None
+) -> List[Span]:
+    """마스킹 없이 병합된 탐지 결과(시작 위치 순)만 반환합니다. (캐시 사용 안 함)"""
+    active = _active_config(fusion_mode)
+    if _compact_rule_only(active):
+        matches, selected, detector_timings = _detect_compact(text, active)
+        if timings is not None:
+            timings.update(detector_timings)
+        return matches.to_spans(selected)
+    merged_results, detector_timings = _detect(text, active)
+    if timings is not None:
+        timings.update(detector_timings)
+    return merged_results
+
+
+def mask_text_with_models(
+    text: str, timings: Optional[Dict[str, Any]] = None, fusion_mode: Optional[str] = None
+) -> Tuple[str, List[Dict]]:
+    """텍스트를 마스킹합니다.
+
+    숫자 NER과 Presidio는 공유 풀에서 동시에 실행되며, 제한 시간(NER_TIMEOUT,
+    PRESIDIO_TIMEOUT)을 넘긴 탐지기는 제외하고 끝난 탐지기 결과만으로 마스킹합니다.
+    timings에 dict를 넘기면 탐지기별 상태/소요 시간(ms)을 채워 줍니다.
+    fusion_mode(greedy/weighted)를 넘기면 FUSION_MODE 대신 사용합니다.
+    """
+    active = _active_config(fusion_mode)
+    locale = active[3]
+    key = _cache_key(text, active)
+    cached = _cache_get(key)
+    if cached is not None:
+        if timings is not None:
+            timings["cache"] = {"status": "hit", "ms": 0.0}
+        return cached
+
+    if _compact_rule_only(active):
+        result, detector_timings = _mask_rule_only(text, active)
+    else:
+        merged_results, detector_timings = _detect(text, active)
+        # 마스킹 및 엔티티 목록 생성
+        with stage_timer("render"):
+            result = _mask_from_results(text, merged_results, locale=locale)
+    # 시간 초과로 일부 탐지기가 빠진 결과는 캐시하지 않음
+    if all(t["status"] != "timeout" for t in detector_timings.values()):
+        _cache_put(key, result)
+    if timings is not None:
+        timings.update(detector_timings)
+    return result
+
+
+def mask_texts_with_models(
+    texts: List[str], timings: Optional[Dict[str, Any]] = None, fusion_mode: Optional[str] = None
+) -> List[Tuple[str, List[Dict]]]:
+    """여러 텍스트를 한꺼번에 마스킹합니다.
+
+    NER은 한 번의 배치로, Presidio는 그와 동시에 실행합니다.
+    (제한 시간 처리, timings, fusion_mode는 `mask_text_with_models`와 같음)
+    """
+    try:
+        from ..nlp.local_pipeline import run_numeric_pipeline_batch  # type: ignore
+        from ..nlp.presidio_adapter import analyze_with_presidio  # type: ignore
+    except Exception:
+        from backend.nlp.local_pipeline import run_numeric_pipeline_batch  # type: ignore
+        from backend.nlp.presidio_adapter import analyze_with_presidio  # type: ignore
+
+    active = _active_config(fusion_mode)
+    _, disable_local_ner, disable_presidio, locale, *_, mode = active
+
+    # 캐시에 있는 항목은 제외하고 나머지만 배치로 실행
+    outputs: List[Optional[Tuple[str, List[Dict]]]] = []
+    keys = []
+    for text in texts:
+        key = _cache_key(text, active)
+        keys.append(key)
+        outputs.append(_cache_get(key))
+    pending = [i for i, out in enumerate(outputs) if out is None]
+    if timings is not None:
+        timings["cache"] = {"status": "hit" if not pending else "miss", "hits": len(texts) - len(pending)}
+    if not pending:
+        return outputs  # type: ignore[return-value]
+
+    if _compact_rule_only(active):
+        # 규칙 스캔은 텍스트마다 바로 실행 (배치로 묶어 얻는 이득이 없음)
+        rule_ms = 0.0
+        for i in pending:
+            outputs[i], detector_timings = _mask_rule_only(texts[i], active)
+            rule_ms += detector_timings["presidio"]["ms"]
+            _cache_put(keys[i], outputs[i])  # type: ignore[arg-type]
+        if timings is not None:
+            timings.update(detector_timings)
+            timings["presidio"] = {"status": "ok", "ms": round(rule_ms, 2)}
+        return outputs  # type: ignore[return-value]
+
+    pending_texts = [texts[i] for i in pending]
+    tasks, detector_timings = _detector_tasks(
+        disable_local_ner,
+        disable_presidio,
+        lambda: run_numeric_pipeline_batch(pending_texts),
+        lambda: [analyze_with_presidio(t) for t in pending_texts],
+    )
+    values, ran_timings = _run_detectors(tasks)
+    detector_timings.update(ran_timings)
+    local_batch = values.get("numeric_ner") or [[] for _ in pending_texts]
+    presidio_batch = values.get("presidio") or [[] for _ in pending_texts]
+    complete = all(t["status"] != "timeout" for t in detector_timings.values())
+
+    _record_detectors(detector_timings)
+    for i, local_results, presidio_results in zip(pending, local_batch, presidio_batch):
+        with stage_timer("fusion"):
+            merged_results = fuse_and_resolve(local_results, presidio_results, mode=mode)
+        _record_entities(merged_results)
+        with stage_timer("render"):
+            result = _mask_from_results(texts[i], merged_results, locale=locale)
+        if complete:
+            _cache_put(keys[i], result)
+        outputs[i] = result
+    if timings is not None:
+        timings.update(detector_timings)
+    return outputs  # type: ignore[return-value]
+
+
+def split_windows(text: str, max_chars: int, overlap: int = 0) -> List[Tuple[int, int, int, int]]:
+    """긴 텍스트를 겹치는 창으로 나눕니다. (탐지 시작, 탐지 끝, 유지 시작, 유지 끝) 목록을 반환합니다.
+
+    유지 구간은 max_chars 이하로 텍스트를 빈틈없이 나누며, 창의 뒤쪽 절반에서 마지막 줄바꿈
+    (없으면 공백) 뒤를 경계로 삼습니다. 탐지 구간은 유지 구간 앞뒤로 overlap 글자를 더 읽어
+    경계에 걸친 엔티티(공백이 든 전화번호/주소 포함)도 한쪽 창에서 온전히 찾게 합니다.
+    (`local_pipeline._plan_windows`와 같은 방식, 겹침은 max_chars의 절반까지)
+    """
+    if not text:
+        return []
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [(0, len(text), 0, len(text))]
+    overlap = min(max(0, overlap), max_chars // 2)
+    windows: List[Tuple[int, int, int, int]] = []
+    pos = 0
+    while pos < len(text):
+        end = min(len(text), pos + max_chars)
+        if end < len(text):
+            half = pos + max_chars // 2
+            cut = text.rfind("\n", half, end)
+            if cut < 0:
+                cut = max(text.rfind(" ", half, end), text.rfind("\t", half, end))
+            if cut >= 0:
+                end = cut + 1
+        windows.append((max(0, pos - overlap), min(len(text), end + overlap), pos, end))
+        pos = end
+    return windows
+
 
-    # 마스킹 및 엔티티 목록 생성
-    return _mask_from_results(text, merged_results)
+def iter_mask_records(
+    units: Iterable[Tuple[str, str]],
+    detect: Optional[Callable[[str, Dict[str, Any]], List[Span]]] = None,
+    fusion_mode: Optional[str] = None,
+    window_chars: int = STREAM_WINDOW_CHARS,
+    window_overlap: int = STREAM_WINDOW_OVERLAP,
+) -> Iterator[Dict[str, Any]]:
+    """단위(페이지 등)별로 탐지/병합/마스킹하며 NDJSON용 레코드를 내보냅니다.
 
+    units: (구분자, 본문) 쌍. 구분자는 마스킹하지 않고 그대로 출력합니다.
+    detect: (창 텍스트, timings) -> 병합된 결과. 기본은 `detect_entities`
+    본문은 window_chars 단위 창으로 나눠 처리하되, 창 앞뒤로 window_overlap 글자를 더 읽어 탐지하고
+    창 안에서 시작하는 엔티티만 남깁니다. 경계를 넘는 엔티티는 앞 창의 출력 조각이 끝까지 덮고,
+    다음 창은 그 뒤부터 출력합니다. (window_overlap보다 긴 엔티티만 경계에서 놓칠 수 있음)
 
+    레코드(type 필드로 구분):
+      - segment: {"offset", "text"} 마스킹된 출력 조각 (순서대로 이으면 전체 결과)
+      - entity: {"entity", "label", "start", "end"} 원문 기준 위치
+      - summary: {"segments", "entities", "chars", "timings"} 마지막 한 번
+    """
+    if detect is None:
+        detect = lambda window, t: detect_entities(window, t, fusion_mode)  # noqa: E731
+    locale = _active_config(fusion_mode)[3]
+    offset = 0
+    segments = entities = 0
+    timings: Dict[str, Dict[str, Any]] = {}
+    for separator, body in units:
+        if separator:
+            yield {"type": "segment", "offset": offset, "text": separator}
+            segments += 1
+            offset += len(separator)
+        cursor = 0  # 본문에서 이미 출력한 위치 (앞 창의 엔티티가 경계를 넘으면 유지 시작보다 뒤)
+        for context_start, context_end, keep_start, keep_end in split_windows(body, window_chars, window_overlap):
+            window_timings: Dict[str, Any] = {}
+            merged_results = detect(body[context_start:context_end], window_timings)
+            for name, t in window_timings.items():
+                total = timings.setdefault(name, {"status": t.get("status"), "ms": 0.0})
+                total["ms"] = round(total["ms"] + t.get("ms", 0.0), 2)
+                if t.get("status") == "timeout":
+                    total["status"] = "timeout"
+            # 본문 기준 위치로 옮기고 이 창의 유지 구간에서 시작하는 결과만 남김
+            # (앞 창이 이미 출력한 부분에서 시작하는 결과는 `_segments`가 건너뜀)
+            shift = context_start - cursor
+            kept = [
+                r._replace(start=r.start + shift, end=r.end + shift)
+                for r in merged_results
+                if keep_start <= r.start + context_start < keep_end
+            ]
+            segment_end = max([keep_end] + [r.end + cursor for r in kept if r.start >= 0])
+            if segment_end <= cursor:
+                continue
+            pieces: List[str] = []
+            found: List[Dict[str, Any]] = []
+            with stage_timer("render"):
+                for piece, entity in _iter_segments(body[cursor:segment_end], kept, locale):
+                    pieces.append(piece)
+                    if entity is not None:
+                        found.append(entity)
+            yield {"type": "segment", "offset": offset, "text": "".join(pieces)}
+            segments += 1
+            for entity in found:
+                yield {
+                    "type": "entity",
+                    "entity": entity["entity"],
+                    "label": entity["label"],
+                    "start": offset + entity["start"],
+                    "end": offset + entity["end"],
+                }
+            entities += len(found)
+            offset += segment_end - cursor
+            cursor = segment_end
+    yield {"type": "summary", "segments": segments, "entities": entities, "chars": offset, "timings": timings}
@@ -1,47 +1,348 @@
+import hashlib
+import io
 import logging
-from typing import BinaryIO
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, BinaryIO, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    from ..config import (
+        PDF_OCR_WORKERS,
+        PDF_CACHE_MAX_BYTES,
+        PDF_CACHE_DIR,
+        PDF_CACHE_DISK_ALLOW_PLAINTEXT,
+        PDF_CACHE_DISK_MAX_BYTES,
+        PDF_CACHE_DISK_TTL,
+    )
+    from ..utils.cache import LRUCache
+    from ..utils.metrics import PDF_INPUT_BYTES, PDF_PAGES, REGISTRY, cache_stats_family, observe_stage, stage_timer
+except Exception:  # pragma: no cover
+    from backend.config import (  # type: ignore
+        PDF_OCR_WORKERS,
+        PDF_CACHE_MAX_BYTES,
+        PDF_CACHE_DIR,
+        PDF_CACHE_DISK_ALLOW_PLAINTEXT,
+        PDF_CACHE_DISK_MAX_BYTES,
+        PDF_CACHE_DISK_TTL,
+    )
+    from backend.utils.cache import LRUCache  # type: ignore
+    from backend.utils.metrics import (  # type: ignore
+        PDF_INPUT_BYTES,
+        PDF_PAGES,
+        REGISTRY,
+        cache_stats_family,
+        observe_stage,
+        stage_timer,
+    )
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
-def extract_text_from_pdf(pdf_bytes_io: BinaryIO) -> str:
-    """간단한 PDF 텍스트 추출기.
+OCR_LANG = "kor+eng"
+
+
+def _ocr_page(pdf_path: str, page_number: int) -> str:
+    """PDF 한 페이지만 이미지로 렌더링해 OCR합니다. (프로세스 풀에서 실행)"""
+    from pdf2image import convert_from_path
+    import pytesseract
+
+    images = convert_from_path(pdf_path, first_page=page_number, last_page=page_number)
+    texts = []
+    for img in images:
+        text = pytesseract.image_to_string(img, lang=OCR_LANG)
+        if text.strip():
+            texts.append(text.strip())
+    return "\n".join(texts)
+
+
+@lru_cache(maxsize=1)
+def _ocr_available() -> bool:
+    try:
+        import pdf2image  # noqa: F401
+        import pytesseract  # noqa: F401
+
+        return True
+    except Exception:
+        logging.warning("pdf2image/pytesseract가 없어 OCR을 건너뜁니다.")
+        return False
+
+
+# OCR 전용 프로세스 풀 (PDF_OCR_WORKERS=0이면 요청 스레드에서 순차 실행)
+# 모델을 올린 부모 프로세스를 fork하지 않도록 spawn 방식을 사용합니다.
+@lru_cache(maxsize=1)
+def _get_ocr_pool() -> Union[ProcessPoolExecutor, None]:
+    if PDF_OCR_WORKERS <= 0:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=PDF_OCR_WORKERS, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+# 풀 관리 스레드는 fork된 자식에 없으므로 자식에서는 새 풀을 만들게 합니다.
+os.register_at_fork(after_in_child=_get_ocr_pool.cache_clear)
+
+
+def _resolve(entry: Union[str, Future], page_number: int) -> str:
+    if isinstance(entry, str):
+        return entry
+    try:
+        return entry.result()
+    except Exception:
+        logging.error(f"{page_number}페이지 OCR 처리 실패", exc_info=True)
+        return ""
+
 
-    우선 PyPDF2 시도 → 실패 시 빈 문자열 반환.
-    실패하거나 텍스트가 거의 없으면 pytesseract로 OCR 시도
+def _ocr_timer(submitted: float):
+    """풀에 제출한 OCR 작업의 제출~완료 시간을 관측하는 콜백. (워커 프로세스 메트릭은 모이지 않음)"""
 
+    def done(fut: Future) -> None:
+        if not fut.cancelled():
+            observe_stage("pdf_ocr", time.perf_counter() - submitted)
+
+    return done
+
+
+def _resolve_inline(pdf_path: str, page_number: int) -> str:
+    try:
+        with stage_timer("pdf_ocr"):
+            return _ocr_page(pdf_path, page_number)
+    except Exception:
+        logging.error(f"{page_number}페이지 OCR 처리 실패", exc_info=True)
+        return ""
+
+
+def iter_pdf_pages(pdf_bytes_io: BinaryIO) -> Iterator[str]:
+    """PDF 페이지 텍스트를 페이지 순서대로 하나씩 내보냅니다.
+
+    텍스트 레이어가 있는 페이지는 PyPDF2 결과를 그대로 쓰고,
+    비어 있는 페이지만 OCR합니다. OCR은 프로세스 풀에서 페이지 단위로
+    병렬 실행하되, 동시에 렌더링되는 페이지 수를 풀 크기의 2배로 제한해
+    모든 페이지 이미지를 한꺼번에 메모리에 올리지 않습니다.
+    PyPDF2로 문서를 열지 못하면 아무것도 내보내지 않습니다.
     """
     try:
         from PyPDF2 import PdfReader
 
+        pdf_bytes_io.seek(0)
         reader = PdfReader(pdf_bytes_io)
-        texts = []
-        for page in reader.pages:
+        pages = reader.pages
+        num_pages = len(pages)
+    except Exception:
+        logging.error("PyPDF2 처리 실패", exc_info=True)
+        return
+
+    pool = _get_ocr_pool()
+    window = max(1, PDF_OCR_WORKERS * 2)
+    pending: Deque[tuple] = deque()
+    pdf_path = None
+    try:
+        for idx in range(num_pages):
             try:
-                texts.append(page.extract_text() or "")
+                with stage_timer("pdf_pypdf2"):
+                    text = (pages[idx].extract_text() or "").strip()
             except Exception as e:
                 logging.warning(f"페이지 추출 실패: {e}")
-                continue
-        text_result = "\n".join(t.strip() for t in texts if t)
-        if text_result.strip():
-            return text_result
+                text = ""
+            PDF_PAGES.inc(method="text" if text else ("ocr" if _ocr_available() else "empty"))
 
-    except Exception as e:
-        logging.error("PyPDF2 처리 실패", exc_info=True)
-        return ""
+            entry: Union[str, Future] = text
+            if not text and _ocr_available():
+                if pdf_path is None:
+                    # 워커가 페이지별로 읽을 수 있도록 원본을 임시 파일로 한 번만 저장
+                    pdf_bytes_io.seek(0)
+                    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                        tmp.write(pdf_bytes_io.read())
+                        pdf_path = tmp.name
+                if pool is None:
+                    entry = _resolve_inline(pdf_path, idx + 1)
+                else:
+                    entry = pool.submit(_ocr_page, pdf_path, idx + 1)
+                    entry.add_done_callback(_ocr_timer(time.perf_counter()))
+            pending.append((idx + 1, entry))
+
+            # 앞쪽 페이지가 끝났거나 창이 가득 차면 순서대로 내보냄
+            while pending and (
+                isinstance(pending[0][1], str) or pending[0][1].done() or len(pending) > window
+            ):
+                page_number, head = pending.popleft()
+                yield _resolve(head, page_number)
+
+        while pending:
+            page_number, head = pending.popleft()
+            yield _resolve(head, page_number)
+    finally:
+        for _, entry in pending:
+            if isinstance(entry, Future):
+                entry.cancel()
+        if pdf_path is not None:
+            try:
+                os.unlink(pdf_path)
+            except OSError:
+                pass
 
+
+# 같은 PDF가 반복 업로드되는 경우를 위한 추출 결과 캐시
+# 메모리(LRU, 바이트 크기 기준 제거) → 디스크(PDF_CACHE_DIR, 재시작 후에도 유지) 순으로 조회합니다.
+# 디스크 캐시는 원문(개인정보)을 평문으로 저장하므로 PDF_CACHE_DISK_ALLOW_PLAINTEXT=1일 때만 켭니다.
+@lru_cache(maxsize=1)
+def _get_text_cache() -> LRUCache:
+    return LRUCache(max_bytes=PDF_CACHE_MAX_BYTES)
+
+
+_disk_lock = threading.Lock()
+_disk_stats = {"disk_hits": 0, "disk_writes": 0, "disk_evictions": 0}
+_disk_usage: Dict[str, Optional[int]] = {"bytes": None}  # 디렉터리 전체 크기 추정 (처음 쓸 때 한 번 계산)
+
+
+@lru_cache(maxsize=1)
+def _disk_enabled() -> bool:
+    if not PDF_CACHE_DIR:
+        return False
+    if not PDF_CACHE_DISK_ALLOW_PLAINTEXT:
+        logging.warning(
+            "PDF_CACHE_DIR가 설정됐지만 원문을 평문으로 저장하므로 디스크 캐시를 끕니다. "
+            "(사용하려면 PDF_CACHE_DISK_ALLOW_PLAINTEXT=1)"
+        )
+        return False
+    return True
+
+
+def _disk_path(digest: str) -> Optional[str]:
+    if not _disk_enabled():
+        return None
+    return os.path.join(PDF_CACHE_DIR, digest[:2], f"{digest}.txt")
+
+
+def _remove(path: str) -> None:
     try:
-        from pdf2image import convert_from_bytes
-        import pytesseract
+        os.unlink(path)
+    except OSError:
+        pass
 
-        pdf_bytes_io.seek(0)
-        images = convert_from_bytes(pdf_bytes_io.read())
-        texts = []
-        for img in images:
-            text = pytesseract.image_to_string(img, lang="kor+eng")
-            if text.strip():
-                texts.append(text.strip())
-
-        return "\n".join(texts)
-    except Exception as e:
-        logging.error("OCR 처리 실패", exc_info=True)
-        return ""
+
+def _disk_get(digest: str) -> Optional[str]:
+    path = _disk_path(digest)
+    if path is None:
+        return None
+    try:
+        if time.time() - os.path.getmtime(path) > PDF_CACHE_DISK_TTL:
+            _remove(path)
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        os.utime(path)  # 최근 사용 시각 갱신 (용량 초과 시 오래 안 쓴 파일부터 삭제)
+    except OSError:
+        return None
+    with _disk_lock:
+        _disk_stats["disk_hits"] += 1
+    return text
+
+
+def _scan_disk() -> List[Tuple[float, int, str]]:
+    """캐시 파일 목록 [(수정 시각, 크기, 경로)]."""
+    entries = []
+    for sub in os.scandir(PDF_CACHE_DIR):
+        if not sub.is_dir():
+            continue
+        for entry in os.scandir(sub.path):
+            if entry.name.endswith(".txt"):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+    return entries
+
+
+def _evict_disk() -> None:
+    """TTL이 지난 파일과, 전체 크기가 한도를 넘으면 오래 안 쓴 파일부터 삭제합니다. (_disk_lock 안에서 호출)
+
+    다른 워커 프로세스도 같은 디렉터리에 쓰므로 삭제할 때마다 실제 크기를 다시 계산합니다.
+    한도의 90%까지 줄여 쓰기마다 삭제가 반복되지 않게 합니다.
+    """
+    now = time.time()
+    entries = sorted(_scan_disk())
+    total = sum(size for _, size, _ in entries)
+    target = PDF_CACHE_DISK_MAX_BYTES * 0.9
+    for mtime, size, path in entries:
+        if now - mtime <= PDF_CACHE_DISK_TTL and total <= target:
+            break
+        _remove(path)
+        total -= size
+        _disk_stats["disk_evictions"] += 1
+    _disk_usage["bytes"] = total
+
+
+def _disk_put(digest: str, text: str) -> None:
+    path = _disk_path(digest)
+    if path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 동시 쓰기에도 깨진 파일이 보이지 않도록 임시 파일에 쓴 뒤 교체
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        with _disk_lock:
+            _disk_stats["disk_writes"] += 1
+            if _disk_usage["bytes"] is None:
+                _evict_disk()
+            else:
+                _disk_usage["bytes"] += size
+                if _disk_usage["bytes"] > PDF_CACHE_DISK_MAX_BYTES:
+                    _evict_disk()
+    except OSError:
+        logging.warning("PDF 캐시 디스크 저장 실패", exc_info=True)
+
+
+def get_pdf_cache_stats() -> Dict[str, Any]:
+    """PDF 추출 캐시 적중/미스 통계."""
+    stats = _get_text_cache().stats()
+    with _disk_lock:
+        stats.update(_disk_stats)
+    return stats
+
+
+REGISTRY.register_collector(lambda: cache_stats_family("pdf", get_pdf_cache_stats()))
+
+
+def extract_text_from_pdf(pdf_bytes_io: BinaryIO, use_cache: bool = True) -> str:
+    """간단한 PDF 텍스트 추출기.
+
+    페이지마다 PyPDF2로 텍스트를 추출하고, 텍스트가 없는 페이지만
+    pytesseract로 OCR합니다. (페이지 단위 병렬 처리, `iter_pdf_pages` 참고)
+    PyPDF2로 문서를 열지 못하면 빈 문자열을 반환합니다.
+
+    업로드 바이트의 SHA-256을 키로 결과를 캐시하므로 같은 파일은 해시 계산만으로 끝납니다.
+    """
+    if not use_cache:
+        return "\n".join(t for t in iter_pdf_pages(pdf_bytes_io) if t)
+
+    pdf_bytes_io.seek(0)
+    data = pdf_bytes_io.read()
+    PDF_INPUT_BYTES.observe(len(data))
+    digest = hashlib.sha256(data).hexdigest()
+
+    cache = _get_text_cache()
+    cached = cache.get(digest)
+    if cached is not None:
+        return cached
+    cached = _disk_get(digest)
+    if cached is not None:
+        cache.put(digest, cached)
+        return cached
+
+    with stage_timer("pdf_extract"):
+        text = "\n".join(t for t in iter_pdf_pages(io.BytesIO(data)) if t)
+    # 빈 결과는 일시적 OCR 실패일 수 있어 저장하지 않음
+    if text:
+        cache.put(digest, text)
+        _disk_put(digest, text)
+    return text
@@ -1,5 +1,9 @@
-from typing import Dict
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
 
+try:
+    from ..utils.metrics import stage_timer
+except Exception:  # pragma: no cover
+    from backend.utils.metrics import stage_timer  # type: ignore
 
 TEMPLATE_KEYS = {
     "question1": "답변1",
@@ -10,6 +14,15 @@ TEMPLATE_KEYS = {
     "question6": "답변6",
 }
 
+# 마스킹 대상: question2만 / 전체 프롬프트 / 전체 프롬프트 + PDF
+MASK_TARGET_QUESTION2 = "question2"
+MASK_TARGET_PROMPT = "prompt"
+MASK_TARGET_PROMPT_PDF = "prompt_pdf"
+MASK_TARGETS = (MASK_TARGET_QUESTION2, MASK_TARGET_PROMPT, MASK_TARGET_PROMPT_PDF)
+
+# 프롬프트 뒤에 PDF 본문을 붙일 때의 구분자
+PDF_SECTION_HEADER = "\n\n[PDF 내용]\n"
+
 
 def _get(d: Dict, k: str) -> str:
     v = d.get(k)
@@ -42,3 +55,53 @@ def build_prompt(data: Dict) -> str:
     return "\n".join(lines)
 
 
+def build_mask_text(
+    data: Dict,
+    target: str = MASK_TARGET_QUESTION2,
+    load_pdf_text: Optional[Callable[[], str]] = None,
+) -> str:
+    """마스킹 대상에 필요한 텍스트만 만듭니다.
+
+    - question2: 전체 프롬프트를 만들지 않고 question2만 반환
+    - prompt: 템플릿으로 전체 프롬프트 생성
+    - prompt_pdf: 전체 프롬프트 + PDF 본문 (이때만 load_pdf_text 호출)
+    """
+    if target == MASK_TARGET_QUESTION2:
+        return _get(data, "question2")
+
+    with stage_timer("build_prompt"):
+        text = build_prompt(data)
+    if target == MASK_TARGET_PROMPT_PDF and load_pdf_text is not None:
+        pdf_text = load_pdf_text()
+        if pdf_text:
+            # 구분자와 함께 PDF 본문을 프롬프트에 추가
+            text = f"{text}{PDF_SECTION_HEADER}{pdf_text}"
+    return text
+
+
+def iter_mask_units(
+    data: Dict,
+    target: str = MASK_TARGET_QUESTION2,
+    pdf_pages: Optional[Iterable[str]] = None,
+) -> Iterator[Tuple[str, str]]:
+    """`build_mask_text`와 같은 텍스트를 (구분자, 본문) 단위로 나눠 내보냅니다.
+
+    prompt_pdf이면 프롬프트 다음에 PDF 페이지를 하나씩 내보내므로
+    전체 본문을 메모리에 모으지 않고 페이지 단위로 처리할 수 있습니다.
+    (빈 페이지는 건너뛰고, 페이지 사이 구분자는 줄바꿈)
+    """
+    if target == MASK_TARGET_QUESTION2:
+        yield "", _get(data, "question2")
+        return
+
+    with stage_timer("build_prompt"):
+        prompt = build_prompt(data)
+    yield "", prompt
+    if target != MASK_TARGET_PROMPT_PDF or pdf_pages is None:
+        return
+    separator = PDF_SECTION_HEADER
+    for page in pdf_pages:
+        if not page:
+            continue
+        yield separator, page
+        separator = "\n"
@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+try:
+    from ..config import DISABLE_LOCAL_NER, DISABLE_PRESIDIO, NER_BACKEND, get_device
+    from .masking_service import detect_entities
+    from .executor import get_detection_executor, get_inference_executor
+except Exception:  # pragma: no cover
+    from backend.config import DISABLE_LOCAL_NER, DISABLE_PRESIDIO, NER_BACKEND, get_device  # type: ignore
+    from backend.services.masking_service import detect_entities  # type: ignore
+    from backend.services.executor import get_detection_executor, get_inference_executor  # type: ignore
+
+# 서버 시작 시 모델을 미리 로딩하고 더미 추론을 한 번 실행해
+# 첫 요청이 모델 로딩/커널 초기화 시간을 떠안지 않게 합니다.
+# 예열이 끝나기 전까지 /ready는 503을 반환해 로드 밸런서가 요청을 보내지 않도록 합니다.
+
+# 더미 추론에 쓰는 문장 (숫자 NER과 규칙 인식기가 모두 동작하도록 식별자 포함)
+WARMUP_TEXT = "홍길동의 주민번호는 800101-1234567이고 계좌번호는 110-123-456789, 여권번호는 M12345678입니다."
+
+WARMUP_IDLE = "idle"
+WARMUP_RUNNING = "running"
+WARMUP_READY = "ready"
+WARMUP_FAILED = "failed"
+WARMUP_SKIPPED = "skipped"
+
+_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+_state: Dict[str, Any] = {"status": WARMUP_IDLE, "timings": {}, "error": None}
+
+
+def _set_state(**values: Any) -> None:
+    with _lock:
+        _state.update(values)
+
+
+def _step(timings: Dict[str, float], name: str, fn) -> Any:
+    started = time.perf_counter()
+    value = fn()
+    timings[name] = round((time.perf_counter() - started) * 1000, 2)
+    return value
+
+
+def preload_shared_models() -> Dict[str, float]:
+    """pre-fork 서버의 마스터 프로세스에서 모델 가중치만 미리 로딩합니다.
+
+    fork된 워커들은 이 가중치를 copy-on-write로 공유합니다. 추론과 스레드 생성은 하지 않으며
+    (fork 이후 OpenMP 스레드 풀이 멈출 수 있음), 더미 추론은 워커의 `start_warmup`에서 합니다.
+    ONNX Runtime 세션은 만들 때 스레드 풀을 띄우므로 onnx 백엔드는 워커마다 로딩합니다.
+    GPU를 쓰면 마스터에서 CUDA를 초기화하게 되어 fork된 워커의 추론이 실패하므로
+    ("Cannot re-initialize CUDA in forked subprocess") 숫자 모델은 워커마다 로딩합니다.
+    """
+    try:
+        from ..nlp import local_pipeline, presidio_adapter  # type: ignore
+    except Exception:  # pragma: no cover
+        from backend.nlp import local_pipeline, presidio_adapter  # type: ignore
+
+    timings: Dict[str, float] = {}
+    if not DISABLE_LOCAL_NER and NER_BACKEND != "onnx":
+        if get_device() >= 0:
+            logging.warning("GPU 사용 중이라 숫자 모델 사전 로딩을 건너뜁니다. (워커마다 로딩, 가중치 공유 없음)")
+        else:
+            _step(timings, "numeric_ner_load_ms", local_pipeline.preload_models)
+    if not DISABLE_PRESIDIO:
+        _step(timings, "presidio_load_ms", presidio_adapter.preload_engines)
+    logging.info("공유 모델 사전 로딩 완료: %s", timings)
+    return timings
+
+
+def run_warmup() -> Dict[str, Any]:
+    """모델/엔진 로딩 → 더미 추론 순으로 예열하고 단계별 소요 시간(ms)을 기록합니다.
+
+    탐지기 예외가 나면 상태를 failed로 두고 다시 발생시킵니다.
+    """
+    try:
+        from ..nlp import local_pipeline, presidio_adapter  # type: ignore
+    except Exception:  # pragma: no cover
+        from backend.nlp import local_pipeline, presidio_adapter  # type: ignore
+
+    timings: Dict[str, float] = {}
+    _set_state(status=WARMUP_RUNNING, timings=timings, error=None)
+    started = time.perf_counter()
+    try:
+        _step(timings, "executors_ms", lambda: (get_inference_executor(), get_detection_executor()))
+        if not DISABLE_LOCAL_NER:
+            _step(timings, "numeric_ner_load_ms", local_pipeline.preload_models)
+        if not DISABLE_PRESIDIO:
+            _step(timings, "presidio_load_ms", presidio_adapter.preload_engines)
+        detectors: Dict[str, Any] = {}
+        _step(timings, "first_inference_ms", lambda: detect_entities(WARMUP_TEXT, timings=detectors))
+        # 모델이 로딩된 뒤라 시간 초과는 일시적인 것으로 보고 경고만 남김
+        slow = [name for name, t in detectors.items() if t["status"] == "timeout"]
+        if slow:
+            logging.warning("예열 추론에서 시간 초과된 탐지기: %s", ", ".join(slow))
+    except Exception as exc:
+        logging.exception("모델 예열 실패")
+        _set_state(status=WARMUP_FAILED, error=f"{type(exc).__name__}: {exc}")
+        raise
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    _set_state(status=WARMUP_READY)
+    logging.info("모델 예열 완료: %s", timings)
+    return dict(timings)
+
+
+def _run_in_background() -> None:
+    try:
+        run_warmup()
+    except Exception:
+        pass  # run_warmup에서 상태/로그 기록
+
+
+def start_warmup(enabled: bool = True) -> None:
+    """예열을 백그라운드 스레드에서 한 번만 시작합니다.
+
+    enabled=False면 예열 없이 바로 준비 상태로 둡니다. (첫 요청에서 지연 로딩)
+    """
+    global _thread
+    with _lock:
+        if _thread is not None or _state["status"] != WARMUP_IDLE:
+            return
+        if not enabled:
+            _state["status"] = WARMUP_SKIPPED
+            return
+        _thread = threading.Thread(target=_run_in_background, name="model-warmup", daemon=True)
+    _thread.start()
+
+
+def get_readiness() -> Dict[str, Any]:
+    """예열 상태 스냅샷. ready는 예열이 끝났거나 생략된 경우 True."""
+    with _lock:
+        snapshot = {**_state, "timings": dict(_state["timings"])}
+    snapshot["ready"] = snapshot["status"] in (WARMUP_READY, WARMUP_SKIPPED)
+    return snapshot
+
+
+__all__ = ["WARMUP_TEXT", "preload_shared_models", "run_warmup", "start_warmup", "get_readiness"]
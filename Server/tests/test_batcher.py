@@ -0,0 +1,150 @@
+"""`MicroBatcher`의 배치 나누기/단건 재시도/결과 수 불일치/종료 처리를 확인합니다.
+
+가짜 배치 함수의 첫 호출을 Event로 붙잡아 둔 동안 입력을 쌓아, 다음 배치 구성이
+스레드 타이밍과 무관하게 정해지도록 합니다. (max_wait_ms=0이면 이미 쌓인 입력만 모음)
+
+실행 예 (저장소 루트에서):
+    python -m pytest -q Server/tests
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import pytest
+
+from Server.nlp.batcher import MicroBatcher
+
+TIMEOUT = 5.0
+
+
+class FakeBatch:
+    """호출된 배치를 기록하고 각 입력을 fn으로 바꿔 돌려주는 배치 함수.
+
+    첫 호출(게이트 입력)은 release()할 때까지 멈춥니다.
+    """
+
+    def __init__(self, fn: Optional[Callable[[List[str]], List[str]]] = None) -> None:
+        self.fn = fn or (lambda items: [item.upper() for item in items])
+        self.calls: List[List[str]] = []
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+        self.gate_future: Optional[Future] = None
+
+    def __call__(self, items: List[str]) -> List[str]:
+        self.calls.append(list(items))
+        if len(self.calls) == 1:
+            self.entered.set()
+            assert self.gate.wait(TIMEOUT)
+        return self.fn(items)
+
+    def release(self) -> None:
+        self.gate.set()
+
+
+def held_batcher(fake: FakeBatch, max_batch_size: int = 3) -> MicroBatcher:
+    """작업 스레드가 게이트 입력을 처리하며 멈춰 있는 배처."""
+    batcher = MicroBatcher(fake, max_batch_size=max_batch_size, max_wait_ms=0, name="test-batcher")
+    fake.gate_future = batcher.submit("gate")
+    assert fake.entered.wait(TIMEOUT)
+    return batcher
+
+
+def results(futures: List[Future]) -> List[str]:
+    return [f.result(timeout=TIMEOUT) for f in futures]
+
+
+def stop(batcher: MicroBatcher) -> None:
+    """종료를 요청하고 작업 스레드가 제한 시간 안에 끝났는지 확인합니다. (멈추면 테스트가 매달리지 않고 실패)"""
+    batcher.shutdown(wait=False)
+    batcher._thread.join(TIMEOUT)
+    assert not batcher._thread.is_alive()
+
+
+def test_splits_batches_and_returns_each_callers_result():
+    fake = FakeBatch()
+    batcher = held_batcher(fake)
+    futures = batcher.submit_many([f"t{i}" for i in range(7)])
+    fake.release()
+    assert results(futures) == [f"T{i}" for i in range(7)]
+    assert fake.gate_future.result(timeout=TIMEOUT) == "GATE"
+    assert fake.calls == [["gate"], ["t0", "t1", "t2"], ["t3", "t4", "t5"], ["t6"]]
+    stop(batcher)
+
+
+def test_failed_batch_is_retried_item_by_item():
+    def fn(items: List[str]) -> List[str]:
+        if "bad" in items:
+            raise ValueError("bad input")
+        return [item.upper() for item in items]
+
+    fake = FakeBatch(fn)
+    batcher = held_batcher(fake)
+    futures = batcher.submit_many(["a", "bad", "c"])
+    fake.release()
+    assert futures[0].result(timeout=TIMEOUT) == "A"
+    with pytest.raises(ValueError, match="bad input"):
+        futures[1].result(timeout=TIMEOUT)
+    assert futures[2].result(timeout=TIMEOUT) == "C"
+    assert fake.calls[1:] == [["a", "bad", "c"], ["a"], ["bad"], ["c"]]
+    stop(batcher)
+
+
+def test_single_item_failure_is_not_retried():
+    def fn(items: List[str]) -> List[str]:
+        if items == ["bad"]:
+            raise ValueError("bad input")
+        return items
+
+    fake = FakeBatch(fn)
+    batcher = held_batcher(fake)
+    future = batcher.submit("bad")
+    fake.release()
+    with pytest.raises(ValueError):
+        future.result(timeout=TIMEOUT)
+    stop(batcher)
+    assert fake.calls[1:] == [["bad"]]
+
+
+@pytest.mark.parametrize("outputs", [lambda items: items[:-1], lambda items: items + ["extra"], lambda items: []])
+def test_output_length_mismatch_fails_every_future(outputs):
+    fake = FakeBatch(lambda items: items if items == ["gate"] else outputs(items))
+    batcher = held_batcher(fake)
+    futures = batcher.submit_many(["a", "b", "c"])
+    fake.release()
+    for future in futures:
+        with pytest.raises(RuntimeError, match="배치 결과 수"):
+            future.result(timeout=TIMEOUT)
+    stop(batcher)
+
+
+def test_cancelled_inputs_are_skipped():
+    fake = FakeBatch()
+    batcher = held_batcher(fake)
+    cancelled, kept = batcher.submit_many(["x", "y"])
+    assert cancelled.cancel()
+    fake.release()
+    assert kept.result(timeout=TIMEOUT) == "Y"
+    stop(batcher)
+    assert fake.calls[1:] == [["y"]]
+
+
+def test_shutdown_drains_queued_inputs_then_stops():
+    fake = FakeBatch()
+    batcher = held_batcher(fake)
+    futures = batcher.submit_many(["a", "b", "c", "d"])
+    batcher.shutdown(wait=False)
+    with pytest.raises(RuntimeError):
+        batcher.submit("late")
+    fake.release()
+    stop(batcher)
+    batcher.shutdown()  # 다시 호출해도 됨 (이미 끝난 스레드를 기다리기만 함)
+    assert results(futures) == ["A", "B", "C", "D"]
+    assert fake.calls == [["gate"], ["a", "b", "c"], ["d"]]
+
+
+def test_shutdown_without_inputs():
+    batcher = MicroBatcher(FakeBatch(), name="test-batcher")
+    batcher.shutdown()
+    with pytest.raises(RuntimeError):
+        batcher.submit("late")
@@ -0,0 +1,162 @@
+"""토큰 길이 버킷 배칭(`plan_buckets`/`LengthBucketScheduler`)을 torch 없이 확인합니다.
+
+가짜 파이프라인으로 단계별 인자를 `_sanitize_parameters`로 한 번만 만드는지와,
+그 메서드가 없는 파이프라인은 `pipe(texts, batch_size=...)`로 실행하는지(창 나누기 포함) 봅니다.
+
+실행 예 (저장소 루트에서):
+    python -m pytest -q Server/tests
+"""
+
+import re
+from typing import Any, Dict, List, Sequence, Tuple
+
+import pytest
+
+from Server.nlp import bucketing
+from Server.nlp.bucketing import LengthBucketScheduler, plan_buckets
+
+_WORD = re.compile(r"\S+")
+_PII = re.compile(r"PII\d+")
+
+
+def find_pii(text: str) -> List[Dict]:
+    return [{"entity_group": "PN", "start": m.start(), "end": m.end(), "word": m.group()} for m in _PII.finditer(text)]
+
+
+class WordTokenizer:
+    """공백으로 나눈 단어 하나를 토큰 하나로 보는 토크나이저."""
+
+    def __call__(self, text: str, **_: Any) -> Dict[str, List]:
+        offsets = [m.span() for m in _WORD.finditer(text)]
+        return {"input_ids": list(range(len(offsets))), "offset_mapping": offsets}
+
+
+class PlainPipe:
+    """`_sanitize_parameters`가 없는 파이프라인. (pipe(texts, batch_size=...)만 지원)"""
+
+    def __init__(self) -> None:
+        self.tokenizer = WordTokenizer()
+        self.calls: List[Tuple[List[str], int]] = []
+
+    def __call__(self, texts: Sequence[str], batch_size: int = 1) -> List[List[Dict]]:
+        self.calls.append((list(texts), batch_size))
+        return [find_pii(t) for t in texts]
+
+
+class Ids:
+    """`input_ids` 대용. (스케줄러는 shape[-1]로 길이를 읽음)"""
+
+    def __init__(self, n: int) -> None:
+        self.shape = (1, n)
+
+
+class StagedPipe(PlainPipe):
+    """전처리/순전파/후처리 단계를 나눠 부를 수 있는 파이프라인."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.sanitized: List[Dict[str, Any]] = []
+        self.stage_params: List[Tuple[str, Dict[str, Any]]] = []
+        self.forward_sizes: List[int] = []
+
+    def _sanitize_parameters(self, **kwargs: Any):
+        self.sanitized.append(kwargs)
+        return {"pre": kwargs}, {"fwd": kwargs}, {"post": kwargs}
+
+    def preprocess(self, text: str, **params: Any):
+        self.stage_params.append(("preprocess", params))
+        yield {"input_ids": Ids(len(_WORD.findall(text))), "sentence": text}
+
+    def forward(self, batch: Dict[str, List], **params: Any) -> Dict[str, List]:
+        self.stage_params.append(("forward", params))
+        self.forward_sizes.append(len(batch["sentence"]))
+        return {"sentence": batch["sentence"], "pii": [find_pii(t) for t in batch["sentence"]]}
+
+    def postprocess(self, outputs: List[Dict[str, Any]], **params: Any) -> List[Dict]:
+        self.stage_params.append(("postprocess", params))
+        return [ent for output in outputs for ent in output["pii"]]
+
+
+def fake_collate(tokenizer, feature_extractor):
+    def collate(items: List[Dict[str, Any]]) -> Dict[str, List]:
+        return {key: [item[key] for item in items] for key in items[0]}
+
+    return collate
+
+
+def word_windows(size: int, overlap: int):
+    """size 토큰 창을 size - overlap씩 옮기는 창 나누기. (유지 구간은 창 사이 중간에서 자름)"""
+
+    def windower(offsets, text_len: int) -> List[Tuple[int, int, int, int]]:
+        n, step = len(offsets), size - overlap
+        starts = list(range(0, max(1, n - overlap), step))
+        windows = []
+        for k, start in enumerate(starts):
+            end = min(n, start + size)
+            keep_start = 0 if k == 0 else offsets[start + overlap // 2][0]
+            keep_end = text_len if k == len(starts) - 1 else offsets[starts[k + 1] + overlap // 2][0]
+            windows.append((start, end, keep_start, keep_end))
+        return windows
+
+    return windower
+
+
+def make_text(words: int, every: int = 3) -> str:
+    return " ".join(f"PII{i}" if i % every == 0 else f"w{i}" for i in range(words))
+
+
+@pytest.mark.parametrize("lengths", [[5, 50, 6, 48, 7, 200], [10] * 9, [1], []])
+def test_plan_buckets_covers_every_input_once(lengths):
+    buckets = plan_buckets(lengths, max_batch_size=4, max_padding_ratio=0.25)
+    assert sorted(i for b in buckets for i in b) == list(range(len(lengths)))
+    for bucket in buckets:
+        assert len(bucket) <= 4
+        longest = max(lengths[i] for i in bucket)
+        assert 1 - sum(lengths[i] for i in bucket) / (longest * len(bucket)) <= 0.25
+
+
+def test_plan_buckets_keeps_short_and_long_apart():
+    assert plan_buckets([5, 500, 6, 480], max_batch_size=8, max_padding_ratio=0.25) == [[0, 2], [3, 1]]
+
+
+def test_pipe_without_sanitize_parameters_runs_plainly():
+    pipe = PlainPipe()
+    texts = ["PII1 a", "b PII2 c", "none"]
+    assert LengthBucketScheduler(pipe, max_batch_size=2)(texts) == [find_pii(t) for t in texts]
+    assert pipe.calls == [(texts, 2)]
+
+
+@pytest.mark.parametrize("words", [3, 10, 31])
+def test_plain_run_with_windower_maps_back_to_the_text(words):
+    pipe = PlainPipe()
+    texts = [make_text(words), "", make_text(words + 4, every=1)]
+    scheduler = LengthBucketScheduler(pipe, max_batch_size=4, windower=word_windows(6, 2))
+    results = scheduler(texts)
+    for text, found in zip(texts, results):
+        assert [(e["start"], e["end"]) for e in found] == [(e["start"], e["end"]) for e in find_pii(text)]
+    assert len(pipe.calls) == 1 and pipe.calls[0][1] == 4
+
+
+def test_stage_parameters_are_built_once(monkeypatch):
+    monkeypatch.setattr(bucketing, "pad_collate_fn", fake_collate)
+    pipe = StagedPipe()
+    kwargs = {"aggregation_strategy": "simple"}
+    scheduler = LengthBucketScheduler(pipe, max_batch_size=2, max_padding_ratio=0.5, pipeline_kwargs=kwargs)
+    texts = ["PII1 a", make_text(30), "b PII2", make_text(28)]
+    for _ in range(2):
+        assert scheduler(texts) == [find_pii(t) for t in texts]
+    assert pipe.sanitized == [kwargs]
+    assert pipe.calls == []  # 파이프라인 전체 호출 없이 단계별로 실행
+    expected = {"preprocess": {"pre": kwargs}, "forward": {"fwd": kwargs}, "postprocess": {"post": kwargs}}
+    assert all(params == expected[stage] for stage, params in pipe.stage_params)
+    assert pipe.forward_sizes == [2, 2, 2, 2]  # 짧은 것끼리, 긴 것끼리
+    stats = scheduler.stats()
+    assert stats["batches"] == 4 and stats["sequences"] == 8
+
+
+def test_without_collate_function_falls_back(monkeypatch):
+    # torch/transformers가 없으면 단계별 실행 대신 pipe(texts)로 실행
+    monkeypatch.setattr(bucketing, "pad_collate_fn", None)
+    pipe = StagedPipe()
+    assert LengthBucketScheduler(pipe)(["PII1"]) == [find_pii("PII1")]
+    assert pipe.sanitized == [] and pipe.calls == [(["PII1"], 1)]
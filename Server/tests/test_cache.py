@@ -0,0 +1,318 @@
+"""`LRUCache`, PDF 추출 캐시(메모리 → 디스크), 마스킹 결과 캐시를 확인합니다.
+
+PDF 추출은 `iter_pdf_pages`를, 마스킹은 탐지 단계(`_detect`)를 가짜로 바꿔
+호출 횟수로 캐시 적중 여부를 봅니다.
+
+실행 예 (저장소 루트에서):
+    python -m pytest -q Server/tests
+"""
+
+import io
+import os
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from Server import config
+from Server.services import masking_service, pdf_service
+from Server.utils import cache as cache_module
+from Server.utils.cache import LRUCache
+
+
+# ---------------------------------------------------------------------------
+# LRUCache
+
+
+def test_entry_limit_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # b가 가장 오래 안 쓴 항목이 됨
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_limit_evicts_until_total_fits():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.put("a", "xxxx")
+    cache.put("b", "yyyy")
+    cache.put("c", "zzzzzz")  # 4 + 4 + 6 > 10 → a 제거
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 10 and len(cache) == 2
+    cache.put("b", "y")  # 같은 키를 다시 넣으면 이전 크기를 빼고 계산
+    assert cache.stats()["bytes"] == 7
+    cache.put("d", "w" * 4)
+    assert len(cache) == 2 and cache.get("c") is None and cache.get("d") == "wwww"
+
+
+def test_value_larger_than_byte_limit_is_not_stored():
+    cache = LRUCache(max_bytes=4, sizeof=len)
+    cache.put("a", "xx")
+    cache.put("big", "x" * 5)
+    assert cache.get("big") is None and cache.get("a") == "xx"
+
+
+def test_ttl_expires_entries(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    cache = LRUCache(ttl=10)
+    cache.put("a", 1)
+    clock.now = 109.9
+    assert cache.get("a") == 1
+    clock.now = 110.0
+    assert cache.get("a") is None
+    assert len(cache) == 0 and cache.stats()["expirations"] == 1
+    cache.put("a", 2)  # 다시 넣으면 만료 시각도 새로 계산
+    clock.now = 115.0
+    assert cache.get("a") == 2
+
+
+def test_stats_and_clear():
+    cache = LRUCache(max_entries=4, max_bytes=100, sizeof=len)
+    cache.put("a", "xx")
+    cache.get("a")
+    cache.get("missing")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"], stats["entries"], stats["bytes"]) == (1, 1, 0.5, 1, 2)
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["bytes"] == 0
+
+
+# ---------------------------------------------------------------------------
+# PDF 추출 캐시
+
+
+class FakePages:
+    """페이지 텍스트를 돌려주며 호출 횟수를 세는 `iter_pdf_pages` 대용."""
+
+    def __init__(self, pages: List[str]) -> None:
+        self.pages = pages
+        self.calls = 0
+
+    def __call__(self, pdf_bytes_io):
+        self.calls += 1
+        return iter(self.pages)
+
+
+@pytest.fixture
+def pdf_cache(monkeypatch, tmp_path):
+    """메모리/디스크 캐시를 비운 상태로 시작하고, configure()로 디스크 캐시 설정을 바꿉니다."""
+
+    def configure(cache_dir: str = "", allow_plaintext: bool = True, max_bytes: int = 10**9, ttl: float = 3600):
+        monkeypatch.setattr(pdf_service, "PDF_CACHE_DIR", cache_dir)
+        monkeypatch.setattr(pdf_service, "PDF_CACHE_DISK_ALLOW_PLAINTEXT", allow_plaintext)
+        monkeypatch.setattr(pdf_service, "PDF_CACHE_DISK_MAX_BYTES", max_bytes)
+        monkeypatch.setattr(pdf_service, "PDF_CACHE_DISK_TTL", ttl)
+        pdf_service._disk_enabled.cache_clear()
+
+    def reset() -> None:
+        pdf_service._get_text_cache.cache_clear()
+        pdf_service._disk_enabled.cache_clear()
+        pdf_service._disk_usage["bytes"] = None
+
+    reset()
+    configure()
+    yield configure
+    reset()
+
+
+def use_pages(monkeypatch, pages: List[str]) -> FakePages:
+    fake = FakePages(pages)
+    monkeypatch.setattr(pdf_service, "iter_pdf_pages", fake)
+    return fake
+
+
+def extract(data: bytes) -> str:
+    return pdf_service.extract_text_from_pdf(io.BytesIO(data))
+
+
+def disk_files(root) -> List[str]:
+    return sorted(str(p) for p in root.rglob("*.txt"))
+
+
+def test_same_bytes_hit_the_memory_cache(monkeypatch, pdf_cache):
+    fake = use_pages(monkeypatch, ["1쪽", "", "3쪽"])
+    assert extract(b"pdf-a") == "1쪽\n3쪽"
+    assert extract(b"pdf-a") == "1쪽\n3쪽"
+    assert fake.calls == 1
+    extract(b"pdf-b")
+    assert fake.calls == 2
+
+
+def test_empty_text_is_not_cached(monkeypatch, pdf_cache, tmp_path):
+    pdf_cache(str(tmp_path))
+    fake = use_pages(monkeypatch, ["", ""])
+    assert extract(b"scan") == ""
+    assert extract(b"scan") == ""
+    assert fake.calls == 2
+    assert disk_files(tmp_path) == []
+
+
+def test_use_cache_false_always_extracts(monkeypatch, pdf_cache):
+    fake = use_pages(monkeypatch, ["본문"])
+    for _ in range(2):
+        assert pdf_service.extract_text_from_pdf(io.BytesIO(b"pdf"), use_cache=False) == "본문"
+    assert fake.calls == 2
+
+
+def test_disk_tier_survives_a_cleared_memory_cache(monkeypatch, pdf_cache, tmp_path):
+    pdf_cache(str(tmp_path))
+    fake = use_pages(monkeypatch, ["본문"])
+    assert extract(b"pdf") == "본문"
+    (path,) = disk_files(tmp_path)
+    assert os.path.basename(path).startswith(os.path.basename(os.path.dirname(path)))
+
+    pdf_service._get_text_cache.cache_clear()  # 재시작 흉내
+    assert extract(b"pdf") == "본문"
+    assert fake.calls == 1
+    assert pdf_service.get_pdf_cache_stats()["disk_hits"] >= 1
+
+
+def test_disk_tier_needs_plaintext_opt_in(monkeypatch, pdf_cache, tmp_path):
+    pdf_cache(str(tmp_path), allow_plaintext=False)
+    use_pages(monkeypatch, ["본문"])
+    extract(b"pdf")
+    assert disk_files(tmp_path) == []
+
+
+def test_expired_disk_entry_is_extracted_again(monkeypatch, pdf_cache, tmp_path):
+    pdf_cache(str(tmp_path), ttl=60)
+    fake = use_pages(monkeypatch, ["본문"])
+    extract(b"pdf")
+    (path,) = disk_files(tmp_path)
+    old = time.time() - 120
+    os.utime(path, (old, old))
+
+    pdf_service._get_text_cache.cache_clear()
+    assert extract(b"pdf") == "본문"
+    assert fake.calls == 2
+    assert os.path.getmtime(path) > old  # 다시 저장됨
+
+
+def test_disk_tier_evicts_least_recently_used_over_the_limit(monkeypatch, pdf_cache, tmp_path):
+    pdf_cache(str(tmp_path), max_bytes=25)
+    use_pages(monkeypatch, ["0123456789"])
+    extract(b"first")
+    extract(b"second")
+    first, second = (pdf_service._disk_path(pdf_service.hashlib.sha256(d).hexdigest()) for d in (b"first", b"second"))
+    old = time.time() - 100
+    os.utime(second, (old, old))  # second를 가장 오래 안 쓴 파일로
+    extract(b"third")  # 30바이트 > 25 → 90%(22.5바이트) 이하가 될 때까지 오래된 것부터 삭제
+    remaining = disk_files(tmp_path)
+    assert second not in remaining and first in remaining
+    assert len(remaining) == 2
+    assert pdf_service.get_pdf_cache_stats()["disk_evictions"] >= 1
+
+
+# ---------------------------------------------------------------------------
+# 마스킹 결과 캐시
+
+
+class FakeDetect:
+    """`_detect` 대용. 호출 횟수를 세고 status를 탐지기 상태로 돌려줍니다."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.status = "ok"
+
+    def __call__(self, text: str, active) -> Any:
+        self.calls += 1
+        return [], {"numeric_ner": {"status": "disabled", "ms": 0.0}, "presidio": {"status": self.status, "ms": 1.0}}
+
+
+@pytest.fixture
+def mask_cache(monkeypatch):
+    """결과 캐시를 켜고(모델 경로는 _detect를 가짜로) 빈 캐시로 시작합니다."""
+    monkeypatch.setattr(masking_service, "MASK_CACHE_SIZE", 8)
+    monkeypatch.setattr(masking_service, "MASK_CACHE_MAX_CHARS", 100)
+    monkeypatch.setattr(config, "DISABLE_LOCAL_NER", True)
+    monkeypatch.setattr(config, "DISABLE_PRESIDIO", False)
+    monkeypatch.setattr(config, "RULE_ENGINE", "presidio")
+    fake = FakeDetect()
+    monkeypatch.setattr(masking_service, "_detect", fake)
+    masking_service._get_result_cache.cache_clear()
+    yield fake
+    masking_service._get_result_cache.cache_clear()
+
+
+def mask(text: str = "본문", fusion_mode=None) -> Dict[str, Any]:
+    timings: Dict[str, Any] = {}
+    masking_service.mask_text_with_models(text, timings, fusion_mode)
+    return timings
+
+
+def test_repeated_text_hits_the_cache(mask_cache):
+    assert "cache" not in mask()
+    assert mask()["cache"]["status"] == "hit"
+    assert mask_cache.calls == 1
+    mask("다른 본문")
+    assert mask_cache.calls == 2
+
+
+def test_cached_entities_are_copies(mask_cache, monkeypatch):
+    monkeypatch.setattr(config, "RULE_ENGINE", "compact")
+    _, entities = masking_service.mask_text_with_models("주민번호 900101-1234567")
+    entities[0]["label"] = "변경됨"
+    _, again = masking_service.mask_text_with_models("주민번호 900101-1234567")
+    assert again[0]["label"] != "변경됨"
+
+
+def test_timed_out_result_is_not_cached(mask_cache):
+    mask_cache.status = "timeout"
+    mask()
+    mask()
+    assert mask_cache.calls == 2
+    mask_cache.status = "ok"
+    mask()
+    assert mask()["cache"]["status"] == "hit"
+    assert mask_cache.calls == 3
+
+
+def test_long_text_and_disabled_cache_are_not_cached(mask_cache, monkeypatch):
+    mask("x" * 101)
+    mask("x" * 101)
+    assert mask_cache.calls == 2
+    monkeypatch.setattr(masking_service, "MASK_CACHE_SIZE", 0)
+    mask()
+    mask()
+    assert mask_cache.calls == 4
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        ("PRESIDIO_MODE", "single_pass"),
+        ("NER_BACKEND", "onnx"),
+        ("NER_QUANTIZE", "int8"),
+        ("NUMERIC_MODEL_PATH", "other/model"),
+        ("DEFAULT_LOCALE", "en"),
+        ("FUSION_MODE", "weighted"),
+    ],
+)
+def test_config_change_changes_the_cache_key(mask_cache, monkeypatch, name, value):
+    mask()
+    assert getattr(config, name) != value
+    monkeypatch.setattr(config, name, value)
+    assert "cache" not in mask()
+    assert mask_cache.calls == 2
+    assert mask()["cache"]["status"] == "hit"
+
+
+def test_rule_engine_change_changes_the_cache_key(mask_cache, monkeypatch):
+    mask("본문")
+    monkeypatch.setattr(config, "RULE_ENGINE", "compact")  # 압축 경로는 _detect를 거치지 않음
+    assert "cache" not in mask("본문")
+    monkeypatch.setattr(config, "RULE_ENGINE", "presidio")
+    assert mask("본문")["cache"]["status"] == "hit"
+    assert mask_cache.calls == 1
+
+
+def test_request_fusion_mode_is_part_of_the_key(mask_cache):
+    mask(fusion_mode="greedy")
+    assert "cache" not in mask(fusion_mode="weighted")
+    assert mask(fusion_mode="weighted")["cache"]["status"] == "hit"
+    assert mask_cache.calls == 2
@@ -0,0 +1,175 @@
+"""`contained_indices`/`fuse_and_resolve`(정렬 후 1회 스캔)가 이중 루프 기준 구현과 같은지,
+weighted 모드(`_weighted_indices`)가 전수 탐색 최적해와 같은 가중치 합을 내는지 확인합니다.
+
+좌표 범위를 좁게 잡은 시드 고정 무작위 구간 집합에 같은 범위/같은 시작 구간을 일부러 섞어 비교합니다.
+
+실행 예 (저장소 루트에서):
+    python -m pytest -q Server/tests
+"""
+
+import random
+from itertools import combinations
+from typing import List, Sequence, Set
+
+import pytest
+
+from Server.nlp.fusion import (
+    FUSION_MODE_WEIGHTED,
+    RULE_SOURCES,
+    _has_conflict,
+    _longer_first_key,
+    _weight,
+    _weighted_indices,
+    contained_indices,
+    fuse_and_resolve,
+)
+from Server.nlp.spans import Span
+
+_SOURCES = ("NumericRecognizer", "TextRecognizer") + RULE_SOURCES
+
+
+def reference_contained(spans: List[Span], candidates) -> Set[int]:
+    """이중 루프 기준: 다른 결과가 자신을 완전히 덮으면(같은 범위 포함) 포함됨."""
+    discard = set()
+    for i in candidates:
+        a = spans[i]
+        for j, b in enumerate(spans):
+            if i != j and b.start <= a.start and b.end >= a.end:
+                discard.add(i)
+                break
+    return discard
+
+
+def reference_fuse_and_resolve(results_local: List[Span], results_rules: List[Span]) -> List[Span]:
+    """변경 전 O(n²) 구현."""
+    combined = list(results_local) + list(results_rules)
+    discard = reference_contained(combined, [i for i, r in enumerate(combined) if r.source in RULE_SOURCES])
+    filtered = sorted((r for i, r in enumerate(combined) if i not in discard), key=_longer_first_key)
+    final: List[Span] = []
+    last_end = -1
+    for r in filtered:
+        if r.start >= last_end:
+            final.append(r)
+            last_end = r.end
+    return final
+
+
+def brute_force_best_weight(spans: Sequence[Span]) -> float:
+    """겹치지 않는 모든 부분집합 중 가중치 합의 최댓값. (전수 탐색)"""
+    best = 0.0
+    for size in range(1, len(spans) + 1):
+        for subset in combinations(spans, size):
+            if any(_has_conflict(a, b) for a, b in combinations(subset, 2)):
+                continue
+            best = max(best, sum(_weight(s) for s in subset))
+    return best
+
+
+def random_spans(rng: random.Random) -> List[Span]:
+    """좁은 좌표 범위의 무작위 구간. 일부는 기존 구간과 같은 범위/같은 시작으로 만듭니다.
+
+    entity_type에 일련번호를 넣어 결과 비교 시 항목을 구분합니다.
+    """
+    text_len, max_len = rng.randint(1, 40), rng.randint(1, 10)
+    spans: List[Span] = []
+    for k in range(rng.randint(0, 30)):
+        source = rng.choice(_SOURCES)
+        roll = rng.random()
+        if spans and roll < 0.2:
+            base = rng.choice(spans)
+            start, end = base.start, base.end  # 같은 범위
+        elif spans and roll < 0.4:
+            start = rng.choice(spans).start  # 같은 시작, 다른 끝
+            end = start + rng.randint(1, max_len)
+        else:
+            start = rng.randrange(text_len)
+            end = start + rng.randint(1, max_len)
+        spans.append(Span(f"X{k}", start, end, 1.0, source))
+    return spans
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_contained_indices_matches_nested_loop(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        spans = random_spans(rng)
+        candidates = [i for i in range(len(spans)) if rng.random() < 0.7]
+        assert contained_indices(spans, candidates) == reference_contained(spans, candidates), spans
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_fuse_and_resolve_matches_nested_loop(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        spans = random_spans(rng)
+        split = rng.randint(0, len(spans))
+        local, rules = spans[:split], spans[split:]
+        expected = [r.entity_type for r in reference_fuse_and_resolve(local, rules)]
+        assert [r.entity_type for r in fuse_and_resolve(local, rules)] == expected, spans
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_weighted_indices_matches_brute_force(seed):
+    rng = random.Random(seed)
+    for _ in range(300):
+        spans = [s._replace(score=rng.choice((0.5, 0.8, 1.0))) for s in random_spans(rng)[:10]]
+        starts, ends = [s.start for s in spans], [s.end for s in spans]
+        selected = _weighted_indices(starts, ends, [_weight(s) for s in spans], range(len(spans)))
+        chosen = [spans[i] for i in selected]
+        assert selected == sorted(selected, key=lambda i: starts[i]), spans
+        assert not any(_has_conflict(a, b) for a, b in combinations(chosen, 2)), spans
+        assert sum(_weight(s) for s in chosen) == pytest.approx(brute_force_best_weight(spans)), spans
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_weighted_fuse_is_optimal_after_containment(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        spans = random_spans(rng)[:10]
+        split = rng.randint(0, len(spans))
+        local, rules = spans[:split], spans[split:]
+        chosen = fuse_and_resolve(local, rules, mode=FUSION_MODE_WEIGHTED)
+        # 포함 제거 단계는 greedy와 같으므로 남은 결과 중 최적이어야 함
+        discard = reference_contained(spans, [i for i, r in enumerate(spans) if r.source in RULE_SOURCES])
+        kept = [r for i, r in enumerate(spans) if i not in discard]
+        assert set(chosen) <= set(kept), spans
+        assert sum(_weight(s) for s in chosen) == pytest.approx(brute_force_best_weight(kept)), spans
+
+
+def test_weighted_priority_beats_earlier_start():
+    # greedy는 먼저 시작하는 Presidio 결과를 고르지만, weighted는 우선순위가 높은 Numeric 결과를 고름
+    presidio = Span("P", 0, 8, 1.0, "Presidio")  # 1 × 1.0 × 8 = 8
+    numeric = Span("N", 4, 10, 1.0, "NumericRecognizer")  # 3 × 1.0 × 6 = 18
+    assert fuse_and_resolve([numeric], [presidio]) == [presidio]
+    assert fuse_and_resolve([numeric], [presidio], mode=FUSION_MODE_WEIGHTED) == [numeric]
+    # 같은 구간이 Presidio 결과라면(1 × 6 = 6) 더 긴 앞쪽 결과가 남음
+    other = numeric._replace(source="Presidio")
+    assert fuse_and_resolve([], [presidio, other], mode=FUSION_MODE_WEIGHTED) == [presidio]
+
+
+def test_weighted_text_over_presidio_with_two_neighbours():
+    # Text 하나(2 × 10 = 20)가 양옆에 걸친 Presidio 두 개(6 + 6 = 12)보다 우선
+    left = Span("L", 0, 6, 1.0, "Presidio")
+    text = Span("T", 4, 14, 1.0, "TextRecognizer")
+    right = Span("R", 12, 18, 1.0, "Presidio")
+    assert fuse_and_resolve([text], [left, right]) == [left, right]
+    assert fuse_and_resolve([text], [left, right], mode=FUSION_MODE_WEIGHTED) == [text]
+
+
+def test_equal_ranges_contain_each_other():
+    spans = [Span("A", 3, 8, 1.0, "SSMRecognizer"), Span("B", 3, 8, 1.0, "AccountNumberRecognizer")]
+    assert contained_indices(spans, [0, 1]) == {0, 1}
+    # 같은 범위의 모델 결과가 있으면 규칙 결과만 제거됨
+    spans = [Span("A", 3, 8, 1.0, "SSMRecognizer"), Span("N", 3, 8, 0.9, "NumericRecognizer")]
+    assert [r.entity_type for r in fuse_and_resolve(spans[1:], spans[:1])] == ["N"]
+
+
+def test_shared_start_keeps_longest():
+    spans = [Span("S", 0, 4, 1.0, "CvcRecognizer"), Span("L", 0, 9, 1.0, "AccountNumberRecognizer")]
+    assert contained_indices(spans, [0, 1]) == {0}
+    assert [r.entity_type for r in fuse_and_resolve([], spans)] == ["L"]
+
+
+def test_empty_inputs():
+    assert contained_indices([], []) == set()
+    assert fuse_and_resolve([], []) == []
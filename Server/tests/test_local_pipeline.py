@@ -0,0 +1,143 @@
+"""긴 입력의 토큰 창 나누기(`_plan_windows`/`_window_spans`/`_run_windowed`)를 확인합니다.
+
+단어 단위 가짜 토크나이저의 오프셋으로 창을 나누고, 가짜 모델이 창마다 찾은 개체가
+원문 기준 위치로 정확히 한 번씩 돌아오는지(창 경계/겹친 구간 포함) 봅니다.
+
+실행 예 (저장소 루트에서):
+    python -m pytest -q Server/tests
+"""
+
+import re
+from typing import List
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from Server.nlp import local_pipeline  # noqa: E402
+from Server.nlp.local_pipeline import _plan_windows, _run_windowed, _window_spans  # noqa: E402
+from Server.nlp.spans import Span  # noqa: E402
+
+_WORD = re.compile(r"\S+")
+_PII = re.compile(r"PII\d+")
+
+
+class FakeTokenizer:
+    """공백으로 나눈 단어 하나를 토큰 하나로 보는 토크나이저."""
+
+    def __init__(self, model_max_length: int = 10**30) -> None:
+        self.model_max_length = model_max_length
+        self.calls = 0
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=True, verbose=False):
+        self.calls += 1
+        return {"offset_mapping": [m.span() for m in _WORD.finditer(text)]}
+
+
+def fake_model(texts: List[str]) -> List[List[Span]]:
+    """창 텍스트에서 PII<n> 단어를 창 기준 위치로 찾는 가짜 모델."""
+    return [[Span("PN", m.start(), m.end(), 1.0, "NumericRecognizer") for m in _PII.finditer(t)] for t in texts]
+
+
+def make_text(words: int, every: int = 3) -> str:
+    return " ".join(f"PII{i}" if i % every == 0 else f"w{i}" for i in range(words))
+
+
+def offsets_of(text: str):
+    return [m.span() for m in _WORD.finditer(text)]
+
+
+@pytest.fixture
+def chunking(monkeypatch):
+    def configure(size: int, stride: int) -> None:
+        monkeypatch.setattr(local_pipeline, "NER_CHUNK_SIZE", size)
+        monkeypatch.setattr(local_pipeline, "NER_CHUNK_STRIDE", stride)
+
+    return configure
+
+
+def test_short_input_is_one_window(chunking):
+    chunking(10, 3)
+    text = make_text(10)
+    assert _plan_windows(offsets_of(text), len(text), 10) == [(0, 10, 0, len(text))]
+
+
+@pytest.mark.parametrize("stride, advance", [(0, 10), (3, 7), (5, 5), (9, 5), (1000, 5)])
+def test_stride_is_capped_at_half_the_window(chunking, stride, advance):
+    chunking(10, stride)
+    text = make_text(47)
+    windows = _plan_windows(offsets_of(text), len(text), 10)
+    starts = [s for s, _, _, _ in windows]
+    assert all(b - a == advance for a, b in zip(starts, starts[1:]))
+    assert all(e - s <= 10 for s, e, _, _ in windows)
+    assert windows[-1][1] == 47
+
+
+@pytest.mark.parametrize("stride", [0, 1, 3, 5, 1000])
+@pytest.mark.parametrize("words", [11, 20, 47, 103])
+def test_keep_ranges_tile_the_text_inside_their_windows(chunking, stride, words):
+    chunking(10, stride)
+    text = make_text(words)
+    offsets = offsets_of(text)
+    windows = _plan_windows(offsets, len(text), 10)
+    assert windows[0][2] == 0 and windows[-1][3] == len(text)
+    for (_, _, _, prev_end), (_, _, next_start, _) in zip(windows, windows[1:]):
+        assert prev_end == next_start
+    for s, e, keep_start, keep_end in windows:
+        # 유지 구간에서 시작하는 토큰은 모두 이 창 안에 있어야 함
+        kept = [i for i, (start, _) in enumerate(offsets) if keep_start <= start < keep_end]
+        assert kept and s <= kept[0] and kept[-1] < e
+
+
+def test_window_spans_use_token_offsets(chunking):
+    chunking(10, 3)
+    text = "  " + make_text(30) + "  "
+    offsets = offsets_of(text)
+    spans = _window_spans(FakeTokenizer(), text)
+    assert len(spans) == len(_plan_windows(offsets, len(text), 10))
+    assert spans[0][0] == 0 and spans[-1][1] == len(text)
+    for (cs, ce, _, _), (s, e, _, _) in zip(spans[1:-1], _plan_windows(offsets, len(text), 10)[1:-1]):
+        assert (cs, ce) == (offsets[s][0], offsets[e - 1][1])
+
+
+def test_window_spans_skip_tokenizing_short_text(chunking):
+    chunking(10, 3)
+    tokenizer = FakeTokenizer()
+    assert _window_spans(tokenizer, "PII0 w1") == [(0, 7, 0, 7)]
+    assert tokenizer.calls == 0
+
+
+def test_chunk_size_is_limited_by_model_max_length(chunking):
+    chunking(510, 3)
+    text = make_text(40)
+    spans = _window_spans(FakeTokenizer(model_max_length=12), text)
+    assert len(spans) > 1  # 창 크기 10 (12 - [CLS]/[SEP])
+
+
+@pytest.mark.parametrize("stride", [0, 1, 3, 5, 1000])
+@pytest.mark.parametrize("words, every", [(10, 3), (47, 3), (103, 1), (103, 4)])
+def test_run_windowed_maps_back_and_dedupes(chunking, stride, words, every):
+    chunking(10, stride)
+    texts = [make_text(words, every), "짧은 입력 PII7", make_text(words + 5, every)]
+    results = _run_windowed(texts, FakeTokenizer(), fake_model)
+    for text, found in zip(texts, results):
+        expected = [(m.start(), m.end()) for m in _PII.finditer(text)]
+        assert sorted((s.start, s.end) for s in found) == expected
+        assert all(text[s.start : s.end].startswith("PII") for s in found)
+
+
+def test_shutdown_numeric_batcher_closes_and_resets(monkeypatch):
+    monkeypatch.setattr(local_pipeline, "_numeric_batch", lambda texts: [[] for _ in texts])
+    local_pipeline._get_numeric_batcher.cache_clear()
+    local_pipeline.shutdown_numeric_batcher()  # 만든 적이 없어도 됨
+    assert local_pipeline._get_numeric_batcher.cache_info().currsize == 0
+
+    batcher = local_pipeline._get_numeric_batcher()
+    assert batcher.submit("x").result(timeout=5) == []
+    local_pipeline.shutdown_numeric_batcher()
+    assert not batcher._thread.is_alive()
+    with pytest.raises(RuntimeError):
+        batcher.submit("late")
+    assert local_pipeline._get_numeric_batcher() is not batcher
+    local_pipeline.shutdown_numeric_batcher()
@@ -0,0 +1,113 @@
+"""메트릭 레지스트리의 멀티 프로세스 합산과 종료된 워커 처리(`mark_process_dead`)를 확인합니다.
+
+워커 스냅샷 파일(<pid>.json)은 별도 레지스트리의 `snapshot()`으로 만들어 공유 디렉터리에 씁니다.
+
+실행 예 (저장소 루트에서):
+    python -m pytest -q Server/tests
+"""
+
+import json
+import os
+import threading
+
+import pytest
+
+from Server.utils.metrics import MetricsRegistry, _Metric, mark_process_dead
+
+
+def worker_snapshot(requests: float, latency: float, in_flight: float = 2.0):
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "요청 수", ("endpoint",)).inc(requests, endpoint="masking")
+    registry.histogram("latency_seconds", "지연 시간", buckets=(0.1, 1.0)).observe(latency)
+    registry.register_collector(
+        lambda: [
+            ("in_flight", "gauge", "진행 중 요청 수", [({"worker": "w"}, in_flight)]),
+            ("cache_hits_total", "counter", "캐시 적중 수", [({"cache": "mask"}, requests)]),
+        ]
+    )
+    return registry.snapshot()
+
+
+def write_worker(directory, pid: int, *args) -> None:
+    with open(os.path.join(directory, f"{pid}.json"), "w", encoding="utf-8") as f:
+        json.dump(worker_snapshot(*args), f)
+
+
+def rendered(directory) -> str:
+    registry = MetricsRegistry()
+    registry.configure_multiprocess(str(directory))
+    return registry.render()
+
+
+def snapshot_files(directory):
+    """읽는 쪽(이 프로세스)이 render()에서 쓴 스냅샷을 뺀 파일 이름."""
+    return sorted(p.name for p in directory.glob("*.json") if p.name != f"{os.getpid()}.json")
+
+
+def value(text: str, prefix: str) -> float:
+    (line,) = [line for line in text.splitlines() if line.startswith(prefix + " ")]
+    return float(line.rsplit(" ", 1)[1])
+
+
+def test_live_workers_are_summed(tmp_path):
+    write_worker(tmp_path, 101, 3, 0.05)
+    write_worker(tmp_path, 102, 4, 0.5)
+    text = rendered(tmp_path)
+    assert value(text, 'requests_total{endpoint="masking"}') == 7
+    assert value(text, 'latency_seconds_bucket{le="0.1"}') == 1
+    assert value(text, 'latency_seconds_bucket{le="1"}') == 2
+    assert value(text, 'in_flight{worker="w"}') == 4
+
+
+def test_dead_workers_are_folded_into_one_file(tmp_path):
+    for pid in range(101, 106):
+        write_worker(tmp_path, pid, pid - 100, 0.05)
+    before = rendered(tmp_path)
+    for pid in range(101, 105):
+        mark_process_dead(str(tmp_path), pid)
+
+    assert snapshot_files(tmp_path) == ["105.json", "dead.json"]
+    after = rendered(tmp_path)
+    for prefix in (
+        'requests_total{endpoint="masking"}',
+        'cache_hits_total{cache="mask"}',
+        'latency_seconds_bucket{le="0.1"}',
+        "latency_seconds_count",
+        "latency_seconds_sum",
+    ):
+        assert value(after, prefix) == pytest.approx(value(before, prefix))
+    assert value(after, 'in_flight{worker="w"}') == 2  # 살아 있는 워커(105)의 게이지만 남음
+
+
+def test_dead_file_keeps_no_gauges(tmp_path):
+    write_worker(tmp_path, 101, 1, 0.05)
+    mark_process_dead(str(tmp_path), 101)
+    with open(tmp_path / "dead.json", encoding="utf-8") as f:
+        dead = json.load(f)
+    assert [family[0] for family in dead["families"]] == ["cache_hits_total"]
+    assert "in_flight" not in rendered(tmp_path)
+
+
+def test_missing_or_broken_snapshot_is_ignored(tmp_path):
+    mark_process_dead(str(tmp_path), 999)
+    (tmp_path / "998.json").write_text("{broken", encoding="utf-8")
+    mark_process_dead(str(tmp_path), 998)
+    assert not (tmp_path / "dead.json").exists()
+
+
+def test_concurrent_deaths_are_all_counted(tmp_path):
+    pids = list(range(200, 216))
+    for pid in pids:
+        write_worker(tmp_path, pid, 1, 0.05)
+    threads = [threading.Thread(target=mark_process_dead, args=(str(tmp_path), pid)) for pid in pids]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert snapshot_files(tmp_path) == ["dead.json"]
+    assert value(rendered(tmp_path), 'requests_total{endpoint="masking"}') == len(pids)
+
+
+def test_metric_base_needs_samples():
+    with pytest.raises(TypeError):
+        _Metric("base", "샘플 없는 메트릭")  # type: ignore[abstract]
@@ -0,0 +1,59 @@
+"""ONNX 모델 폴더 위치(`onnx_dir_for`)를 확인합니다.
+
+모델 경로가 로컬 폴더일 때, HF 허브 id일 때(가짜 huggingface_hub로 캐시 스냅샷 흉내),
+ONNX_MODEL_DIR를 지정했을 때를 봅니다.
+
+실행 예 (저장소 루트에서):
+    python -m pytest -q Server/tests
+"""
+
+import os
+import sys
+import types
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from Server.nlp import onnx_backend  # noqa: E402
+from Server.nlp.onnx_backend import onnx_dir_for  # noqa: E402
+
+
+@pytest.fixture
+def fake_hub(monkeypatch, tmp_path):
+    """캐시에 있는 허브 id만 스냅샷 폴더를 돌려주는 huggingface_hub 대용."""
+    cached = {"org/numeric-ner": str(tmp_path / "snapshots" / "abc123")}
+    calls = []
+
+    def snapshot_download(repo_id, local_files_only=False):
+        calls.append((repo_id, local_files_only))
+        if repo_id not in cached:
+            raise OSError(f"{repo_id} not in cache")
+        return cached[repo_id]
+
+    monkeypatch.setitem(sys.modules, "huggingface_hub", types.SimpleNamespace(snapshot_download=snapshot_download))
+    monkeypatch.setattr(onnx_backend, "ONNX_MODEL_DIR", "")
+    return cached, calls
+
+
+def test_local_model_dir(fake_hub, tmp_path):
+    assert onnx_dir_for(str(tmp_path)) == os.path.join(str(tmp_path), "onnx")
+    assert fake_hub[1] == []
+
+
+def test_hub_id_resolves_to_the_cached_snapshot(fake_hub):
+    cached, calls = fake_hub
+    assert onnx_dir_for("org/numeric-ner") == os.path.join(cached["org/numeric-ner"], "onnx")
+    assert calls == [("org/numeric-ner", True)]  # 네트워크 없이 캐시에서만
+
+
+def test_uncached_hub_id_asks_for_onnx_model_dir(fake_hub):
+    with pytest.raises(FileNotFoundError, match="ONNX_MODEL_DIR"):
+        onnx_dir_for("org/unknown")
+
+
+def test_onnx_model_dir_wins(fake_hub, monkeypatch, tmp_path):
+    monkeypatch.setattr(onnx_backend, "ONNX_MODEL_DIR", str(tmp_path / "onnx-models"))
+    assert onnx_dir_for("org/unknown") == os.path.join(str(tmp_path / "onnx-models"), "unknown")
+    assert fake_hub[1] == []
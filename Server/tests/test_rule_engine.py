@@ -0,0 +1,91 @@
+"""규칙 전용 압축 스캐너(`scan_compact`)의 검증 함수/재시도 경로와 압축 배열 치환(`_mask_compact`)을 확인합니다.
+
+실행 예 (저장소 루트에서):
+    python -m pytest -q Server/tests
+"""
+
+from typing import List, Tuple
+
+import pytest
+
+from Server.bench.common import make_text
+from Server.nlp.fusion import FUSION_MODES, resolve_indices
+from Server.nlp.rule_engine import KIND_ENTITY, KIND_SCORE, _iban_ok, _luhn_ok, scan_compact
+from Server.services.masking_service import _mask_compact, _mask_from_results
+
+
+def found(text: str) -> List[Tuple[str, str]]:
+    """(라벨, 원문) 목록 (시작 위치 순)."""
+    matches = scan_compact(text)
+    return [(KIND_ENTITY[k], text[s:e]) for s, e, k in zip(matches.starts, matches.ends, matches.kinds)]
+
+
+def test_luhn():
+    assert _luhn_ok("4111 1111 1111 1111")
+    assert _luhn_ok("4111-1111-1111-1111")
+    assert not _luhn_ok("4111-1111-1111-1112")
+
+
+def test_iban_mod97():
+    assert _iban_ok("GB82 WEST 1234 5698 7654 32")
+    assert _iban_ok("gb82west12345698765432")
+    assert not _iban_ok("GB82 WEST 1234 5698 7654 33")
+    assert not _iban_ok("GB82 WEST 12")  # 15자 미만
+
+
+def test_valid_card_is_credit_card():
+    assert found("카드 4111 1111 1111 1111 결제") == [("CREDIT_CARD", "4111 1111 1111 1111")]
+
+
+def test_luhn_invalid_card_falls_through_to_account():
+    # 같은 위치에서 뒤쪽 패턴(계좌번호)을 다시 시도
+    assert found("카드 4111-1111-1111-1112 결제") == [("AN", "4111-1111-1111")]
+
+
+def test_bad_iban_is_rejected():
+    assert found("IBAN GB82 WEST 1234 5698 7654 32") == [("IBAN_CODE", "GB82 WEST 1234 5698 7654 32")]
+    assert found("IBAN GB82 WEST 1234 5698 7654 33") == []
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("연락처 010-1234-5678 입니다", ("PHONE_NUMBER", "010-1234-5678")),
+        ("연락처 +82 10 1234 5678 입니다", ("PHONE_NUMBER", "+82 10 1234 5678")),
+        ("서버 10.0.0.255 접속", ("IP_ADDRESS", "10.0.0.255")),
+        ("서버 fe80::1:2 접속", ("IP_ADDRESS", "fe80::1:2")),
+        ("주소는 https://example.com/a?b=1. 입니다", ("URL", "https://example.com/a?b=1")),
+        ("주소는 www.example.co.kr, 입니다", ("URL", "www.example.co.kr")),
+        ("메일 hong.gildong+tag@example.co.kr 로", ("EMAIL_ADDRESS", "hong.gildong+tag@example.co.kr")),
+    ],
+)
+def test_builtin_spans(text, expected):
+    assert expected in found(text)
+
+
+def test_ip_octet_out_of_range_is_not_ip():
+    assert all(label != "IP_ADDRESS" for label, _ in found("버전 256.1.1.1"))
+
+
+def test_same_kind_does_not_overlap():
+    matches = scan_compact("123 456 7890-12-345678")
+    for kind in set(matches.kinds):
+        spans = [(s, e) for s, e, k in zip(matches.starts, matches.ends, matches.kinds) if k == kind]
+        assert all(a_end <= b_start for (_, a_end), (b_start, _) in zip(spans, spans[1:]))
+
+
+def test_empty_text():
+    assert len(scan_compact("")) == 0
+
+
+@pytest.mark.parametrize("mode", FUSION_MODES)
+@pytest.mark.parametrize("size", [0, 300, 4096])
+def test_mask_compact_matches_mask_from_results(mode, size):
+    text = make_text(size) + " 카드 4111-1111-1111-1112, 메일 a@b.io, IBAN GB82 WEST 1234 5698 7654 32"
+    matches = scan_compact(text)
+    selected = resolve_indices(matches.starts, matches.ends, matches.kinds, KIND_SCORE, mode)
+    assert selected
+    for locale in ("ko", "en"):
+        assert _mask_compact(text, matches, selected, locale) == _mask_from_results(
+            text, matches.to_spans(selected), locale
+        )
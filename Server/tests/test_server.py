@@ -0,0 +1,290 @@
+"""Flask 테스트 클라이언트로 마스킹 엔드포인트를 확인합니다.
+
+모델/Presidio 없이 돌도록 규칙 전용 압축 경로(DISABLE_LOCAL_NER=1, RULE_ENGINE=compact)로 마스킹하고,
+실행기/PDF 추출은 필요한 테스트에서만 가짜로 바꿉니다.
+
+실행 예 (저장소 루트에서):
+    python -m pytest -q Server/tests
+"""
+
+import io
+import json
+import tempfile
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List
+
+import pytest
+
+pytest.importorskip("flask")
+
+from Server import config, server  # noqa: E402
+from Server.bench.common import make_text  # noqa: E402
+from Server.services import masking_service, prompt_builder  # noqa: E402
+from Server.services.executor import ExecutorBusyError  # noqa: E402
+
+_SSN = "900101-1234567"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(config, "DISABLE_LOCAL_NER", True)
+    monkeypatch.setattr(config, "DISABLE_PRESIDIO", False)
+    monkeypatch.setattr(config, "RULE_ENGINE", "compact")
+    monkeypatch.setattr(masking_service, "MASK_CACHE_SIZE", 0)  # 캐시 없이 매번 실제로 마스킹
+    app = server.create_app(warmup=False)
+    app.testing = True
+    return app.test_client()
+
+
+class BusyExecutor:
+    def run(self, *args: Any, **kwargs: Any) -> Any:
+        raise ExecutorBusyError("busy")
+
+    def submit(self, *args: Any, **kwargs: Any) -> Any:
+        raise ExecutorBusyError("busy")
+
+
+class TimeoutExecutor:
+    def run(self, *args: Any, **kwargs: Any) -> Any:
+        raise FutureTimeoutError()
+
+
+def ndjson(response) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def pdf_form(**extra: str) -> Dict[str, Any]:
+    form = {"prompt_json": json.dumps({"question2": "본문"}), "mask_target": "prompt_pdf"}
+    form.update(extra)
+    form["pdf_file"] = (io.BytesIO(b"%PDF-1.4 fake"), "a.pdf")
+    return form
+
+
+# ---------------------------------------------------------------------------
+# /api/masking, /api/masking/batch: 실행기 대기열 초과(503)와 시간 초과(504)
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [("/api/masking", {"question2": "본문"}), ("/api/masking/batch", {"items": [{"question2": "본문"}]})],
+)
+def test_busy_executor_returns_503_with_retry_after(client, monkeypatch, path, body):
+    monkeypatch.setattr(server, "get_inference_executor", lambda: BusyExecutor())
+    response = client.post(path, json=body)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.get_json()["status"] == 503
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [("/api/masking", {"question2": "본문"}), ("/api/masking/batch", {"items": [{"question2": "본문"}]})],
+)
+def test_timed_out_inference_returns_504(client, monkeypatch, path, body):
+    monkeypatch.setattr(server, "get_inference_executor", lambda: TimeoutExecutor())
+    response = client.post(path, json=body)
+    assert response.status_code == 504
+    assert "Retry-After" not in response.headers
+
+
+def test_busy_pdf_executor_returns_503(client, monkeypatch):
+    monkeypatch.setattr(server, "get_pdf_executor", lambda: BusyExecutor())
+    response = client.post("/api/masking", data=pdf_form(), content_type="multipart/form-data")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_masking_runs_on_the_inference_executor(client):
+    response = client.post("/api/masking", json={"question2": "주민번호 " + _SSN})
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert data["original_prompt"] == "주민번호 " + _SSN
+    assert _SSN not in data["masked_prompt"]
+
+
+# ---------------------------------------------------------------------------
+# /api/masking/stream
+
+
+def test_stream_record_order(client):
+    text = make_text(10_000)
+    records = ndjson(client.post("/api/masking/stream", json={"question2": text}))
+    types = [r["type"] for r in records]
+    assert types[-1] == "summary" and types.count("summary") == 1
+    assert types[0] == "segment"
+    assert set(types) == {"segment", "entity", "summary"}
+    # 엔티티 레코드는 자신이 들어 있는 세그먼트 바로 뒤에 옴 (세그먼트 offset은 원문 기준)
+    offsets = [r["offset"] for r in records if r["type"] == "segment"] + [len(text)]
+    assert offsets == sorted(offsets)
+    index = -1
+    for record in records[:-1]:
+        if record["type"] == "segment":
+            index += 1
+        else:
+            assert offsets[index] <= record["start"] < offsets[index + 1]
+            assert text[record["start"] : record["end"]] == record["entity"]
+    summary = records[-1]
+    assert summary["chars"] == len(text)
+    assert summary["segments"] == types.count("segment") and summary["entities"] == types.count("entity")
+
+
+@pytest.mark.parametrize("mask_target", ["question2", "prompt"])
+def test_stream_segments_equal_masking_output(client, mask_target):
+    body = {"prompt_json": {"question1": "요약", "question2": make_text(9_000) + " 연락처 010 1234 5678"}}
+    body["mask_target"] = mask_target
+    whole = client.post("/api/masking", json=body).get_json()["data"]
+    records = ndjson(client.post("/api/masking/stream", json=body))
+    masked = "".join(r["text"] for r in records if r["type"] == "segment")
+    assert masked == whole["masked_prompt"]
+    assert _SSN not in masked
+
+
+def test_stream_busy_queue_sends_503_record(client, monkeypatch):
+    monkeypatch.setattr(server, "get_inference_executor", lambda: BusyExecutor())
+    response = client.post("/api/masking/stream", json={"question2": "주민번호 " + _SSN})
+    assert response.status_code == 200
+    records = ndjson(response)
+    assert records[-1]["type"] == "error" and records[-1]["status"] == 503
+    assert all(r["type"] != "segment" or _SSN not in r["text"] for r in records)
+
+
+class RecordingSpool(tempfile.SpooledTemporaryFile):
+    """만들어진 스풀을 모아 두고 닫혔는지 확인할 수 있게 합니다."""
+
+    instances: List["RecordingSpool"] = []
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        RecordingSpool.instances.append(self)
+
+
+@pytest.fixture
+def spools(monkeypatch):
+    RecordingSpool.instances = []
+    monkeypatch.setattr(server.tempfile, "SpooledTemporaryFile", RecordingSpool)
+    return RecordingSpool.instances
+
+
+def test_stream_slow_page_sends_504_record_and_releases_spool_after_read(client, monkeypatch, spools):
+    release = threading.Event()
+    finished = threading.Event()
+
+    def slow_pages(spool):
+        assert release.wait(5)
+        try:
+            yield "주민번호 " + _SSN
+        finally:
+            finished.set()
+
+    monkeypatch.setattr(server, "INFERENCE_TIMEOUT", 0.05)
+    monkeypatch.setattr(server, "iter_pdf_pages", slow_pages)
+    response = client.post("/api/masking/stream", data=pdf_form(), content_type="multipart/form-data")
+    records = ndjson(response)
+    response.close()
+    assert records[-1]["type"] == "error" and records[-1]["status"] == 504
+    # 페이지를 읽는 중에는 스풀을 닫지 않고, 읽기가 끝난 뒤 정리
+    assert len(spools) == 1 and not spools[0].closed
+    release.set()
+    assert finished.wait(5)
+    for _ in range(100):
+        if spools[0].closed:
+            break
+        threading.Event().wait(0.01)
+    assert spools[0].closed
+
+
+def test_stream_closes_spool_after_response(client, monkeypatch, spools):
+    def pages(spool):
+        yield "주민번호 " + _SSN
+        yield "둘째 쪽"
+
+    monkeypatch.setattr(server, "iter_pdf_pages", pages)
+    response = client.post("/api/masking/stream", data=pdf_form(), content_type="multipart/form-data")
+    records = ndjson(response)
+    response.close()
+    masked = "".join(r["text"] for r in records if r["type"] == "segment")
+    assert "[PDF 내용]" in masked and "둘째 쪽" in masked and _SSN not in masked
+    assert len(spools) == 1 and spools[0].closed
+
+
+def test_stream_closes_spool_when_body_is_never_read(client, monkeypatch, spools):
+    pages_read = []
+
+    def pages(spool):
+        pages_read.append(True)
+        yield "본문"
+
+    monkeypatch.setattr(server, "iter_pdf_pages", pages)
+    response = client.post(
+        "/api/masking/stream", data=pdf_form(), content_type="multipart/form-data", buffered=False
+    )
+    assert response.status_code == 200
+    response.close()
+    assert not pages_read
+    assert len(spools) == 1 and spools[0].closed
+
+
+# ---------------------------------------------------------------------------
+# mask_target/fusion_mode 검증과 대상별로 필요한 작업만 하는지
+
+
+@pytest.mark.parametrize("path", ["/api/masking", "/api/masking/stream", "/api/masking/batch"])
+@pytest.mark.parametrize("field, value", [("mask_target", "pdf"), ("mask_target", 3), ("fusion_mode", "best")])
+def test_bad_option_returns_400(client, path, field, value):
+    body: Dict[str, Any] = {field: value}
+    if path.endswith("batch"):
+        body["items"] = [{"question2": "본문"}]
+    else:
+        body["prompt_json"] = {"question2": "본문"}
+    response = client.post(path, json=body)
+    assert response.status_code == 400
+    assert field in response.get_json()["message"]
+
+
+def test_bad_option_in_form_returns_400(client):
+    response = client.post("/api/masking", data=pdf_form(mask_target="all"), content_type="multipart/form-data")
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def pdf_calls(monkeypatch):
+    calls: List[bytes] = []
+
+    def fake_extract(pdf_bytes_io):
+        calls.append(pdf_bytes_io.getvalue())
+        return "PDF 주민번호 " + _SSN
+
+    monkeypatch.setattr(server, "extract_text_from_pdf", fake_extract)
+    return calls
+
+
+@pytest.mark.parametrize("mask_target", ["question2", "prompt"])
+def test_pdf_is_not_read_unless_prompt_pdf(client, pdf_calls, mask_target):
+    response = client.post(
+        "/api/masking", data=pdf_form(mask_target=mask_target), content_type="multipart/form-data"
+    )
+    assert response.status_code == 200
+    assert pdf_calls == []
+    data = response.get_json()["data"]
+    if mask_target == "question2":
+        assert data["original_prompt"] == "본문"
+
+
+def test_pdf_is_read_for_prompt_pdf(client, pdf_calls):
+    response = client.post("/api/masking", data=pdf_form(), content_type="multipart/form-data")
+    assert response.status_code == 200
+    assert pdf_calls == [b"%PDF-1.4 fake"]
+    data = response.get_json()["data"]
+    assert data["original_prompt"].endswith("[PDF 내용]\nPDF 주민번호 " + _SSN)
+    assert _SSN not in data["masked_prompt"]
+
+
+def test_question2_skips_the_prompt_template(client, monkeypatch):
+    def fail(*args: Any, **kwargs: Any) -> str:
+        raise AssertionError("question2만 마스킹할 때는 전체 프롬프트를 만들지 않아야 함")
+
+    monkeypatch.setattr(prompt_builder, "build_prompt", fail)
+    response = client.post("/api/masking", json={"prompt_json": {"question1": "a", "question2": "본문"}})
+    assert response.status_code == 200
+    assert response.get_json()["data"]["masked_prompt"] == "본문"
@@ -0,0 +1,91 @@
+"""스트리밍 마스킹의 창 나누기(`split_windows`/`iter_mask_records`)를 확인합니다.
+
+정규식 규칙 엔진을 탐지기로 써서, 창 경계에 걸친 엔티티도 마스킹되는지와
+세그먼트를 이으면 전체 텍스트를 한 번에 마스킹한 결과와 같은지 봅니다.
+
+실행 예 (저장소 루트에서):
+    python -m pytest -q Server/tests
+"""
+
+import random
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from Server.nlp.fusion import fuse_and_resolve
+from Server.nlp.rule_engine import scan_compact, scan_rules
+from Server.services.masking_service import _mask_from_results, iter_mask_records, split_windows
+
+_SSN = "900101-1234567"
+
+
+def detect(window: str, timings: Dict[str, Any]):
+    timings["presidio"] = {"status": "ok", "ms": 1.0}
+    return fuse_and_resolve([], scan_rules(window))
+
+
+def stream(text: str, window: int, overlap: int, separator: str = "") -> Tuple[str, List[Dict], Dict]:
+    records = list(iter_mask_records([(separator, text)], detect, window_chars=window, window_overlap=overlap))
+    masked = "".join(r["text"] for r in records if r["type"] == "segment")
+    entities = [r for r in records if r["type"] == "entity"]
+    return masked, entities, records[-1]
+
+
+def test_windows_tile_the_text():
+    text = ("가나다 " * 50 + "\n") * 40
+    windows = split_windows(text, 300, 40)
+    assert windows[0][2] == 0 and windows[-1][3] == len(text)
+    for (_, _, _, prev_end), (_, _, next_start, _) in zip(windows, windows[1:]):
+        assert prev_end == next_start
+    for context_start, context_end, keep_start, keep_end in windows:
+        assert 0 < keep_end - keep_start <= 300
+        assert context_start == max(0, keep_start - 40) and context_end == min(len(text), keep_end + 40)
+
+
+def test_overlap_is_capped_at_half_the_window():
+    windows = split_windows("x" * 1000, 100, 500)
+    assert all(keep_start - context_start <= 50 for context_start, _, keep_start, _ in windows)
+
+
+def test_short_and_empty_text():
+    assert split_windows("", 10) == []
+    assert split_windows("abc", 10, 5) == [(0, 3, 0, 3)]
+
+
+def test_ssn_straddling_a_hard_cut_is_masked():
+    # 창 뒤쪽 절반에 공백/줄바꿈이 없어 4000자에서 그대로 잘리는 경우
+    text = "x" * 3989 + "," + _SSN + " tail"
+    assert split_windows(text, 4000)[0][3] == 4000  # 주민번호 중간에서 잘림
+    masked, entities, summary = stream(text, 4000, 256)
+    assert _SSN not in masked and "4567" not in masked
+    assert [(e["entity"], e["start"], e["end"]) for e in entities] == [(_SSN, 3990, 3990 + len(_SSN))]
+    assert summary["chars"] == len(text)
+
+
+@pytest.mark.parametrize("overlap, leaked", [(0, True), (30, False)])
+def test_entity_with_spaces_across_a_whitespace_cut(overlap, leaked):
+    # 공백 경계에서 잘려도 공백이 든 전화번호는 앞 창의 뒤쪽 문맥에서 온전히 찾음
+    def detect_compact(window: str, timings: Dict[str, Any]):
+        return fuse_and_resolve([], scan_compact(window).to_spans())
+
+    text = "가" * 66 + " 010 1234 5678 " + "나" * 40
+    assert split_windows(text, 80)[0][3] == 76  # "5678" 앞 공백에서 잘림
+    records = list(iter_mask_records([("", text)], detect_compact, window_chars=80, window_overlap=overlap))
+    masked = "".join(r["text"] for r in records if r["type"] == "segment")
+    assert ("5678" in masked) is leaked
+    if not leaked:
+        assert [r["entity"] for r in records if r["type"] == "entity"] == ["010 1234 5678"]
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("window, overlap", [(40, 20), (64, 32), (100, 30), (257, 64)])
+def test_segments_join_to_the_whole_text_result(seed, window, overlap):
+    rng = random.Random(seed)
+    tokens = [_SSN, "M12345678", "123", "110-123-456789", "가나", "abc", "  ", "\n", "12", "4567"]
+    text = "".join(rng.choice(tokens) + rng.choice(["", " ", "-", "\n"]) for _ in range(rng.randint(5, 120)))
+    expected_masked, _ = _mask_from_results(text, detect(text, {}))
+    masked, entities, summary = stream(text, window, overlap, separator="[p1]\n")
+    assert masked == "[p1]\n" + expected_masked
+    assert summary["chars"] == len(text) + len("[p1]\n")
+    for e in entities:
+        assert ("[p1]\n" + text)[e["start"] : e["end"]] == e["entity"]
@@ -0,0 +1,4 @@
+"""운영 보조 명령줄 도구 모음.
+
+저장소 루트에서 `python -m Server.tools.<모듈>` 형태로 실행합니다.
+"""
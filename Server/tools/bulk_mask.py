@@ -0,0 +1,360 @@
+"""JSONL 파일이나 PDF 폴더를 오프라인으로 일괄 마스킹합니다.
+
+입력을 순서대로 읽어 --chunk-size개씩 묶고, 프로세스 풀(워커마다 모델 한 벌)에 나눠 맡긴 뒤
+결과를 입력 순서대로 JSONL로 씁니다. 묶음을 하나 쓸 때마다 체크포인트(<출력>.ckpt)를 갱신하므로
+중단된 작업은 --resume으로 이어서 실행할 수 있습니다. (출력은 마지막 체크포인트 위치까지 잘라낸 뒤 이어 씀)
+
+입력 형식:
+  - JSONL: 한 줄에 JSON 객체 하나. --text-field(기본 text) 문자열이 있으면 그 필드를 마스킹하고,
+    없으면 question1~question6(또는 prompt_json)을 --mask-target 기준으로 프롬프트로 만들어 마스킹합니다.
+    출력은 입력 한 줄당 한 줄(순서 유지)이며, 실패한 줄은 {"line", "error"}로 남깁니다.
+  - 폴더: 하위의 *.pdf를 경로순으로 읽어 텍스트를 추출(`extract_text_from_pdf`)한 뒤 마스킹합니다.
+
+출력에는 원문 엔티티 값 대신 라벨별 개수(masked_labels)만 넣습니다. (--with-entities면 원문 포함 목록도 추가)
+탐지기 제한 시간을 넘긴 항목은 일부만 마스킹된 결과를 쓰지 않고 오류로 기록합니다.
+
+실행 예 (저장소 루트에서):
+    python -m Server.tools.bulk_mask prompts.jsonl masked.jsonl --workers 4
+    python -m Server.tools.bulk_mask ./archive/pdfs masked_pdfs.jsonl --workers 2 --resume
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+CHECKPOINT_SUFFIX = ".ckpt"
+PROMPT_TARGETS = ("question2", "prompt")
+
+# 워커 프로세스 상태 (_init_worker에서 채움)
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(threads: int, fusion_mode: Optional[str], mask_target: str, text_field: str, with_entities: bool) -> None:
+    """워커마다 한 번: 스레드 수를 정하고 모델을 로딩합니다.
+
+    설정은 임포트 시점의 환경 변수로 정해지므로(탐지기 제한 시간 등) 서비스 모듈은 여기서 임포트합니다.
+    """
+    if threads > 0:
+        try:
+            import torch
+
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+    try:
+        from ..services.masking_service import mask_texts_with_models
+        from ..services.pdf_service import extract_text_from_pdf
+        from ..services.prompt_builder import build_mask_text
+        from ..services.warmup import run_warmup
+    except Exception:  # pragma: no cover
+        from backend.services.masking_service import mask_texts_with_models  # type: ignore
+        from backend.services.pdf_service import extract_text_from_pdf  # type: ignore
+        from backend.services.prompt_builder import build_mask_text  # type: ignore
+        from backend.services.warmup import run_warmup  # type: ignore
+
+    run_warmup()
+    _worker.update(
+        mask_texts=mask_texts_with_models,
+        extract_pdf=extract_text_from_pdf,
+        build_mask_text=build_mask_text,
+        fusion_mode=fusion_mode,
+        mask_target=mask_target,
+        text_field=text_field,
+        with_entities=with_entities,
+    )
+
+
+def _pool_initializer(*initargs) -> None:
+    """풀 워커 프로세스용 초기화. Ctrl+C는 부모 프로세스만 처리하도록 워커에서는 무시합니다.
+
+    (--workers 0이면 부모 프로세스에서 `_init_worker`를 바로 부르므로 여기를 거치지 않음)
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _init_worker(*initargs)
+
+
+def _prompt_data(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if isinstance(record.get("prompt_json"), dict):
+        return record["prompt_json"]
+    if any(k.startswith("question") for k in record):
+        return record
+    return None
+
+
+# 준비 결과: (마스킹할 텍스트, 출력 레코드, 마스킹 결과를 넣을 필드) — 텍스트가 None이면 레코드가 곧 오류 레코드
+Prepared = Tuple[Optional[str], Dict[str, Any], str]
+
+
+def _prepare_jsonl(line_no: int, line: str) -> Prepared:
+    """JSONL 한 줄을 마스킹할 텍스트와 출력 레코드로 나눕니다."""
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return None, {"line": line_no, "error": f"JSON 파싱 실패: {e}"}, ""
+    if not isinstance(record, dict):
+        return None, {"line": line_no, "error": "JSON 객체가 아닙니다."}, ""
+
+    field = _worker["text_field"]
+    if isinstance(record.get(field), str):
+        return record[field], dict(record), field
+    prompt = _prompt_data(record)
+    if prompt is None:
+        return None, {"line": line_no, "error": f"{field} 필드나 question* 키가 없습니다."}, ""
+    # 원문 질문은 출력에서 빼고 마스킹된 프롬프트만 남김
+    rest = {k: v for k, v in record.items() if k != "prompt_json" and not k.startswith("question")}
+    return _worker["build_mask_text"](prompt, _worker["mask_target"]), rest, "masked_prompt"
+
+
+def _prepare_pdf(root: str, path: str) -> Prepared:
+    rel = os.path.relpath(path, root)
+    try:
+        with open(path, "rb") as f:
+            # 일괄 처리는 파일마다 한 번만 읽으므로 추출 캐시를 쓰지 않음
+            text = _worker["extract_pdf"](io.BytesIO(f.read()), use_cache=False)
+    except Exception as e:
+        return None, {"path": rel, "error": f"PDF 처리 실패: {type(e).__name__}: {e}"}, ""
+    return text, {"path": rel, "chars": len(text)}, "masked_text"
+
+
+def _mask_chunk(kind: str, root: str, items: List[Tuple[int, str]]) -> Tuple[List[str], int, int]:
+    """묶음 하나를 마스킹합니다. (워커에서 실행) 반환: (출력 줄 목록, 마스킹한 글자 수, 오류 수)"""
+    prepared = [
+        _prepare_jsonl(no, value) if kind == "jsonl" else _prepare_pdf(root, value) for no, value in items
+    ]
+    pending = [i for i, (text, _, _) in enumerate(prepared) if text is not None]
+    timings: Dict[str, Any] = {}
+    masked = _worker["mask_texts"]([prepared[i][0] for i in pending], timings, _worker["fusion_mode"]) if pending else []
+    timed_out = [name for name, t in timings.items() if isinstance(t, dict) and t.get("status") == "timeout"]
+
+    records = [record for _, record, _ in prepared]
+    chars = 0
+    for i, (masked_text, entities) in zip(pending, masked):
+        text, record, slot = prepared[i]
+        if timed_out:
+            key = {"line": items[i][0]} if kind == "jsonl" else {"path": record["path"]}
+            records[i] = {**key, "error": f"탐지기 시간 초과: {', '.join(timed_out)}"}
+            continue
+        record[slot] = masked_text
+        record["masked_labels"] = dict(Counter(e["label"] for e in entities))
+        if _worker["with_entities"]:
+            record["masked_entities"] = entities
+        chars += len(text)
+    errors = sum(1 for record in records if "error" in record)
+    return [json.dumps(record, ensure_ascii=False) for record in records], chars, errors
+
+
+def _iter_jsonl(path: str, offset: int, line_no: int, chunk_size: int) -> Iterator[Tuple[List[Tuple[int, str]], int, int]]:
+    """JSONL을 offset(바이트)부터 읽어 (묶음, 다음 offset, 다음 줄 번호)를 내보냅니다. (빈 줄은 건너뜀)"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        chunk: List[Tuple[int, str]] = []
+        for raw in f:
+            line_no += 1
+            offset += len(raw)
+            line = raw.decode("utf-8", errors="replace").strip()
+            if line:
+                chunk.append((line_no, line))
+            if len(chunk) >= chunk_size:
+                yield chunk, offset, line_no
+                chunk = []
+        if chunk:
+            yield chunk, offset, line_no
+
+
+def _list_pdfs(root: str) -> List[str]:
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        paths.extend(os.path.join(dirpath, name) for name in sorted(filenames) if name.lower().endswith(".pdf"))
+    return paths
+
+
+def _iter_pdfs(paths: List[str], start: int, chunk_size: int) -> Iterator[Tuple[List[Tuple[int, str]], int, int]]:
+    """PDF 경로 목록을 start번째부터 묶어 (묶음, 다음 위치, 다음 위치)를 내보냅니다."""
+    for i in range(start, len(paths), chunk_size):
+        end = min(i + chunk_size, len(paths))
+        yield [(n, paths[n]) for n in range(i, end)], end, end
+
+
+def _load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    """임시 파일에 쓴 뒤 교체해 중단되더라도 이전 체크포인트가 온전히 남게 합니다."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class _Progress:
+    """처리량/진행률을 주기적으로 stderr에 출력합니다."""
+
+    def __init__(self, total: int, interval: float, items: int, done: int, errors: int) -> None:
+        self.total = total
+        self.interval = interval
+        self.started = self.last = time.perf_counter()
+        self.start_items = items
+        self.start_done = done
+        self.items = items
+        self.done = done
+        self.chars = 0
+        self.errors = errors
+
+    def update(self, items: int, done: int, chars: int, errors: int) -> None:
+        self.items += items
+        self.done = done
+        self.chars += chars
+        self.errors += errors
+        now = time.perf_counter()
+        if now - self.last >= self.interval:
+            self.last = now
+            self.report()
+
+    def report(self, final: bool = False) -> None:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        items = self.items - self.start_items
+        line = (
+            f"{'완료' if final else '진행'}: {self.items}건 (오류 {self.errors}), "
+            f"{items / elapsed:.1f}건/s, {self.chars / elapsed:,.0f}자/s, {elapsed:.0f}초"
+        )
+        if self.total:
+            line += f", {self.done / self.total:.1%}"
+            rate = (self.done - self.start_done) / elapsed
+            if not final and rate > 0:
+                line += f", 남은 시간 약 {(self.total - self.done) / rate:.0f}초"
+        print(line, file=sys.stderr, flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL 파일 또는 PDF 폴더")
+    parser.add_argument("output", help="마스킹 결과 JSONL")
+    parser.add_argument("--workers", type=int, default=2, help="워커 프로세스 수 (0이면 현재 프로세스에서 실행)")
+    parser.add_argument("--threads", type=int, default=0, help="워커당 torch 스레드 수 (0이면 코어 수 / 워커 수)")
+    parser.add_argument("--chunk-size", type=int, default=32, help="워커에 한 번에 맡기는 항목 수 (NER 배치 단위)")
+    parser.add_argument("--text-field", default="text", help="JSONL에서 마스킹할 문자열 필드")
+    parser.add_argument("--mask-target", choices=PROMPT_TARGETS, default="prompt", help="question* 레코드의 마스킹 대상")
+    parser.add_argument("--fusion-mode", default=None, help="greedy | weighted (기본: FUSION_MODE)")
+    parser.add_argument("--with-entities", action="store_true", help="원문 값이 포함된 엔티티 목록도 출력")
+    parser.add_argument("--detector-timeout", type=float, default=300.0, help="워커의 탐지기 제한 시간(초)")
+    parser.add_argument("--resume", action="store_true", help="체크포인트부터 이어서 실행")
+    parser.add_argument("--overwrite", action="store_true", help="기존 출력/체크포인트를 지우고 새로 실행")
+    parser.add_argument("--progress-interval", type=float, default=10.0, help="진행 상황 출력 간격(초)")
+    args = parser.parse_args()
+
+    kind = "pdf" if os.path.isdir(args.input) else "jsonl"
+    if kind == "jsonl" and not os.path.isfile(args.input):
+        parser.error(f"입력을 찾을 수 없습니다: {args.input}")
+    checkpoint_path = args.output + CHECKPOINT_SUFFIX
+    input_id = os.path.abspath(args.input)
+
+    # 다음에 읽을 위치: JSONL은 (바이트 offset, 줄 번호), 폴더는 (PDF 순번, PDF 순번)
+    position, line_no, items_done, errors_done, output_bytes = 0, 0, 0, 0, 0
+    checkpoint = _load_checkpoint(checkpoint_path)
+    if args.resume and checkpoint:
+        if checkpoint.get("input") != input_id or checkpoint.get("kind") != kind:
+            parser.error(f"체크포인트의 입력({checkpoint.get('input')})이 현재 입력과 다릅니다.")
+        position, line_no = checkpoint["position"], checkpoint["line"]
+        items_done, errors_done = checkpoint["items"], checkpoint.get("errors", 0)
+        output_bytes = checkpoint["output_bytes"]
+        print(f"체크포인트부터 이어서 실행: {items_done}건 처리됨", file=sys.stderr)
+    elif args.resume and not args.overwrite and os.path.exists(args.output):
+        parser.error(
+            f"체크포인트({checkpoint_path})가 없어 {args.output}에 이어서 쓸 수 없습니다. "
+            "처음부터 다시 만들려면 --overwrite를 사용하세요."
+        )
+    elif (checkpoint or os.path.exists(args.output)) and not args.overwrite:
+        parser.error(f"{args.output}이 이미 있습니다. --resume 또는 --overwrite를 사용하세요.")
+    elif checkpoint:
+        os.remove(checkpoint_path)
+
+    if kind == "pdf":
+        paths = _list_pdfs(args.input)
+        chunks = _iter_pdfs(paths, position, max(1, args.chunk_size))
+        progress = _Progress(len(paths), args.progress_interval, items_done, position, errors_done)
+    else:
+        chunks = _iter_jsonl(args.input, position, line_no, max(1, args.chunk_size))
+        progress = _Progress(os.path.getsize(args.input), args.progress_interval, items_done, position, errors_done)
+
+    workers = max(0, args.workers)
+    threads = args.threads or max(1, (os.cpu_count() or 1) // max(1, workers))
+    # 워커는 spawn으로 시작해 이 환경 변수로 설정을 읽음: 일괄 처리는 지연보다 누락 방지가 중요하므로
+    # 탐지기 제한 시간을 늘리고, 워커마다 OCR 풀을 띄우지 않도록 OCR은 워커 안에서 순차 실행
+    os.environ["NER_TIMEOUT"] = os.environ["PRESIDIO_TIMEOUT"] = str(args.detector_timeout)
+    os.environ.setdefault("PDF_OCR_WORKERS", "0")
+    initargs = (threads, args.fusion_mode, args.mask_target, args.text_field, args.with_entities)
+
+    out = open(args.output, "r+b" if output_bytes else "wb")
+    out.truncate(output_bytes)
+    out.seek(output_bytes)
+
+    def write(result: Tuple[List[str], int, int], next_position: int, next_line: int, count: int) -> None:
+        lines, chars, errors = result
+        out.write("".join(line + "\n" for line in lines).encode("utf-8"))
+        out.flush()
+        os.fsync(out.fileno())
+        progress.update(count, next_position, chars, errors)
+        _save_checkpoint(
+            checkpoint_path,
+            {
+                "input": input_id,
+                "kind": kind,
+                "position": next_position,
+                "line": next_line,
+                "items": progress.items,
+                "errors": progress.errors,
+                "output_bytes": out.tell(),
+            },
+        )
+
+    pool = None
+    try:
+        if workers == 0:
+            _init_worker(*initargs)
+            for chunk, next_position, next_line in chunks:
+                write(_mask_chunk(kind, args.input, chunk), next_position, next_line, len(chunk))
+        else:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_pool_initializer,
+                initargs=initargs,
+            )
+            # 결과는 제출 순서대로 써야 체크포인트가 입력의 앞부분과 일치하므로 가장 오래된 작업부터 기다림
+            inflight: Deque[Tuple[Future, int, int, int]] = deque()
+            for chunk, next_position, next_line in chunks:
+                inflight.append((pool.submit(_mask_chunk, kind, args.input, chunk), next_position, next_line, len(chunk)))
+                if len(inflight) >= workers * 2:
+                    fut, *rest = inflight.popleft()
+                    write(fut.result(), *rest)
+            while inflight:
+                fut, *rest = inflight.popleft()
+                write(fut.result(), *rest)
+    except KeyboardInterrupt:
+        print(f"\n중단됨: {progress.items}건까지 저장, --resume으로 이어서 실행할 수 있습니다.", file=sys.stderr)
+        sys.exit(130)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        out.close()
+    progress.report(final=True)
+    print(args.output)
+
+
+if __name__ == "__main__":
+    main()
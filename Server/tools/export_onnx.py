@@ -0,0 +1,39 @@
+"""NER 모델을 ONNX로 내보냅니다. (NER_BACKEND=onnx에서 사용)
+
+실행 예:
+    python -m Server.tools.export_onnx                 # NUMERIC_MODEL_PATH, TEXT_MODEL_PATH 모두
+    python -m Server.tools.export_onnx --model numeric
+    python -m Server.tools.export_onnx --model numeric --quantize   # INT8 모델도 생성 (NER_QUANTIZE=int8)
+    python -m Server.tools.export_onnx --model ./path/to/model --output ./onnx/model
+"""
+
+import argparse
+import logging
+
+try:
+    from ..config import NUMERIC_MODEL_PATH, TEXT_MODEL_PATH
+    from ..nlp.onnx_backend import export_onnx
+except Exception:  # pragma: no cover
+    from backend.config import NUMERIC_MODEL_PATH, TEXT_MODEL_PATH  # type: ignore
+    from backend.nlp.onnx_backend import export_onnx  # type: ignore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="all", help="numeric | text | all | 모델 폴더 경로")
+    parser.add_argument("--output", default=None, help="저장 폴더 (모델 하나일 때만, 기본: ONNX_MODEL_DIR 규칙)")
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--quantize", action="store_true", help="INT8 동적 양자화 모델도 함께 생성")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    named = {"numeric": [NUMERIC_MODEL_PATH], "text": [TEXT_MODEL_PATH], "all": [NUMERIC_MODEL_PATH, TEXT_MODEL_PATH]}
+    paths = named.get(args.model, [args.model])
+    if args.output and len(paths) > 1:
+        parser.error("--output은 모델 하나를 내보낼 때만 사용할 수 있습니다.")
+    for path in dict.fromkeys(paths):
+        print(export_onnx(path, args.output, opset=args.opset, quantize=args.quantize))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+import abc
+import bisect
+import glob
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows (pre-fork 서버 없이 한 프로세스로 실행)
+    fcntl = None  # type: ignore[assignment]
+
+# Prometheus 텍스트 형식(0.0.4)으로 내보내는 가벼운 메트릭 레지스트리입니다.
+# 외부 의존성 없이 카운터/히스토그램과 수집 시점에 값을 읽는 collector를 지원합니다.
+# 관측 한 번은 잠금 + 이진 탐색 정도라 운영 환경에서 켜 두어도 부담이 작습니다.
+# 값은 프로세스별입니다. pre-fork 서버(gunicorn)에서는 공유 디렉터리(`configure_multiprocess`)에
+# 워커마다 스냅샷 파일을 쓰고, /metrics에 응답하는 워커가 모든 파일을 합쳐 내보냅니다.
+
+# 지연 시간(초) 히스토그램 경계
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 입력 크기(글자 수/바이트) 히스토그램 경계
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+LabelValues = Tuple[str, ...]
+# collector 반환 형식: (이름, 종류(counter|gauge), 설명, [(라벨 dict, 값), ...])
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+# JSON으로 저장하는 프로세스 스냅샷: {"metrics": [[이름, 종류, 설명, 라벨 이름, 버킷, [[라벨 값, 값]]]],
+#   "families": [[이름, 종류, 설명, [[라벨 dict, 값]]]]} (히스토그램 값은 [버킷별 개수..., +Inf 개수, 합계])
+Snapshot = Dict[str, List]
+
+# 종료된 워커들의 카운터/히스토그램을 누적해 두는 파일 (합계가 줄지 않게 함)과 그 잠금 파일
+_DEAD_FILE = "dead.json"
+_DEAD_LOCK = "dead.lock"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    @abc.abstractmethod
+    def samples(self) -> List[Tuple[LabelValues, object]]:
+        """(라벨 값, 값) 목록의 복사본."""
+
+
+class Counter(_Metric):
+    """단조 증가 카운터."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[LabelValues, object]]:
+        with self._lock:
+            return sorted(self._values.items())
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램. (버킷별 개수, 합계, 개수)"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 값 → [버킷별 개수..., +Inf 개수, 합계]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            row[idx] += 1
+            row[-1] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            row = self._values.get(self._key(labels))
+            return int(sum(row[:-1])) if row else 0
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """블록 실행 시간(초)을 관측합니다."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[Tuple[LabelValues, object]]:
+        with self._lock:
+            return sorted((k, list(v)) for k, v in self._values.items())
+
+
+def _histogram_lines(name: str, labelnames: Sequence[str], buckets: Sequence[float], key, row) -> List[str]:
+    lines: List[str] = []
+    cumulative = 0.0
+    for bound, n in zip(tuple(buckets) + (math.inf,), row[:-1]):
+        cumulative += n
+        le = 'le="' + _format_value(bound) + '"'
+        lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {_format_value(cumulative)}")
+    lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_format_value(row[-1])}")
+    lines.append(f"{name}_count{_format_labels(labelnames, key)} {_format_value(cumulative)}")
+    return lines
+
+
+def _render_snapshot(snapshot: Snapshot) -> str:
+    lines: List[str] = []
+    for name, kind, documentation, labelnames, buckets, samples in snapshot["metrics"]:
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        for key, value in samples:
+            if kind == "histogram":
+                lines.extend(_histogram_lines(name, labelnames, buckets, key, value))
+            else:
+                lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+    for name, kind, documentation, samples in snapshot["families"]:
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {_format_value(float(value))}")
+    return "\n".join(lines) + "\n"
+
+
+def _merge_snapshots(snapshots: Iterable[Snapshot]) -> Snapshot:
+    """여러 프로세스의 스냅샷을 합칩니다. (같은 이름/라벨의 값은 더함, 히스토그램은 버킷별로 더함)
+
+    게이지도 더하므로 collector는 워커별로 더해도 의미가 있는 값(진행 중 작업 수, 캐시 항목 수 등)만
+    게이지로 내야 합니다. 비율/속도는 카운터로 내고 Prometheus 쪽에서 계산합니다.
+    """
+    metrics: Dict[str, list] = {}
+    families: Dict[str, list] = {}
+    for snapshot in snapshots:
+        for name, kind, documentation, labelnames, buckets, samples in snapshot["metrics"]:
+            entry = metrics.setdefault(name, [name, kind, documentation, labelnames, buckets, {}])
+            if entry[4] != buckets:
+                continue  # 버킷 경계가 바뀐 이전 실행의 파일은 합치지 않음
+            merged = entry[5]
+            for key, value in samples:
+                key = tuple(key)
+                if kind == "histogram":
+                    row = merged.get(key)
+                    merged[key] = list(value) if row is None else [a + b for a, b in zip(row, value)]
+                else:
+                    merged[key] = merged.get(key, 0.0) + value
+        for name, kind, documentation, samples in snapshot["families"]:
+            merged = families.setdefault(name, [name, kind, documentation, {}])[3]
+            for labels, value in samples:
+                key = tuple(labels.items())
+                merged[key] = merged.get(key, 0.0) + float(value)
+    return {
+        "metrics": [entry[:5] + [sorted(entry[5].items())] for entry in metrics.values()],
+        "families": [
+            [name, kind, documentation, [(dict(key), value) for key, value in merged.items()]]
+            for name, kind, documentation, merged in families.values()
+        ],
+    }
+
+
+class MetricsRegistry:
+    """메트릭과 collector를 모아 Prometheus 텍스트 형식으로 내보냅니다."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self._lock = threading.Lock()
+        self._multiprocess_dir: Optional[str] = None
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)  # type: ignore[return-value]
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """수집 시점에 호출되어 (이름, 종류, 설명, 샘플) 목록을 돌려주는 함수를 등록합니다."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def snapshot(self) -> Snapshot:
+        """이 프로세스의 메트릭/collector 값을 JSON으로 저장할 수 있는 형태로 모읍니다."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        snapshot: Snapshot = {"metrics": [], "families": []}
+        for metric in metrics:
+            buckets = list(metric.buckets) if isinstance(metric, Histogram) else None
+            samples = [[list(key), value] for key, value in metric.samples()]
+            snapshot["metrics"].append([metric.name, metric.kind, metric.documentation, list(metric.labelnames), buckets, samples])
+        # 여러 collector가 같은 이름(예: 캐시별 라벨)을 내면 한 메트릭으로 합침
+        merged: Dict[str, list] = {}
+        for collector in collectors:
+            try:
+                families = list(collector())
+            except Exception:
+                continue  # 수집 실패가 /metrics 전체를 막지 않도록 건너뜀
+            for name, kind, documentation, samples in families:
+                if name in merged:
+                    merged[name][3].extend(samples)
+                else:
+                    merged[name] = [name, kind, documentation, list(samples)]
+        snapshot["families"] = list(merged.values())
+        return snapshot
+
+    @property
+    def multiprocess_dir(self) -> Optional[str]:
+        return self._multiprocess_dir
+
+    def configure_multiprocess(self, directory: Optional[str]) -> None:
+        """스냅샷을 공유할 디렉터리를 정합니다. (None이면 이 프로세스의 값만 내보냄)"""
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._multiprocess_dir = directory or None
+
+    def write_snapshot(self) -> None:
+        """공유 디렉터리에 이 프로세스의 스냅샷 파일(<pid>.json)을 원자적으로 씁니다."""
+        directory = self._multiprocess_dir
+        if not directory:
+            return
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def render(self) -> str:
+        directory = self._multiprocess_dir
+        if not directory:
+            return _render_snapshot(self.snapshot())
+        # 다른 워커의 값은 마지막으로 쓴 스냅샷 기준 (쓰기 주기만큼 늦을 수 있으나 카운터가 줄지는 않음)
+        self.write_snapshot()
+        snapshots = []
+        # 종료된 워커를 dead.json에 합치는 중이면 그 워커 값이 두 번 세어지지 않게 끝날 때까지 기다림
+        with _dead_lock(directory, shared=True):
+            for path in glob.glob(os.path.join(directory, "*.json")):
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue  # 쓰는 중 삭제된 파일
+        return _render_snapshot(_merge_snapshots(snapshots))
+
+
+REGISTRY = MetricsRegistry()
+
+# 마스킹 파이프라인 공통 메트릭
+STAGE_SECONDS = REGISTRY.histogram(
+    "masking_stage_seconds",
+    "마스킹 단계별 소요 시간(초): build_prompt, pdf_pypdf2, pdf_ocr, pdf_extract, numeric_ner, presidio, fusion, render",
+    ("stage",),
+)
+INPUT_CHARS = REGISTRY.histogram(
+    "masking_input_chars", "엔드포인트별 마스킹 입력 글자 수", ("endpoint",), buckets=SIZE_BUCKETS
+)
+PDF_INPUT_BYTES = REGISTRY.histogram("masking_pdf_input_bytes", "업로드된 PDF 크기(바이트)", buckets=SIZE_BUCKETS)
+PDF_PAGES = REGISTRY.counter("masking_pdf_pages_total", "추출 방식별 PDF 페이지 수 (text|ocr)", ("method",))
+ENTITIES = REGISTRY.counter("masking_entities_total", "병합 후 탐지된 엔티티 수 (표준 라벨별)", ("label",))
+DETECTOR_RUNS = REGISTRY.counter(
+    "masking_detector_runs_total", "탐지기 실행 결과 (ok|timeout|disabled)", ("detector", "status")
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간(초, 스트리밍은 응답 시작까지)", ("endpoint", "status")
+)
+STREAM_TTFB_SECONDS = REGISTRY.histogram("masking_stream_ttfb_seconds", "스트리밍 마스킹 첫 세그먼트까지의 시간(초)")
+STREAM_DURATION_SECONDS = REGISTRY.histogram("masking_stream_duration_seconds", "스트리밍 마스킹 전체 시간(초)")
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage=stage)
+
+
+def stage_timer(stage: str):
+    """`with stage_timer("fusion"): ...` 형태로 단계 시간을 관측합니다."""
+    return STAGE_SECONDS.time(stage=stage)
+
+
+def cache_stats_family(cache: str, stats: Optional[Dict[str, float]]) -> List[Family]:
+    """LRUCache.stats() 결과를 캐시 이름 라벨이 붙은 메트릭 목록으로 바꿉니다."""
+    if not stats:
+        return []
+    label = {"cache": cache}
+    families: List[Family] = []
+    for key, kind, doc in (
+        ("hits", "counter", "캐시 적중 수"),
+        ("misses", "counter", "캐시 미스 수"),
+        ("evictions", "counter", "용량 초과로 제거된 항목 수"),
+        ("expirations", "counter", "만료로 제거된 항목 수"),
+        ("entries", "gauge", "현재 항목 수"),
+        ("bytes", "gauge", "현재 값 크기 합(바이트)"),
+    ):
+        if key in stats:
+            suffix = "_total" if kind == "counter" else ""
+            families.append((f"masking_cache_{key}{suffix}", kind, doc, [(label, stats[key])]))
+    return families
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+def configure_multiprocess(directory: Optional[str]) -> None:
+    REGISTRY.configure_multiprocess(directory)
+
+
+def start_snapshot_writer(interval: float) -> None:
+    """공유 디렉터리가 정해져 있으면 interval초마다 스냅샷을 쓰는 데몬 스레드를 시작합니다.
+
+    pre-fork 서버에서는 fork 이후 워커마다 호출합니다. (gunicorn.conf.py의 post_fork)
+    """
+    if not REGISTRY.multiprocess_dir:
+        return
+
+    def _loop() -> None:
+        while True:
+            time.sleep(max(0.1, interval))
+            try:
+                REGISTRY.write_snapshot()
+            except OSError:
+                logging.warning("메트릭 스냅샷 쓰기 실패", exc_info=True)
+
+    threading.Thread(target=_loop, name="metrics-snapshot", daemon=True).start()
+
+
+@contextmanager
+def _dead_lock(directory: str, shared: bool = False) -> Iterator[None]:
+    """dead.json을 갱신하는 동안(배타)과 스냅샷 파일을 읽는 동안(공유) 잡는 파일 잠금."""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, _DEAD_LOCK), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def mark_process_dead(directory: str, pid: int) -> None:
+    """종료된 워커의 스냅샷에서 게이지를 빼고 카운터/히스토그램을 dead.json에 더합니다.
+
+    누적 값이 사라지면 합계가 줄어 rate()가 틀어지므로 버리지 않고, 워커마다 파일이 쌓이지 않도록
+    하나의 파일에 합친 뒤 워커의 스냅샷 파일을 지웁니다.
+    """
+    path = os.path.join(directory, f"{pid}.json")
+    with _dead_lock(directory):
+        try:
+            with open(path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+        snapshot["families"] = [family for family in snapshot["families"] if family[1] != "gauge"]
+        dead = os.path.join(directory, _DEAD_FILE)
+        snapshots = [snapshot]
+        try:
+            with open(dead, encoding="utf-8") as f:
+                snapshots.insert(0, json.load(f))
+        except (OSError, ValueError):
+            pass  # 처음 종료된 워커
+        tmp = f"{dead}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_merge_snapshots(snapshots), f, ensure_ascii=False)
+        os.replace(tmp, dead)
+        os.remove(path)
+
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "REGISTRY",
+    "LATENCY_BUCKETS",
+    "SIZE_BUCKETS",
+    "STAGE_SECONDS",
+    "INPUT_CHARS",
+    "PDF_INPUT_BYTES",
+    "PDF_PAGES",
+    "ENTITIES",
+    "DETECTOR_RUNS",
+    "HTTP_REQUEST_SECONDS",
+    "STREAM_TTFB_SECONDS",
+    "STREAM_DURATION_SECONDS",
+    "observe_stage",
+    "stage_timer",
+    "cache_stats_family",
+    "render_metrics",
+    "configure_multiprocess",
+    "start_snapshot_writer",
+    "mark_process_dead",
+]